@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+AI Chat Streaming Benchmark for Lxwyer Up
+Compares time-to-first-card of the streaming chat path against waiting for the
+full completion, using the local LlmChat stub with simulated token latency.
+
+Usage: python bench_chat_stream.py [first_token_ms] [per_token_ms]   (default 400 25)
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR))
+load_dotenv(ROOT_DIR / '.env')
+
+# Simulated LLM latency for the stub backend
+os.environ['LLM_STUB_FIRST_TOKEN_MS'] = sys.argv[1] if len(sys.argv) > 1 else '400'
+os.environ['LLM_STUB_TOKEN_MS'] = sys.argv[2] if len(sys.argv) > 2 else '25'
+
+from services.chat_service import send_chat_message, stream_chat_message, CardStreamParser
+
+RUNS = 5
+MESSAGE = "My landlord is refusing to return my security deposit. What can I do?"
+
+
+async def time_blocking():
+    started = time.perf_counter()
+    await send_chat_message(MESSAGE, 'bench_session')
+    return (time.perf_counter() - started) * 1000
+
+
+async def time_streaming():
+    started = time.perf_counter()
+    parser = CardStreamParser()
+    card_times = []
+    async for chunk in stream_chat_message(MESSAGE, 'bench_session'):
+        for _ in parser.feed(chunk):
+            card_times.append((time.perf_counter() - started) * 1000)
+    return card_times[0], (time.perf_counter() - started) * 1000, len(card_times)
+
+
+async def benchmark():
+    print(f"🚀 Chat streaming benchmark (first token {os.environ['LLM_STUB_FIRST_TOKEN_MS']}ms, "
+          f"{os.environ['LLM_STUB_TOKEN_MS']}ms/token, {RUNS} runs)")
+
+    blocking = sorted([await time_blocking() for _ in range(RUNS)])
+    streaming = [await time_streaming() for _ in range(RUNS)]
+    first_card = sorted(run[0] for run in streaming)
+    total = sorted(run[1] for run in streaming)
+
+    print(f"\n⏳ Blocking  /chat         first card: {blocking[len(blocking) // 2]:>8.0f}ms")
+    print(f"⚡ Streaming /chat/stream  first card: {first_card[len(first_card) // 2]:>8.0f}ms "
+          f"(all {streaming[0][2]} cards: {total[len(total) // 2]:.0f}ms)")
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Lawyer Dashboard Benchmark for Lxwyer Up
+Seeds a lawyer with N bookings and compares the old five-serial-query
+dashboard against GET /api/dashboard/lawyer (precomputed stats).
+
+Usage: python bench_dashboard.py [num_bookings]   (default 10,000)
+"""
+
+import asyncio
+import sys
+import time
+import uuid
+import random
+from pathlib import Path
+from datetime import datetime, timezone, timedelta
+from dotenv import load_dotenv
+from httpx import AsyncClient, ASGITransport
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR))
+
+load_dotenv(ROOT_DIR / '.env')
+
+from server import app
+from services.database import db
+from services.auth import create_token
+from services.lawyer_stats import rebuild_lawyer_stats
+
+NUM_BOOKINGS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+NUM_CASES = 500
+RUNS = 30
+
+
+async def legacy_dashboard(user_id):
+    """The pre-aggregation implementation: five queries, one after another"""
+    active_cases = await db.cases.count_documents({"user_id": user_id, "status": "active"})
+    clients = await db.cases.aggregate([
+        {"$match": {"user_id": user_id}}, {"$group": {"_id": "$client_name"}}, {"$count": "count"}
+    ]).to_list(length=1)
+    consultations = await db.bookings.count_documents({"lawyer_id": user_id})
+    revenue = await db.bookings.aggregate([
+        {"$match": {"lawyer_id": user_id}}, {"$group": {"_id": None, "total": {"$sum": "$price"}}}
+    ]).to_list(length=1)
+    hearings = await db.cases.find({"user_id": user_id, "next_hearing": {"$ne": None}}).sort("next_hearing", 1).limit(5).to_list(5)
+    recent = await db.cases.find({"user_id": user_id}).sort("created_at", -1).limit(5).to_list(5)
+    return active_cases, clients, consultations, revenue, hearings, recent
+
+
+def summary(samples):
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.95) - 1]
+
+
+async def benchmark():
+    lawyer_id = f"bench_lawyer_{uuid.uuid4().hex[:8]}"
+    print(f"🚀 Dashboard benchmark for {lawyer_id}: {NUM_BOOKINGS:,} bookings, {NUM_CASES} cases")
+
+    await db.users.insert_one({"id": lawyer_id, "email": f"{lawyer_id}@example.com", "user_type": "lawyer",
+                               "full_name": "Bench Lawyer"})
+    today = datetime.now(timezone.utc)
+    await db.bookings.insert_many([{
+        "id": str(uuid.uuid4()), "lawyer_id": lawyer_id, "client_id": f"client_{i % 300}",
+        "date": (today - timedelta(days=i % 720)).strftime("%Y-%m-%d"), "time": "10:00",
+        "price": random.choice([0.0, 500.0, 1000.0, 1500.0]), "status": "confirmed",
+        "created_at": today.isoformat()
+    } for i in range(NUM_BOOKINGS)])
+    await db.cases.insert_many([{
+        "id": str(uuid.uuid4()), "user_id": lawyer_id, "title": f"Case {i}", "client_name": f"Client {i % 300}",
+        "status": random.choice(["active", "closed"]), "next_hearing": (today + timedelta(days=i)).strftime("%Y-%m-%d"),
+        "created_at": today.isoformat()
+    } for i in range(NUM_CASES)])
+    await rebuild_lawyer_stats(lawyer_id)
+
+    try:
+        legacy = []
+        for _ in range(RUNS):
+            started = time.perf_counter()
+            await legacy_dashboard(lawyer_id)
+            legacy.append((time.perf_counter() - started) * 1000)
+
+        current = []
+        headers = {"Authorization": f"Bearer {create_token(lawyer_id, 'lawyer')}"}
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            for _ in range(RUNS):
+                started = time.perf_counter()
+                res = await client.get("/api/dashboard/lawyer", headers=headers)
+                current.append((time.perf_counter() - started) * 1000)
+                if res.status_code != 200:
+                    print(f"❌ Dashboard request failed: {res.text}")
+                    return
+
+        legacy_p50, legacy_p95 = summary(legacy)
+        current_p50, current_p95 = summary(current)
+        print(f"Legacy queries:       p50={legacy_p50:.2f}ms p95={legacy_p95:.2f}ms")
+        print(f"Precomputed endpoint: p50={current_p50:.2f}ms p95={current_p95:.2f}ms (includes HTTP + auth)")
+        print(f"Speedup (p50): {legacy_p50 / max(current_p50, 0.001):.1f}x")
+    finally:
+        await db.bookings.delete_many({"lawyer_id": lawyer_id})
+        await db.cases.delete_many({"user_id": lawyer_id})
+        await db.lawyer_stats.delete_one({"lawyer_id": lawyer_id})
+        await db.lawyer_clients.delete_many({"lawyer_id": lawyer_id})
+        await db.users.delete_one({"id": lawyer_id})
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark())
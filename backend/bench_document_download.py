@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Document Download Benchmark for Lxwyer Up
+Stores a document in a scratch database and compares GET /api/documents/{id}/file
+(auth + ownership check, Range, ETag) against a bare StaticFiles mount like the
+old /uploads one: full-file throughput, 1MB range reads and conditional GETs.
+
+Usage: python bench_document_download.py [size_mb]   (default 50)
+"""
+
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR))
+
+# Point the app at a scratch database before anything connects
+os.environ['DB_NAME'] = os.environ.get('BENCH_DB_NAME', 'lxwyerup_bench')
+load_dotenv(ROOT_DIR / '.env')
+
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+from httpx import AsyncClient, ASGITransport
+from server import app
+from services.auth import create_token
+from services.blob_store import blob_store
+from services.database import db, client as mongo_client
+
+SIZE_MB = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+FULL_RUNS = 10
+RANGE_RUNS = 200
+RANGE_BYTES = 1024 * 1024
+
+
+async def chunks(data):
+    for start in range(0, len(data), 1024 * 1024):
+        yield data[start:start + 1024 * 1024]
+
+
+async def timed(client, url, runs, headers=lambda: {}):
+    samples, received = [], 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        res = await client.get(url, headers=headers())
+        samples.append(time.perf_counter() - started)
+        assert res.status_code in (200, 206, 304), res.status_code
+        received += len(res.content)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000, received / sum(samples) / 1024 / 1024, res
+
+
+def random_range(size):
+    start = random.randrange(0, size - RANGE_BYTES)
+    return {'Range': f'bytes={start}-{start + RANGE_BYTES - 1}'}
+
+
+async def benchmark():
+    size = SIZE_MB * 1024 * 1024
+    print(f"🚀 Document download benchmark on '{os.environ['DB_NAME']}' with a {SIZE_MB}MB file")
+    data = os.urandom(size)
+    user_id = str(uuid.uuid4())
+    doc_id = str(uuid.uuid4())
+    content_hash, _ = await blob_store.put_stream(chunks(data), 'application/pdf')
+    await db.documents.insert_one({
+        'id': doc_id, 'user_id': user_id, 'case_id': 'bench', 'title': 'bench.pdf',
+        'file_url': f'/api/documents/{doc_id}/file', 'file_type': 'application/pdf',
+        'file_size': size, 'content_hash': content_hash, 'shared_with': []
+    })
+    auth = {'Authorization': f"Bearer {create_token(user_id, 'lawyer')}"}
+
+    static_dir = Path(tempfile.mkdtemp())
+    (static_dir / 'bench.pdf').write_bytes(data)
+    static_app = FastAPI()
+    static_app.mount('/uploads', StaticFiles(directory=static_dir), name='uploads')
+
+    endpoint = f'/api/documents/{doc_id}/file'
+    print(f"\n{'scenario':<28} {'static p50':>11} {'static MB/s':>12} {'endpoint p50':>13} {'endpoint MB/s':>14}")
+    async with AsyncClient(transport=ASGITransport(app=static_app), base_url="http://test") as static, \
+            AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as api:
+        static_full = await timed(static, '/uploads/bench.pdf', FULL_RUNS)
+        api_full = await timed(api, endpoint, FULL_RUNS, lambda: auth)
+        print(f"{'full file':<28} {static_full[0]:>9.1f}ms {static_full[1]:>12.1f} {api_full[0]:>11.1f}ms {api_full[1]:>14.1f}")
+
+        static_range = await timed(static, '/uploads/bench.pdf', RANGE_RUNS, lambda: random_range(size))
+        api_range = await timed(api, endpoint, RANGE_RUNS, lambda: {**auth, **random_range(size)})
+        print(f"{'1MB range':<28} {static_range[0]:>9.1f}ms {static_range[1]:>12.1f} {api_range[0]:>11.1f}ms {api_range[1]:>14.1f}"
+              f"   (static status {static_range[2].status_code}, endpoint {api_range[2].status_code})")
+
+        etag = api_full[2].headers['etag']
+        api_304 = await timed(api, endpoint, RANGE_RUNS, lambda: {**auth, 'If-None-Match': etag})
+        print(f"{'If-None-Match (endpoint)':<28} {'-':>11} {'-':>12} {api_304[0]:>11.2f}ms {'-':>14}"
+              f"   (status {api_304[2].status_code})")
+
+    shutil.rmtree(static_dir)
+    await blob_store.release(content_hash)
+    await mongo_client.drop_database(os.environ['DB_NAME'])
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Index Benchmark for Lxwyer Up
+Seeds a scratch database with N documents per hot collection and compares
+collection-scan vs index-scan latency for the queries the API runs most.
+
+Usage: python bench_indexes.py [num_docs]   (default 1,000,000)
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+import random
+from pathlib import Path
+from datetime import datetime, timezone, timedelta
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR))
+
+load_dotenv(ROOT_DIR / '.env')
+
+from services.indexes import INDEXES
+
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+BENCH_DB_NAME = os.environ.get('BENCH_DB_NAME', 'lxwyerup_bench')
+client = AsyncIOMotorClient(MONGO_URL)
+db = client[BENCH_DB_NAME]
+
+NUM_DOCS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+BATCH_SIZE = 10_000
+RUNS = 20
+STATES = ['Delhi', 'Haryana', 'Uttar Pradesh', 'Maharashtra', 'Karnataka']
+
+
+def make_user(i):
+    return {'id': f'user_{i}', 'email': f'user{i}@example.com', 'user_type': random.choice(['client', 'lawyer']),
+            'full_name': f'User {i}'}
+
+
+def make_message(i):
+    base = datetime.now(timezone.utc) - timedelta(seconds=NUM_DOCS - i)
+    return {'id': str(uuid.uuid4()), 'sender_id': f'user_{random.randrange(5000)}',
+            'receiver_id': f'user_{random.randrange(5000)}', 'content': 'hello', 'timestamp': base}
+
+
+def make_booking(i):
+    return {'id': str(uuid.uuid4()), 'lawyer_id': f'user_{random.randrange(5000)}',
+            'client_id': f'user_{random.randrange(5000)}', 'is_free_trial': False,
+            'created_at': datetime.now(timezone.utc).isoformat()}
+
+
+def make_notification(i):
+    return {'id': str(uuid.uuid4()), 'user_id': f'user_{random.randrange(5000)}', 'title': 'Update',
+            'created_at': datetime.now(timezone.utc) - timedelta(seconds=i)}
+
+
+def make_network_message(i):
+    return {'id': str(uuid.uuid4()), 'state': random.choice(STATES), 'content': 'hello',
+            'timestamp': datetime.now(timezone.utc) - timedelta(seconds=i)}
+
+
+SEEDERS = {
+    'users': make_user,
+    'messages': make_message,
+    'bookings': make_booking,
+    'notifications': make_notification,
+    'network_messages': make_network_message,
+}
+
+# (label, collection, filter, sort) mirroring the route queries
+QUERIES = [
+    ('get_current_user', 'users', {'id': 'user_4242'}, None),
+    ('login', 'users', {'email': 'user4242@example.com', 'user_type': 'client'}, None),
+    ('bookings by lawyer', 'bookings', {'lawyer_id': 'user_42'}, None),
+    ('conversation', 'messages', {'$or': [{'sender_id': 'user_1', 'receiver_id': 'user_2'},
+                                          {'sender_id': 'user_2', 'receiver_id': 'user_1'}]},
+     [('timestamp', -1), ('id', -1)]),
+    ('notifications', 'notifications', {'user_id': 'user_42'}, [('created_at', -1)]),
+    ('network feed', 'network_messages', {'state': 'Delhi'}, [('timestamp', -1)]),
+]
+
+
+async def seed():
+    for name, factory in SEEDERS.items():
+        collection = db[name]
+        await collection.drop()
+        print(f"Seeding {NUM_DOCS:,} {name}...")
+        for start in range(0, NUM_DOCS, BATCH_SIZE):
+            await collection.insert_many([factory(i) for i in range(start, min(start + BATCH_SIZE, NUM_DOCS))])
+
+
+async def time_query(collection, query, sort, hint=None):
+    samples = []
+    for _ in range(RUNS):
+        cursor = collection.find(query, {'_id': 0}).limit(50)
+        if sort:
+            cursor = cursor.sort(sort)
+        if hint:
+            cursor = cursor.hint(hint)
+        started = time.perf_counter()
+        await cursor.to_list(50)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.95) - 1]
+
+
+async def benchmark():
+    print(f"🚀 Index benchmark on '{BENCH_DB_NAME}' with {NUM_DOCS:,} docs per collection")
+    await seed()
+
+    print("Measuring collection scans...")
+    scans = {}
+    for label, name, query, sort in QUERIES:
+        scans[label] = await time_query(db[name], query, sort, hint=[('$natural', 1)])
+
+    print("Creating registry indexes...")
+    for name in SEEDERS:
+        await db[name].create_indexes(INDEXES[name])
+
+    print("Measuring index scans...")
+    print(f"\n{'query':<20} {'scan p50':>10} {'scan p95':>10} {'index p50':>10} {'index p95':>10} {'speedup':>8}")
+    for label, name, query, sort in QUERIES:
+        indexed = await time_query(db[name], query, sort)
+        scan = scans[label]
+        print(f"{label:<20} {scan[0]:>9.2f}ms {scan[1]:>9.2f}ms {indexed[0]:>9.2f}ms {indexed[1]:>9.2f}ms "
+              f"{scan[0] / max(indexed[0], 0.001):>7.0f}x")
+
+    await client.drop_database(BENCH_DB_NAME)
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Lawyer Directory Search Benchmark for Lxwyer Up
+Seeds a scratch database with N lawyer profiles and measures
+GET /api/lawyers/search latency for common filter/sort combinations.
+
+Usage: python bench_lawyer_search.py [num_lawyers]   (default 100,000)
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+import random
+from pathlib import Path
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR))
+
+# Point the app at a scratch database before anything connects
+os.environ['DB_NAME'] = os.environ.get('BENCH_DB_NAME', 'lxwyerup_bench')
+load_dotenv(ROOT_DIR / '.env')
+
+from httpx import AsyncClient, ASGITransport
+from server import app
+from services.database import db, client as mongo_client
+from services.indexes import INDEXES
+from services.lawyer_search import search_fields
+
+NUM_LAWYERS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+BATCH_SIZE = 5_000
+RUNS = 20
+
+STATES = {
+    'Delhi': ['New Delhi', 'Dwarka', 'Rohini'],
+    'Maharashtra': ['Mumbai', 'Pune', 'Nagpur'],
+    'Karnataka': ['Bengaluru', 'Mysuru'],
+    'Uttar Pradesh': ['Lucknow', 'Noida', 'Kanpur'],
+    'Haryana': ['Gurugram', 'Faridabad'],
+}
+COURTS = ['Supreme Court', 'High Court', 'District Court', 'Family Court', 'Consumer Court']
+SPECIALIZATIONS = ['Criminal Law', 'Family Law', 'Corporate Law', 'Property Law', 'Civil Law', 'Tax Law', 'Cyber Law']
+LANGUAGES = ['Hindi', 'English', 'Marathi', 'Kannada', 'Punjabi', 'Urdu']
+FEES = ['₹2,000 - ₹5,000', '₹5,000 - ₹15,000', '₹15,000 - ₹30,000', '₹30,000 - ₹75,000']
+
+SCENARIOS = [
+    ('unfiltered, relevance', {}),
+    ('state + city', {'state': 'Maharashtra', 'city': 'Mumbai'}),
+    ('specialization, rating sort', {'specialization': 'Family Law', 'sort': 'rating'}),
+    ('languages + min rating', {'languages': ['Hindi', 'Marathi'], 'min_rating': 4.0}),
+    ('fee budget, fee sort', {'fee_max': 10000, 'sort': 'fee'}),
+    ('deep filter', {'state': 'Delhi', 'specialization': 'Criminal Law', 'min_experience': 10, 'sort': 'experience'}),
+]
+
+
+def make_lawyer(i):
+    state = random.choice(list(STATES))
+    lawyer = {
+        'id': str(uuid.uuid4()),
+        'email': f'bench_lawyer_{i}@example.com',
+        'full_name': f'Adv. Bench {i}',
+        'user_type': 'lawyer',
+        'state': state,
+        'city': random.choice(STATES[state]),
+        'court': random.choice(COURTS),
+        'specialization': random.choice(SPECIALIZATIONS),
+        'languages': random.sample(LANGUAGES, random.randint(1, 3)),
+        'experience_years': random.randint(1, 35),
+        'cases_won': random.randint(0, 400),
+        'rating': round(random.uniform(3.0, 5.0), 1),
+        'fee_range': random.choice(FEES),
+        'is_verified': True,
+    }
+    lawyer['search'] = search_fields(lawyer)
+    return lawyer
+
+
+async def time_scenario(client, params):
+    samples = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        res = await client.get("/api/lawyers/search", params=params)
+        samples.append((time.perf_counter() - started) * 1000)
+        assert res.status_code == 200, res.text
+    samples.sort()
+    data = res.json()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.95) - 1], data
+
+
+async def benchmark():
+    print(f"🚀 Lawyer search benchmark on '{os.environ['DB_NAME']}' with {NUM_LAWYERS:,} profiles")
+    await db.users.drop()
+    for start in range(0, NUM_LAWYERS, BATCH_SIZE):
+        await db.users.insert_many([make_lawyer(i) for i in range(start, min(start + BATCH_SIZE, NUM_LAWYERS))])
+    await db.users.create_indexes(INDEXES['users'])
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        print(f"\n{'scenario':<30} {'first p50':>10} {'first p95':>10} {'page2 p50':>10} {'matches':>9}")
+        for label, params in SCENARIOS:
+            first_p50, first_p95, data = await time_scenario(client, params)
+            page2 = '-'
+            if data['next_cursor']:
+                page2_p50, _, _ = await time_scenario(client, {**params, 'cursor': data['next_cursor']})
+                page2 = f"{page2_p50:.2f}ms"
+            print(f"{label:<30} {first_p50:>8.2f}ms {first_p95:>8.2f}ms {page2:>10} {data['total']:>9,}")
+
+    await mongo_client.drop_database(os.environ['DB_NAME'])
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Login Load Benchmark for Lxwyer Up
+Fires concurrent /api/auth/login requests at the app in-process and reports
+latency percentiles plus any 503s shed by the password pool.
+
+Usage: python bench_login.py [concurrency] [rounds]   (default 200 clients, 3 rounds)
+"""
+
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+from dotenv import load_dotenv
+from httpx import AsyncClient, ASGITransport
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR))
+
+load_dotenv(ROOT_DIR / '.env')
+
+from server import app
+from services.database import db
+from services.password_pool import password_pool
+
+CONCURRENCY = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+ROUNDS = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+
+def percentile(samples, pct):
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+async def timed_login(client, login_data, latencies, statuses):
+    started = time.perf_counter()
+    res = await client.post("/api/auth/login", json=login_data)
+    latencies.append((time.perf_counter() - started) * 1000)
+    statuses[res.status_code] = statuses.get(res.status_code, 0) + 1
+
+
+async def heartbeat(stop, lags):
+    """Measure event-loop responsiveness while logins are in flight"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append((time.perf_counter() - started - 0.01) * 1000)
+
+
+async def benchmark():
+    print(f"🚀 Login benchmark: {CONCURRENCY} concurrent clients x {ROUNDS} rounds")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+        email = f"bench_{uuid.uuid4()}@example.com"
+        password = "password123"
+        res = await client.post("/api/auth/register", json={
+            "email": email, "password": password, "full_name": "Bench User", "user_type": "client"
+        })
+        if res.status_code != 200:
+            print(f"❌ Failed to register bench user: {res.text}")
+            return
+        login_data = {"email": email, "password": password, "user_type": "client"}
+
+        latencies, statuses, lags = [], {}, []
+        stop = asyncio.Event()
+        monitor = asyncio.create_task(heartbeat(stop, lags))
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            await asyncio.gather(*[timed_login(client, login_data, latencies, statuses) for _ in range(CONCURRENCY)])
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await monitor
+
+        await db.users.delete_one({"email": email, "user_type": "client"})
+
+    latencies.sort()
+    lags.sort()
+    print(f"Requests: {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:.1f} req/s)")
+    print(f"Status codes: {statuses}")
+    print(f"Latency p50={percentile(latencies, 50):.1f}ms p95={percentile(latencies, 95):.1f}ms "
+          f"p99={percentile(latencies, 99):.1f}ms")
+    if lags:
+        print(f"Event loop lag p99={percentile(lags, 99):.1f}ms max={lags[-1]:.1f}ms")
+    print(f"Password pool: {password_pool.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Profile Photo Storage Benchmark for Lxwyer Up
+Seeds a scratch database with N lawyers carrying inline base64 photos, then
+measures `users` document size and the user lookup / GET /api/lawyers latency
+before and after migrating the photos to the uploads store.
+
+Usage: python bench_photo_storage.py [num_lawyers]   (default 2,000)
+"""
+
+import asyncio
+import base64
+import io
+import os
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR))
+
+# Point the app at a scratch database before anything connects
+os.environ['DB_NAME'] = os.environ.get('BENCH_DB_NAME', 'lxwyerup_bench')
+load_dotenv(ROOT_DIR / '.env')
+
+from httpx import AsyncClient, ASGITransport
+from PIL import Image
+from server import app
+from services.database import db, client as mongo_client
+from services.indexes import INDEXES
+from services.lawyer_search import search_fields
+from services.media import media_store
+
+NUM_LAWYERS = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+DISTINCT_PHOTOS = 50
+LOOKUPS = 500
+RUNS = 20
+
+
+def make_photo(seed):
+    """A noisy 600x600 JPEG (~100KB), roughly what a phone upload compresses to"""
+    rng = random.Random(seed)
+    image = Image.effect_noise((600, 600), 40 + seed % 30).convert('RGB')
+    image = Image.blend(image, Image.new('RGB', image.size, tuple(rng.randrange(256) for _ in range(3))), 0.5)
+    out = io.BytesIO()
+    image.save(out, 'JPEG', quality=90)
+    return 'data:image/jpeg;base64,' + base64.b64encode(out.getvalue()).decode()
+
+
+def make_lawyer(i, photo):
+    lawyer = {
+        'id': str(uuid.uuid4()),
+        'email': f'bench_photo_{i}@example.com',
+        'full_name': f'Adv. Bench {i}',
+        'user_type': 'lawyer',
+        'state': 'Delhi',
+        'city': 'New Delhi',
+        'specialization': random.choice(['Criminal Law', 'Family Law', 'Property Law']),
+        'experience_years': random.randint(1, 35),
+        'rating': round(random.uniform(3.0, 5.0), 1),
+        'is_verified': True,
+        'photo': photo,
+    }
+    lawyer['search'] = search_fields(lawyer)
+    return lawyer
+
+
+async def document_sizes():
+    result = await db.users.aggregate([
+        {'$group': {'_id': None, 'avg': {'$avg': {'$bsonSize': '$$ROOT'}}, 'max': {'$max': {'$bsonSize': '$$ROOT'}}}}
+    ]).to_list(1)
+    stats = await db.command('collStats', 'users')
+    return result[0]['avg'], result[0]['max'], stats['size']
+
+
+async def measure(client, ids):
+    started = time.perf_counter()
+    for user_id in random.sample(ids, min(LOOKUPS, len(ids))):
+        await db.users.find_one({'id': user_id}, {'_id': 0})
+    lookup_ms = (time.perf_counter() - started) * 1000 / min(LOOKUPS, len(ids))
+
+    samples = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        res = await client.get("/api/lawyers")
+        samples.append((time.perf_counter() - started) * 1000)
+        assert res.status_code == 200, res.text
+    samples.sort()
+    return lookup_ms, samples[len(samples) // 2], len(res.content)
+
+
+async def report(label, client, ids):
+    avg, largest, total = await document_sizes()
+    lookup_ms, list_p50, list_bytes = await measure(client, ids)
+    print(f"{label:<8} {avg / 1024:>9.1f}KB {largest / 1024:>9.1f}KB {total / 1024 / 1024:>9.1f}MB "
+          f"{lookup_ms:>9.2f}ms {list_p50:>9.2f}ms {list_bytes / 1024:>10.1f}KB")
+
+
+async def benchmark():
+    print(f"🚀 Photo storage benchmark on '{os.environ['DB_NAME']}' with {NUM_LAWYERS:,} lawyers")
+    await db.users.drop()
+    await db.lawyer_applications.drop()
+    photos = [make_photo(seed) for seed in range(DISTINCT_PHOTOS)]
+    lawyers = [make_lawyer(i, photos[i % DISTINCT_PHOTOS]) for i in range(NUM_LAWYERS)]
+    for start in range(0, NUM_LAWYERS, 500):
+        await db.users.insert_many(lawyers[start:start + 500])
+    await db.users.create_indexes(INDEXES['users'])
+    ids = [lawyer['id'] for lawyer in lawyers]
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        print(f"\n{'':<8} {'avg doc':>11} {'max doc':>11} {'users':>11} {'find_one':>11} {'GET p50':>11} {'GET body':>12}")
+        await report('inline', client, ids)
+
+        started = time.perf_counter()
+        counts = await media_store.migrate_inline_photos()
+        elapsed = time.perf_counter() - started
+        await report('url', client, ids)
+
+    stats = media_store.stats()
+    print(f"\n📦 Migrated {counts['users']['migrated']:,} users in {elapsed:.1f}s: "
+          f"{stats['stored']} files written, {stats['deduplicated']:,} deduplicated")
+
+    await mongo_client.drop_database(os.environ['DB_NAME'])
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark())
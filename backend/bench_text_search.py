@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Lawyer Text Search Benchmark for Lxwyer Up
+Seeds a scratch database with N lawyer profiles (English and Hindi bios) and
+measures GET /api/lawyers/text-search and /api/lawyers/autocomplete latency
+against the TEXT_SEARCH_P95_TARGET_MS target.
+
+Usage: python bench_text_search.py [num_lawyers]   (default 50,000)
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+import random
+from pathlib import Path
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR))
+
+# Point the app at a scratch database before anything connects
+os.environ['DB_NAME'] = os.environ.get('BENCH_DB_NAME', 'lxwyerup_bench')
+load_dotenv(ROOT_DIR / '.env')
+
+from httpx import AsyncClient, ASGITransport
+from server import app
+from services.database import db, client as mongo_client
+from services.text_search import text_search, TEXT_SEARCH_P95_TARGET_MS
+
+NUM_LAWYERS = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+BATCH_SIZE = 5_000
+RUNS = 50
+
+CITIES = ['New Delhi', 'Mumbai', 'Pune', 'Bengaluru', 'Lucknow', 'Noida', 'Gurugram']
+SPECIALIZATIONS = ['Criminal Law', 'Family Law', 'Corporate Law', 'Property Law', 'Civil Law', 'Tax Law', 'Cyber Law']
+BIOS = [
+    'Handles divorce, child custody and maintenance disputes with a focus on mediation.',
+    'Experienced in bail matters, criminal trials and appeals before the High Court.',
+    'Advises startups on company incorporation, contracts and GST compliance.',
+    'तलाक, भरण-पोषण और बच्चों की कस्टडी के मामलों में अनुभवी वकील।',
+    'ज़मीन और संपत्ति विवाद, किरायेदारी और रजिस्ट्री से जुड़े मुकदमे।',
+    'Represents clients in cyber fraud, data theft and online harassment cases.',
+]
+EDUCATION = ['LLB, Delhi University', 'LLM, National Law School', 'BA LLB, Symbiosis Law School']
+
+QUERIES = [
+    ('single word', 'divorce'),
+    ('two words', 'property dispute'),
+    ('hindi', 'तलाक'),
+    ('mixed', 'bail high court'),
+    ('prefix (typing)', 'cyber fra'),
+]
+
+
+def make_lawyer(i):
+    return {
+        'id': str(uuid.uuid4()),
+        'email': f'bench_text_{i}@example.com',
+        'full_name': f'Adv. Bench {i}',
+        'user_type': 'lawyer',
+        'city': random.choice(CITIES),
+        'specialization': random.choice(SPECIALIZATIONS),
+        'education': random.choice(EDUCATION),
+        'bio': random.choice(BIOS),
+        'rating': round(random.uniform(3.0, 5.0), 1),
+    }
+
+
+async def time_requests(client, path, q):
+    samples = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        res = await client.get(path, params={'q': q})
+        samples.append((time.perf_counter() - started) * 1000)
+        assert res.status_code == 200, res.text
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.95) - 1]
+
+
+async def benchmark():
+    print(f"🚀 Text search benchmark on '{os.environ['DB_NAME']}' with {NUM_LAWYERS:,} profiles")
+    await db.users.drop()
+    for start in range(0, NUM_LAWYERS, BATCH_SIZE):
+        await db.users.insert_many([make_lawyer(i) for i in range(start, min(start + BATCH_SIZE, NUM_LAWYERS))])
+
+    started = time.perf_counter()
+    await text_search.build()
+    print(f"📚 Index built in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        print(f"\n{'query':<20} {'search p50':>11} {'search p95':>11} {'autocomplete p95':>17}")
+        for label, q in QUERIES:
+            p50, p95 = await time_requests(client, "/api/lawyers/text-search", q)
+            _, ac_p95 = await time_requests(client, "/api/lawyers/autocomplete", q)
+            flag = '✅' if p95 <= TEXT_SEARCH_P95_TARGET_MS else '⚠️'
+            print(f"{label:<20} {p50:>9.2f}ms {p95:>9.2f}ms {ac_p95:>15.2f}ms {flag}")
+
+    print(f"\n🎯 In-index p95 (target {TEXT_SEARCH_P95_TARGET_MS}ms): {text_search.stats()['lawyer']['p95_ms']}ms")
+    await mongo_client.drop_database(os.environ['DB_NAME'])
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark())
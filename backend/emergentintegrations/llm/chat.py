@@ -3,9 +3,32 @@
 This is a local mock since the real emergentintegrations package is only available
 on the Emergent cloud platform. The AI chat feature won't produce real LLM responses
 when using this stub.
+
+`stream_message` simulates token streaming so time-to-first-card can be measured
+offline; LLM_STUB_FIRST_TOKEN_MS and LLM_STUB_TOKEN_MS set the simulated latency.
 """
 
+import asyncio
 import json
+import os
+
+STUB_RESPONSE = {
+    "cards": [
+        {
+            "type": "info",
+            "title": "Service Unavailable",
+            "content": "The AI chat service is not available in local development mode. Please deploy to the Emergent platform for full AI functionality."
+        },
+        {
+            "type": "action",
+            "title": "Talk to a Lawyer",
+            "content": "You can still browse verified lawyers and book a consultation from the Find Lawyer page."
+        }
+    ]
+}
+
+# Roughly one LLM token
+STUB_CHUNK_CHARS = 4
 
 
 class UserMessage:
@@ -29,13 +52,16 @@ class LlmChat:
 
     async def send_message(self, message: UserMessage) -> str:
         """Return a placeholder JSON response matching the expected card format."""
-        response = {
-            "cards": [
-                {
-                    "type": "info",
-                    "title": "Service Unavailable",
-                    "content": "The AI chat service is not available in local development mode. Please deploy to the Emergent platform for full AI functionality."
-                }
-            ]
-        }
-        return json.dumps(response)
+        return "".join([chunk async for chunk in self.stream_message(message)])
+
+    async def stream_message(self, message: UserMessage):
+        """Yield the placeholder response a few characters at a time, like a token stream."""
+        first_token_delay = float(os.environ.get("LLM_STUB_FIRST_TOKEN_MS", "0")) / 1000
+        token_delay = float(os.environ.get("LLM_STUB_TOKEN_MS", "0")) / 1000
+        response = json.dumps(STUB_RESPONSE)
+
+        await asyncio.sleep(first_token_delay)
+        for start in range(0, len(response), STUB_CHUNK_CHARS):
+            if start and token_delay:
+                await asyncio.sleep(token_delay)
+            yield response[start:start + STUB_CHUNK_CHARS]
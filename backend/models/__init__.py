@@ -1,8 +1,8 @@
 # Models Package
 from .user import User, UserCreate, UserLogin, TokenResponse
 from .case import Case, CaseCreate
-from .document import Document, DocumentCreate
-from .chat import ChatMessage, ChatResponse
+from .document import Document, DocumentCreate, UploadSessionCreate, UploadComplete
+from .chat import ChatMessage, ChatCard, ChatResponse
 from .booking import Booking, BookingCreate
 from .waitlist import Waitlist, WaitlistCreate
 from .lawyer_application import LawyerApplication, LawyerApplicationCreate, AdminLogin
@@ -10,8 +10,8 @@ from .lawyer_application import LawyerApplication, LawyerApplicationCreate, Admi
 __all__ = [
     'User', 'UserCreate', 'UserLogin', 'TokenResponse',
     'Case', 'CaseCreate',
-    'Document', 'DocumentCreate',
-    'ChatMessage', 'ChatResponse',
+    'Document', 'DocumentCreate', 'UploadSessionCreate', 'UploadComplete',
+    'ChatMessage', 'ChatCard', 'ChatResponse',
     'Booking', 'BookingCreate',
     'Waitlist', 'WaitlistCreate',
     'LawyerApplication', 'LawyerApplicationCreate', 'AdminLogin'
@@ -20,5 +20,25 @@ class Document(BaseModel):
     file_url: str
     file_type: str
     file_size: Optional[int] = None
+    content_hash: Optional[str] = None # SHA-256 of the stored blob
     shared_with: List[str] = Field(default_factory=list) # List of user IDs
     uploaded_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Filled in by the background processing pipeline
+    processing_status: Optional[str] = None # queued, done, failed
+    processing_error: Optional[str] = None
+    page_count: Optional[int] = None
+    text_chars: Optional[int] = None
+    thumbnail_url: Optional[str] = None
+    preview_url: Optional[str] = None
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: int = Field(ge=0)
+    content_type: Optional[str] = None
+    case_id: Optional[str] = None
+    title: Optional[str] = None
+
+
+class UploadComplete(BaseModel):
+    sha256: str = Field(pattern=r'^[0-9a-fA-F]{64}$')
@@ -36,6 +36,7 @@ class LawyerApplication(BaseModel):
     password_hash: str
     office_address: Optional[str] = None
     photo: Optional[str] = None
+    photo_thumbnail: Optional[str] = None
     bar_council_number: str
     specialization: str
     experience: int
@@ -16,6 +16,7 @@ from .messages import router as messages_router
 from .network import router as network_router
 from .events import router as events_router
 from .notifications import router as notifications_router
+from .realtime import router as realtime_router
 
 __all__ = [
     'auth_router',
@@ -34,5 +35,6 @@ __all__ = [
     'messages_router',
     'network_router',
     'events_router',
-    'notifications_router'
+    'notifications_router',
+    'realtime_router'
 ]
@@ -1,15 +1,32 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from bson import ObjectId
-from datetime import datetime, timezone
-import uuid
+import asyncio
 import os
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
 
 from models.lawyer_application import AdminLogin
 from services.database import db
 from services.auth import create_admin_token, verify_admin_token
+from services.indexes import check_indexes
+from services.user_cache import invalidate_user, user_cache
+from services.password_pool import password_pool
+from services.realtime import hub
+from services.notification_queue import notification_queue
+from services.text_search import text_search
+from services.llm_pool import llm_clients
+from services.chat_cache import chat_cache
+from services.chat_context import chat_summarizer
+from services.media import media_store
+from services.blob_store import blob_store
+from services.chunked_uploads import chunked_uploads
+from services.document_processing import document_processor
+from services.document_search import document_search
+from services.applications import (
+    lawyer_user_from_application, lawfirm_user_from_application, status_counts, list_applications,
+    bulk_review, collection_for, find_applications, MAX_BULK_IDS
+)
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 security = HTTPBearer()
@@ -35,21 +52,17 @@ async def admin_login(login: AdminLogin):
 
 
 @router.get("/lawyer-applications")
-async def get_lawyer_applications(admin: dict = Depends(get_admin)):
-    """Get all lawyer applications"""
-    applications = await db.lawyer_applications.find({}).to_list(1000)
-    
-    # Convert ObjectId to string
-    for app in applications:
-        app['_id'] = str(app['_id'])
-    
-    # Calculate stats
-    stats = {
-        'pending': len([a for a in applications if a.get('status') == 'pending']),
-        'approved': len([a for a in applications if a.get('status') == 'approved']),
-        'rejected': len([a for a in applications if a.get('status') == 'rejected'])
-    }
-    
+async def get_lawyer_applications(
+    status: Optional[Literal['pending', 'approved', 'rejected']] = None,
+    limit: int = Query(200, ge=1, le=1000),
+    admin: dict = Depends(get_admin)
+):
+    """Newest lawyer applications (list form, no inline photos) with counts by status"""
+    query = {'status': status} if status else {}
+    applications, stats = await asyncio.gather(
+        find_applications(db.lawyer_applications, query, limit),
+        status_counts(db.lawyer_applications)
+    )
     return {'applications': applications, 'stats': stats}
 
 
@@ -72,34 +85,10 @@ async def approve_lawyer_application(app_id: str, admin: dict = Depends(get_admi
         )
         
         # Create lawyer user account
-        user_data = {
-            'id': str(uuid.uuid4()),
-            'email': application['email'],
-            'password': application.get('password_hash') or application.get('password'),
-            'full_name': application.get('full_name') or application.get('name'),
-            'user_type': 'lawyer',
-            'phone': application['phone'],
-            'created_at': datetime.now(timezone.utc).isoformat(),
-            'is_approved': True,
-            # Lawyer specific fields
-            'photo': application.get('photo'),
-            'bar_council_number': application.get('bar_council_number'),
-            'specialization': application.get('specialization'),
-            'experience_years': application.get('experience_years') or application.get('experience'),
-            'cases_won': application.get('cases_won', 0),
-            'state': application.get('state'),
-            'city': application.get('city'),
-            'court': application.get('court', ''),
-            'education': application.get('education'),
-            'languages': application.get('languages', []),
-            'fee_range': application.get('fee_range', '₹5,000 - ₹15,000'),
-            'bio': application.get('bio', 'Experienced lawyer'),
-            'office_address': application.get('office_address'),
-            'rating': 4.5,
-            'is_verified': True
-        }
+        user_data = lawyer_user_from_application(application)
         
         await db.users.insert_one(user_data)
+        text_search.index_profile(user_data)
         
         return {'message': 'Application approved successfully'}
     except Exception as e:
@@ -131,23 +120,73 @@ async def reject_lawyer_application(app_id: str, admin: dict = Depends(get_admin
     return {'message': 'Application rejected'}
 
 
+class BulkReview(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_BULK_IDS)
+    action: Literal['approve', 'reject']
+
+
+# Collections whose counts the admin dashboard shows
+STATS_COLLECTIONS = {
+    'lawyer': 'lawyer_applications',
+    'lawfirm': 'lawfirm_applications',
+    'firm_lawyer': 'firm_lawyer_applications',
+    'firm_client': 'firm_client_applications',
+}
+
+
+@router.get("/applications/stats")
+async def get_application_stats(admin: dict = Depends(get_admin)):
+    """Status counts for every application type, one index-covered $group per collection"""
+    counts = await asyncio.gather(*(status_counts(db[name]) for name in STATS_COLLECTIONS.values()))
+    return dict(zip(STATS_COLLECTIONS, counts))
+
+
+@router.get("/applications/{kind}")
+async def get_application_page(
+    kind: Literal['lawyer', 'lawfirm'],
+    status: Optional[Literal['pending', 'approved', 'rejected']] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    admin: dict = Depends(get_admin)
+):
+    """Newest-first page of applications without photos or password hashes; pass `next_cursor` back as `cursor`"""
+    return await list_applications(kind, status=status, cursor=cursor, limit=limit)
+
+
+@router.get("/applications/{kind}/{app_id}")
+async def get_application_detail(kind: Literal['lawyer', 'lawfirm'], app_id: str, admin: dict = Depends(get_admin)):
+    """One full application, including the photo left out of list responses"""
+    try:
+        object_id = ObjectId(app_id)
+    except Exception:
+        raise HTTPException(status_code=404, detail='Application not found')
+    application = await collection_for(kind).find_one({'_id': object_id}, {'password': 0, 'password_hash': 0})
+    if not application:
+        raise HTTPException(status_code=404, detail='Application not found')
+    application['_id'] = str(application['_id'])
+    return application
+
+
+@router.post("/applications/{kind}/bulk")
+async def bulk_review_applications(kind: Literal['lawyer', 'lawfirm'], review: BulkReview,
+                                   admin: dict = Depends(get_admin)):
+    """Approve or reject up to MAX_BULK_IDS pending applications in one request"""
+    return await bulk_review(kind, review.ids, review.action, reviewed_by=admin.get('email'))
+
+
 # Law Firm Application endpoints
 @router.get("/lawfirm-applications")
-async def get_lawfirm_applications(admin: dict = Depends(get_admin)):
-    """Get all law firm applications"""
-    applications = await db.lawfirm_applications.find({}).to_list(1000)
-    
-    # Convert ObjectId to string
-    for app in applications:
-        app['_id'] = str(app['_id'])
-    
-    # Calculate stats
-    stats = {
-        'pending': len([a for a in applications if a.get('status') == 'pending']),
-        'approved': len([a for a in applications if a.get('status') == 'approved']),
-        'rejected': len([a for a in applications if a.get('status') == 'rejected'])
-    }
-    
+async def get_lawfirm_applications(
+    status: Optional[Literal['pending', 'approved', 'rejected']] = None,
+    limit: int = Query(200, ge=1, le=1000),
+    admin: dict = Depends(get_admin)
+):
+    """Newest law firm applications (list form) with counts by status"""
+    query = {'status': status} if status else {}
+    applications, stats = await asyncio.gather(
+        find_applications(db.lawfirm_applications, query, limit),
+        status_counts(db.lawfirm_applications)
+    )
     return {'applications': applications, 'stats': stats}
 
 
@@ -169,33 +208,10 @@ async def approve_lawfirm_application(app_id: str, admin: dict = Depends(get_adm
     )
     
     # Create law firm user account
-    user_data = {
-        'id': str(uuid.uuid4()),
-        'email': application['contact_email'],
-        'password_hash': application['password_hash'],
-        'full_name': application['contact_name'],
-        'firm_name': application['firm_name'],
-        'user_type': 'law_firm',
-        'phone': application['contact_phone'],
-        'created_at': datetime.now(timezone.utc),
-        # Law firm specific fields
-        'registration_number': application['registration_number'],
-        'established_year': application['established_year'],
-        'website': application.get('website'),
-        'contact_designation': application.get('contact_designation'),
-        'address': application.get('address'),
-        'city': application['city'],
-        'state': application['state'],
-        'pincode': application.get('pincode'),
-        'practice_areas': application['practice_areas'],
-        'total_lawyers': application['total_lawyers'],
-        'total_staff': application.get('total_staff', 0),
-        'description': application['description'],
-        'achievements': application.get('achievements'),
-        'is_verified': True
-    }
+    user_data = lawfirm_user_from_application(application)
     
     await db.users.insert_one(user_data)
+    text_search.index_profile(user_data)
     
     return {'message': 'Law firm application approved successfully'}
 
@@ -226,7 +242,7 @@ class StateUpdate(BaseModel):
 @router.get("/lawyers", response_model=dict)
 async def get_all_lawyers(admin: dict = Depends(get_admin)):
     """Get all approved lawyers"""
-    lawyers = await db.users.find({'user_type': 'lawyer'}).to_list(1000)
+    lawyers = await db.users.find({'user_type': 'lawyer'}, {'search': 0}).to_list(1000)
     
     # Clean up data for frontend
     for lawyer in lawyers:
@@ -246,23 +262,36 @@ async def update_lawyer_state(lawyer_id: str, state_data: StateUpdate, admin: di
         # But we should check both or be consistent.
         # Based on approve_lawyer_application, we set 'id' to str(uuid.uuid4())
         
+        query = {'id': lawyer_id}
         result = await db.users.update_one(
-            {'id': lawyer_id},
+            query,
             {'$set': {'state': state_data.state}}
         )
         
         if result.matched_count == 0:
             # Try by _id just in case
             try:
+                query = {'_id': ObjectId(lawyer_id)}
                 result = await db.users.update_one(
-                    {'_id': ObjectId(lawyer_id)},
+                    query,
                     {'$set': {'state': state_data.state}}
                 )
+                if result.matched_count:
+                    lawyer = await db.users.find_one({'_id': ObjectId(lawyer_id)}, {'id': 1})
+                    if lawyer and lawyer.get('id'):
+                        await invalidate_user(lawyer['id'])
             except:
                 pass
+        else:
+            await invalidate_user(lawyer_id)
                 
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail='Lawyer not found')
+        
+        # State is a searchable field; refresh the lawyer's entry in the text index
+        lawyer = await db.users.find_one(query, {'_id': 0})
+        if lawyer:
+            text_search.index_profile(lawyer)
             
         return {'message': f'State updated to {state_data.state}'}
     except Exception as e:
@@ -270,3 +299,81 @@ async def update_lawyer_state(lawyer_id: str, state_data: StateUpdate, admin: di
             raise e
         raise HTTPException(status_code=500, detail=f'Failed to update state: {str(e)}')
 
+
+@router.get("/indexes")
+async def get_index_drift(admin: dict = Depends(get_admin)):
+    """Report indexes that are missing, mismatched or unregistered"""
+    drift = await check_indexes()
+    return {'in_sync': not drift, 'drift': drift}
+
+
+@router.get("/user-cache")
+async def get_user_cache_stats(admin: dict = Depends(get_admin)):
+    """Hit/miss counters for the authenticated-user cache"""
+    return user_cache.stats()
+
+
+@router.get("/password-pool")
+async def get_password_pool_stats(admin: dict = Depends(get_admin)):
+    """Queue depth and throughput of the password hashing pool"""
+    return password_pool.stats()
+
+
+@router.get("/realtime")
+async def get_realtime_stats(admin: dict = Depends(get_admin)):
+    """Connection and delivery counters for this worker's realtime hub"""
+    return hub.stats()
+
+
+@router.get("/notification-queue")
+async def get_notification_queue_stats(admin: dict = Depends(get_admin)):
+    """Queue depth and flush latency of the notification batcher"""
+    return notification_queue.stats()
+
+
+@router.get("/text-search")
+async def get_text_search_stats(admin: dict = Depends(get_admin)):
+    """Index size and query latency percentiles for lawyer/law firm text search"""
+    return text_search.stats()
+
+
+@router.get("/llm")
+async def get_llm_client_stats(admin: dict = Depends(get_admin)):
+    """Pooled LLM clients, per-provider in-flight/retry counters and chat summarisation runs"""
+    return {**llm_clients.stats(), 'summarizer': chat_summarizer.stats()}
+
+
+@router.get("/chat-cache")
+async def get_chat_cache_stats(admin: dict = Depends(get_admin)):
+    """Hit rates and most requested questions in the guest chat response cache"""
+    return chat_cache.stats()
+
+
+@router.get("/media")
+async def get_media_stats(admin: dict = Depends(get_admin)):
+    """Photos written to / deduplicated in the uploads store and migration progress"""
+    return media_store.stats()
+
+
+@router.post("/media/migrate-photos")
+async def migrate_inline_photos(admin: dict = Depends(get_admin)):
+    """Start moving inline base64 photos in users and applications to the uploads store"""
+    return {'started': media_store.start_migration()}
+
+
+@router.get("/storage")
+async def get_storage_stats(admin: dict = Depends(get_admin)):
+    """Document blob counts, stored vs. referenced bytes, GC progress, disk usage and resumable uploads"""
+    return {**await blob_store.stats(), 'uploads': await chunked_uploads.stats()}
+
+
+@router.get("/document-jobs")
+async def get_document_job_stats(admin: dict = Depends(get_admin)):
+    """Document processing queue by status, retries and average run time"""
+    return await document_processor.stats()
+
+
+@router.get("/document-search")
+async def get_document_search_stats(admin: dict = Depends(get_admin)):
+    """Documents (re)indexed for full-text search and query latency percentiles"""
+    return document_search.stats()
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from models.user import User, UserCreate, UserLogin, TokenResponse
-from services.auth import hash_password, verify_password, create_token, decode_token
+from services.auth import hash_password_async, verify_password_async, create_token, decode_session_token
 from services.database import db
+from services.user_cache import user_cache
+from services.lawyer_search import search_fields
+from services.text_search import text_search
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 security = HTTPBearer()
@@ -11,8 +14,8 @@ security = HTTPBearer()
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Dependency to get current authenticated user"""
     token = credentials.credentials
-    payload = decode_token(token)
-    user = await db.users.find_one({'id': payload['user_id']}, {'_id': 0})
+    payload = decode_session_token(token)
+    user = await user_cache.get_user(payload['user_id'])
     if not user:
         raise HTTPException(status_code=404, detail='User not found')
     return user
@@ -28,14 +31,17 @@ async def register_user(user_data: UserCreate):
         raise HTTPException(status_code=400, detail='User already exists')
     
     user_dict = user_data.model_dump()
-    hashed_pwd = hash_password(user_dict.pop('password'))
+    hashed_pwd = await hash_password_async(user_dict.pop('password'))
     user_obj = User(**user_dict)
     
     doc = user_obj.model_dump()
     doc['password'] = hashed_pwd
     doc['created_at'] = doc['created_at'].isoformat()
+    if doc['user_type'] == 'lawyer':
+        doc['search'] = search_fields(doc)
     
     await db.users.insert_one(doc)
+    text_search.index_profile(doc)
     
     token = create_token(user_obj.id, user_obj.user_type)
     user_response = user_obj.model_dump()
@@ -67,7 +73,7 @@ async def login(login_data: UserLogin):
     
     # Check both password fields (password_hash for lawyers, password for regular users)
     password_field = user.get('password_hash') or user.get('password')
-    if not password_field or not verify_password(login_data.password, password_field):
+    if not password_field or not await verify_password_async(login_data.password, password_field):
         raise HTTPException(status_code=401, detail='Invalid credentials')
     
     # Check if firm_lawyer is active
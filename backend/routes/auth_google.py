@@ -3,6 +3,7 @@ from google.oauth2 import id_token
 from google.auth.transport import requests
 from services.database import db
 from services.auth import create_token
+from services.user_cache import invalidate_user
 from models.user import User, TokenResponse
 from datetime import datetime, timezone
 import os
@@ -34,6 +35,7 @@ async def google_login(token: str = Body(..., embed=True), user_type: str = Body
             # Login existing user
             # Update user info if needed (e.g. picture)
             await db.users.update_one({'email': email}, {'$set': {'picture': picture}})
+            await invalidate_user(user['id'])
             
             # Use existing user data
             user_id = user['id']
@@ -2,10 +2,14 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import List
 from datetime import datetime
 import uuid
+from pymongo import ReturnDocument
 from models.booking import Booking, BookingCreate
 from services.database import db
 from routes.auth import get_current_user
 from .notifications import create_notification
+from services.lawyer_stats import record_booking, move_booking
+from services.availability import availability, booking_interval, INACTIVE_BOOKING_STATUSES
+from services.slot_reservations import reserve, release, slot_keys
 
 router = APIRouter(prefix="/bookings", tags=["Bookings"])
 
@@ -51,40 +55,16 @@ async def create_booking(booking_data: BookingCreate, current_user: dict = Depen
     
     is_free_trial = False
     price = booking_data.price
-    from datetime import timedelta
     
-    # CONFLICT CHECKING
-    try:
-        # Parse booking start time
-        # Handle time formats "HH:MM" or "HH:MM AM/PM"
-        time_str = booking_data.time.strip()
-        date_str = booking_data.date
-        
-        try:
-             # Try 24hr format first
-             start_dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-        except ValueError:
-             # Try 12hr format
-             start_dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %I:%M %p")
-             
-        end_dt = start_dt + timedelta(minutes=booking_data.duration_minutes)
-        
-        # Check against Events
-        conflict_event = await db.events.find_one({
-            "lawyer_id": booking_data.lawyer_id,
-            "start_time": {"$lt": end_dt.isoformat()},
-            "end_time": {"$gt": start_dt.isoformat()}
-        })
-        
-        if conflict_event:
+    # CONFLICT CHECKING (calendar events and existing bookings)
+    interval = booking_interval(booking_data.model_dump())
+    if interval:
+        schedule = await availability.get(booking_data.lawyer_id)
+        if not schedule.is_free(*interval):
             raise HTTPException(status_code=400, detail="Lawyer is not available at this time (Calendar Conflict)")
-            
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error checking conflicts: {e}")
+    else:
         # If date parsing fails, proceed but log the warning
-        pass
+        print(f"Error checking conflicts: unparseable date/time {booking_data.date} {booking_data.time}")
 
     if previous_bookings_count < 3:
         is_free_trial = True
@@ -131,7 +111,17 @@ async def create_booking(booking_data: BookingCreate, current_user: dict = Depen
     doc = booking_obj.model_dump()
     doc['created_at'] = doc['created_at'].isoformat()
     
-    await db.bookings.insert_one(doc)
+    # Atomically claim the slot; concurrent requests for it lose here
+    if interval and not await reserve(booking_data.lawyer_id, booking_obj.id, interval):
+        raise HTTPException(status_code=400, detail="Lawyer is not available at this time (Calendar Conflict)")
+    
+    try:
+        await db.bookings.insert_one(doc)
+    except Exception:
+        await release(booking_obj.id)
+        raise
+    await record_booking(doc)
+    availability.add_booking(doc)
     
     # Notify Lawyer
     await create_notification(
@@ -167,17 +157,34 @@ async def update_booking_status(booking_id: str, status: str, current_user: dict
     if current_user['user_type'] != 'lawyer':
         raise HTTPException(status_code=403, detail='Only lawyers can update booking status')
     
-    result = await db.bookings.update_one(
+    previous = await db.bookings.find_one_and_update(
         {'id': booking_id, 'lawyer_id': current_user['id']},
-        {'$set': {'status': status}}
+        {'$set': {'status': status}},
+        return_document=ReturnDocument.BEFORE
     )
     
-    if result.modified_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail='Booking not found')
     
+    if status in INACTIVE_BOOKING_STATUSES:
+        await release(booking_id)
+    elif previous.get('status') in INACTIVE_BOOKING_STATUSES:
+        # Reviving a cancelled/rejected booking takes its slot back, unless it has been booked since
+        interval = booking_interval(previous)
+        if interval:
+            schedule = await availability.get(current_user['id'])
+            if not schedule.is_free(*interval, ignore=f"booking:{booking_id}") \
+                    or not await reserve(current_user['id'], booking_id, interval):
+                await db.bookings.update_one(
+                    {'id': booking_id, 'status': status},
+                    {'$set': {'status': previous.get('status')}}
+                )
+                raise HTTPException(status_code=400, detail="Lawyer is not available at this time (Calendar Conflict)")
+    
     # Get booking to find client_id
     booking = await db.bookings.find_one({'id': booking_id})
     if booking:
+        availability.add_booking(booking)
         title = "Consultation Accepted" if status == 'confirmed' else f"Consultation Status: {status}"
         message = f"Your consultation for {booking['date']} has been {status}."
         await create_notification(
@@ -196,16 +203,37 @@ async def reschedule_booking(booking_id: str, date: str, time: str, current_user
     if current_user['user_type'] != 'lawyer':
         raise HTTPException(status_code=403, detail='Only lawyers can reschedule consultations')
     
+    booking = await db.bookings.find_one({'id': booking_id, 'lawyer_id': current_user['id']})
+    if not booking:
+        raise HTTPException(status_code=404, detail='Booking not found')
+    
+    # Claim the new slot before moving the booking; the old one is freed after
+    old_interval = booking_interval(booking)
+    old_keys = slot_keys(*old_interval) if old_interval else []
+    interval = booking_interval({**booking, 'date': date, 'time': time})
+    if interval:
+        schedule = await availability.get(current_user['id'])
+        if not schedule.is_free(*interval, ignore=f"booking:{booking_id}"):
+            raise HTTPException(status_code=400, detail="Lawyer is not available at this time (Calendar Conflict)")
+        if not await reserve(current_user['id'], booking_id, interval):
+            raise HTTPException(status_code=400, detail="Lawyer is not available at this time (Calendar Conflict)")
+    
     result = await db.bookings.update_one(
         {'id': booking_id, 'lawyer_id': current_user['id']},
         {'$set': {'date': date, 'time': time, 'status': 'rescheduled'}}
     )
     
     if result.modified_count == 0:
+        if interval:
+            await release(booking_id, keep=old_keys)
         raise HTTPException(status_code=404, detail='Booking not found')
     
+    await release(booking_id, keep=slot_keys(*interval) if interval else None)
+    await move_booking(current_user['id'], booking.get('date'), date, booking.get('price'))
+    
     booking = await db.bookings.find_one({'id': booking_id})
     if booking:
+        availability.add_booking(booking)
         await create_notification(
             user_id=booking['client_id'],
             title="Consultation Rescheduled",
@@ -234,8 +262,11 @@ async def cancel_booking(booking_id: str, reason: str = "", current_user: dict =
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail='Booking not found')
     
+    await release(booking_id)
+    
     booking = await db.bookings.find_one({'id': booking_id})
     if booking:
+        availability.remove_booking(booking['lawyer_id'], booking_id)
         # Notify the other party
         target_user_id = booking['client_id'] if current_user['user_type'] == 'lawyer' else booking['lawyer_id']
         await create_notification(
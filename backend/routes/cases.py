@@ -4,6 +4,7 @@ from datetime import datetime
 from models.case import Case, CaseCreate
 from services.database import db
 from routes.auth import get_current_user
+from services.lawyer_stats import record_case
 
 router = APIRouter(prefix="/cases", tags=["Cases"])
 
@@ -20,6 +21,7 @@ async def create_case(case_data: CaseCreate, current_user: dict = Depends(get_cu
     doc['updated_at'] = doc['updated_at'].isoformat()
     
     await db.cases.insert_one(doc)
+    await record_case(doc)
     return case_obj
 
 
@@ -1,12 +1,120 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+import json
 import uuid
+import logging
 from datetime import datetime, timezone
+from typing import Optional
 from models.chat import ChatMessage, ChatResponse
 from services.database import db
-from services.chat_service import send_chat_message, generate_guest_session_id
+from services.chat_service import (
+    send_chat_message, stream_chat_message, generate_guest_session_id, CardStreamParser, DEFAULT_SYSTEM_PROMPT
+)
+from services.chat_cache import chat_cache
+from services.chat_context import build_context_message, chat_summarizer
+from services.chat_cards import parse_cards, normalize_card, cards_json, CARD_TYPES
+from services.pagination import encode_cursor, decode_cursor, keyset_filter
 from routes.auth import get_current_user
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
+logger = logging.getLogger(__name__)
+
+
+HISTORY_SORT = [('timestamp', -1), ('id', -1)]
+
+
+def validated_reply(raw: str) -> tuple:
+    """(canonical response JSON, cards, repaired) for a raw LLM reply"""
+    cards, repaired = parse_cards(raw)
+    if repaired:
+        logger.info(f'Repaired malformed chat reply ({len(cards)} cards kept)')
+    return cards_json(cards), cards, repaired
+
+
+async def save_chat_history(user_id: str, session_id: str, message: str, raw_response: str, cards: list,
+                            repaired: bool = False) -> None:
+    # The model's own text is kept as-is; `cards` is the validated (possibly truncated) form
+    chat_history = {
+        'id': str(uuid.uuid4()),
+        'user_id': user_id,
+        'session_id': session_id,
+        'message': message,
+        'raw_response': raw_response,
+        'cards': cards,
+        'repaired': repaired,
+        'timestamp': datetime.now(timezone.utc).isoformat()
+    }
+    await db.chat_history.insert_one(chat_history)
+
+
+def lookup_guest_cache(request: Request, chat_msg: ChatMessage) -> tuple:
+    """(cached reply or None, outcome); `X-Chat-Cache: bypass` or `Cache-Control: no-cache` skip the read"""
+    if (request.headers.get('x-chat-cache', '').lower() == 'bypass'
+            or 'no-cache' in request.headers.get('cache-control', '').lower()):
+        chat_cache.record_bypass()
+        return None, 'bypass'
+    return chat_cache.get(chat_msg.message, chat_msg.system_prompt or DEFAULT_SYSTEM_PROMPT)
+
+
+def store_guest_reply(chat_msg: ChatMessage, response: str, cards: list) -> None:
+    # Only cache replies that actually contain cards, never errors or empty output
+    if cards:
+        chat_cache.set(chat_msg.message, chat_msg.system_prompt or DEFAULT_SYSTEM_PROMPT, response)
+
+
+def stream_chat_response(request: Request, chat_msg: ChatMessage, session_id: str, user_id: str = None,
+                         cached: str = None, cache_outcome: str = None, prompt_message: str = None):
+    """
+    Stream the reply as NDJSON (default) or SSE when the client accepts text/event-stream.
+    Events: `session`, one validated `card` per completed card, then `done` with
+    the canonical response and all cards (repaired if needed), or `error`. History is written once, after the last token.
+    A `cached` reply is replayed instead of calling the LLM; `prompt_message`
+    (the message with conversation context) is what the LLM is sent.
+    """
+    sse = 'text/event-stream' in request.headers.get('accept', '')
+
+    async def replay():
+        yield cached
+
+    def encode(event: dict) -> str:
+        if sse:
+            return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        return json.dumps(event) + "\n"
+
+    async def events():
+        yield encode({'type': 'session', 'session_id': session_id})
+        parser = CardStreamParser()
+        try:
+            chunks = replay() if cached is not None else stream_chat_message(
+                prompt_message or chat_msg.message, session_id, chat_msg.system_prompt, stateless=prompt_message is not None
+            )
+            async for chunk in chunks:
+                for card in filter(None, map(normalize_card, parser.feed(chunk))):
+                    yield encode({'type': 'card', 'card': card})
+        except HTTPException as e:
+            yield encode({'type': 'error', 'detail': e.detail})
+            return
+        except Exception as e:
+            logger.error(f'Chat stream error: {str(e)}')
+            yield encode({'type': 'error', 'detail': f'Chat service error: {str(e)}'})
+            return
+        
+        response, cards, repaired = validated_reply(parser.text)
+        if user_id:
+            await save_chat_history(user_id, session_id, chat_msg.message, parser.text, cards, repaired)
+            chat_summarizer.schedule(user_id)
+        if cache_outcome in ('miss', 'bypass'):
+            store_guest_reply(chat_msg, response, cards)
+        yield encode({'type': 'done', 'session_id': session_id, 'response': response, 'cards': cards})
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if cache_outcome:
+        headers["X-Chat-Cache"] = cache_outcome
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers=headers
+    )
 
 
 @router.post("", response_model=ChatResponse)
@@ -14,45 +122,90 @@ async def chat(chat_msg: ChatMessage, current_user: dict = Depends(get_current_u
     """Send a message to AI assistant (authenticated)"""
     session_id = current_user['id']
     
-    response = await send_chat_message(
-        message=chat_msg.message,
+    # Prior turns are supplied explicitly (bounded), not kept by the LLM client
+    reply = await send_chat_message(
+        message=await build_context_message(current_user['id'], chat_msg.message),
         session_id=session_id,
-        system_prompt=chat_msg.system_prompt
+        system_prompt=chat_msg.system_prompt,
+        stateless=True
     )
+    response, cards, repaired = validated_reply(reply)
     
-    # Save to chat history
-    chat_history = {
-        'id': str(uuid.uuid4()),
-        'user_id': current_user['id'],
-        'session_id': session_id,
-        'message': chat_msg.message,
-        'response': response,
-        'timestamp': datetime.now(timezone.utc).isoformat()
-    }
-    await db.chat_history.insert_one(chat_history)
+    await save_chat_history(current_user['id'], session_id, chat_msg.message, reply, cards, repaired)
+    chat_summarizer.schedule(current_user['id'])
     
-    return {'response': response, 'session_id': session_id}
+    return {'response': response, 'cards': cards, 'session_id': session_id}
+
+
+@router.post("/stream")
+async def chat_stream(request: Request, chat_msg: ChatMessage, current_user: dict = Depends(get_current_user)):
+    """Send a message to AI assistant and stream the cards as they are generated (authenticated)"""
+    prompt_message = await build_context_message(current_user['id'], chat_msg.message)
+    return stream_chat_response(request, chat_msg, current_user['id'], user_id=current_user['id'],
+                                prompt_message=prompt_message)
 
 
 @router.post("/guest", response_model=ChatResponse)
-async def guest_chat(chat_msg: ChatMessage):
+async def guest_chat(chat_msg: ChatMessage, request: Request, response: Response):
     """Send a message to AI assistant (no authentication required)"""
     session_id = chat_msg.session_id if chat_msg.session_id else generate_guest_session_id()
     
-    response = await send_chat_message(
-        message=chat_msg.message,
-        session_id=session_id,
-        system_prompt=chat_msg.system_prompt
-    )
+    reply, outcome = lookup_guest_cache(request, chat_msg)
+    if reply is None:
+        reply = await send_chat_message(
+            message=chat_msg.message,
+            session_id=session_id,
+            system_prompt=chat_msg.system_prompt
+        )
+    canonical, cards, _ = validated_reply(reply)
+    if outcome in ('miss', 'bypass'):
+        store_guest_reply(chat_msg, canonical, cards)
+    response.headers['X-Chat-Cache'] = outcome
     
-    return {'response': response, 'session_id': session_id}
+    return {'response': canonical, 'cards': cards, 'session_id': session_id}
+
+
+@router.post("/guest/stream")
+async def guest_chat_stream(request: Request, chat_msg: ChatMessage):
+    """Send a message to AI assistant and stream the cards as they are generated (no authentication required)"""
+    session_id = chat_msg.session_id if chat_msg.session_id else generate_guest_session_id()
+    cached, outcome = lookup_guest_cache(request, chat_msg)
+    return stream_chat_response(request, chat_msg, session_id, cached=cached, cache_outcome=outcome)
 
 
 @router.get("/history")
-async def get_chat_history(current_user: dict = Depends(get_current_user)):
-    """Get chat history for current user"""
-    history = await db.chat_history.find(
-        {'user_id': current_user['id']},
-        {'_id': 0}
-    ).sort('timestamp', -1).limit(50).to_list(50)
+async def get_chat_history(
+    response: Response,
+    before: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    card_type: Optional[str] = Query(None, enum=list(CARD_TYPES)),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Chat history for current user, newest first, with structured cards.
+    `card_type` keeps only turns (and cards) of that type. Pass X-Before-Cursor
+    back as `before` while X-Has-More is true to page further back.
+    """
+    query = {'user_id': current_user['id']}
+    if card_type:
+        query['cards.type'] = card_type
+    if before:
+        query = {'$and': [query, keyset_filter(HISTORY_SORT, decode_cursor(before, len(HISTORY_SORT)))]}
+    
+    cards = '$cards'
+    if card_type:
+        cards = {'$filter': {'input': '$cards', 'as': 'card', 'cond': {'$eq': ['$$card.type', card_type]}}}
+    
+    history = await db.chat_history.aggregate([
+        {'$match': query},
+        {'$sort': dict(HISTORY_SORT)},
+        {'$limit': limit + 1},
+        {'$project': {'_id': 0, 'id': 1, 'session_id': 1, 'message': 1, 'timestamp': 1, 'cards': cards}}
+    ]).to_list(limit + 1)
+    
+    has_more = len(history) > limit
+    history = history[:limit]
+    if has_more:
+        response.headers["X-Before-Cursor"] = encode_cursor(history[-1]['timestamp'], history[-1]['id'])
+    response.headers["X-Has-More"] = "true" if has_more else "false"
     return history
@@ -3,7 +3,9 @@ from typing import Dict, Any, List
 from routes.auth import get_current_user
 from services.database import get_db, db
 from models.user import User
-from datetime import datetime, timedelta
+from services.lawyer_stats import get_lawyer_stats, month_key
+from datetime import datetime, timedelta, timezone
+import asyncio
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
@@ -110,61 +112,45 @@ async def get_lawyer_dashboard(current_user: dict = Depends(get_current_user)):
         
     user_id = current_user["id"]
     
-    # 1. Active Cases
-    active_cases_count = await db.cases.count_documents({"user_id": user_id, "status": "active"})
+    async def upcoming_hearings():
+        hearings = []
+        async for case in db.cases.find({"user_id": user_id, "next_hearing": {"$ne": None}}).sort("next_hearing", 1).limit(5):
+            hearings.append({
+                "date": case.get("next_hearing"),
+                "court": case.get("court", "N/A"),
+                "case": case.get("title")
+            })
+        return hearings
     
-    # 2. Total Clients (Unique names)
-    pipeline = [
-        {"$match": {"user_id": user_id}},
-        {"$group": {"_id": "$client_name"}},
-        {"$count": "count"}
-    ]
-    try:
-        client_res = await db.cases.aggregate(pipeline).to_list(length=1)
-        total_clients = client_res[0]["count"] if client_res else 0
-    except Exception:
-        total_clients = 0
-
-    # 3. Consultations (Bookings) & Revenue
-    consultations_count = await db.bookings.count_documents({"lawyer_id": user_id})
-    
-    pipeline = [
-        {"$match": {"lawyer_id": user_id}},
-        {"$group": {"_id": None, "total": {"$sum": "$price"}}}
-    ]
-    try:
-        revenue_res = await db.bookings.aggregate(pipeline).to_list(length=1)
-        revenue = revenue_res[0]["total"] if revenue_res else 0
-    except Exception:
-        revenue = 0
+    async def recent_clients():
+        clients = []
+        async for case in db.cases.find({"user_id": user_id}).sort("created_at", -1).limit(5):
+            clients.append({
+                "name": case.get("client_name", "Unknown"),
+                "case": case.get("title"),
+                "status": case.get("status")
+            })
+        return clients
     
-    # 4. Hearings
-    upcoming_hearings = []
-    async for case in db.cases.find({"user_id": user_id, "next_hearing": {"$ne": None}}).sort("next_hearing", 1).limit(5):
-        upcoming_hearings.append({
-            "date": case.get("next_hearing"),
-            "court": case.get("court", "N/A"),
-            "case": case.get("title")
-        })
-        
-    # 5. Recent Clients
-    recent_clients = []
-    async for case in db.cases.find({"user_id": user_id}).sort("created_at", -1).limit(5):
-        recent_clients.append({
-            "name": case.get("client_name", "Unknown"),
-            "case": case.get("title"),
-            "status": case.get("status")
-        })
+    # Stats come from one precomputed document; the two lists are independent reads
+    stats, hearings, clients = await asyncio.gather(
+        get_lawyer_stats(user_id),
+        upcoming_hearings(),
+        recent_clients()
+    )
+    this_month = stats.get("months", {}).get(month_key(datetime.now(timezone.utc)), {})
 
     return {
         "stats": {
-            "active_cases": active_cases_count,
-            "total_clients": total_clients,
-            "consultations_this_month": consultations_count,
-            "revenue": revenue
+            "active_cases": stats.get("active_cases", 0),
+            "total_clients": stats.get("total_clients", 0),
+            "consultations_this_month": this_month.get("consultations", 0),
+            "revenue": stats.get("revenue", 0),
+            "revenue_this_month": this_month.get("revenue", 0),
+            "total_consultations": stats.get("consultations", 0)
         },
-        "upcoming_hearings": upcoming_hearings,
-        "recent_clients": recent_clients
+        "upcoming_hearings": hearings,
+        "recent_clients": clients
     }
 
 @router.get("/law-firm")
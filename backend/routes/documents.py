@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException
-from typing import List, Optional
+from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException, Query, Request
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from typing import List, Literal, Optional
 from datetime import datetime
 import os
-import shutil
 import uuid
 from pathlib import Path
-from models.document import Document, DocumentCreate
+from models.document import Document, DocumentCreate, UploadSessionCreate, UploadComplete
 from services.database import db
+from services.blob_store import blob_store
+from services.chunked_uploads import chunked_uploads, public_session
+from services.document_files import serve_document, serve_preview
+from services.document_processing import document_processor
+from services.document_search import document_search
+from services.auth import create_download_token, decode_download_token, decode_session_token, DOWNLOAD_TOKEN_SECONDS
 from routes.auth import get_current_user
 
 UPLOAD_DIR = Path(__file__).parent.parent / "uploads"
@@ -31,6 +37,7 @@ async def create_document(doc_data: DocumentCreate, current_user: dict = Depends
     doc['uploaded_at'] = doc['uploaded_at'].isoformat()
     
     await db.documents.insert_one(doc)
+    await document_search.index_document(doc_obj.id)
     return doc_obj
 
 
@@ -49,6 +56,23 @@ async def get_documents(case_id: Optional[str] = None, current_user: dict = Depe
             doc['uploaded_at'] = datetime.fromisoformat(dt_str)
     
     return documents
+
+
+@router.get("/search")
+async def search_documents(
+    q: str = Query(..., min_length=1, max_length=200),
+    case_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=20),
+    current_user: dict = Depends(get_current_user)
+):
+    """Full-text search over titles, case ids and extracted text of own and shared documents.
+
+    Results carry a snippet with [start, end) highlight offsets; pass `next_cursor` back for the next page.
+    """
+    return await document_search.search(current_user['id'], q, case_id=case_id, cursor=cursor, limit=limit)
+
+
 @router.post("/upload")
 async def upload_document(
     file: UploadFile = File(...),
@@ -56,37 +80,36 @@ async def upload_document(
     title: Optional[str] = Form(None),
     current_user: dict = Depends(get_current_user)
 ):
-    print(f"DEBUG: Receiving file upload: {file.filename}, type: {file.content_type}")
     print(f"DEBUG: Receiving file upload: {file.filename}, type: {file.content_type}")
     file_id = str(uuid.uuid4())
-    file_extension = os.path.splitext(file.filename)[1]
-    saved_filename = f"{file_id}{file_extension}"
-    file_path = UPLOAD_DIR / saved_filename
-    
+
+    async def chunks():
+        while chunk := await file.read(1024 * 1024): # 1MB chunks
+            yield chunk
+
     try:
-        # Save file asynchronously
-        import anyio
-        print(f"DEBUG: Writing file to {file_path}...")
-        async with await anyio.open_file(file_path, "wb") as f:
-            while chunk := await file.read(1024 * 1024): # 1MB chunks
-                await f.write(chunk)
-        print(f"DEBUG: File written successfully.")
+        # Hashed while streaming; identical files share one stored blob
+        content_hash, file_size = await blob_store.put_stream(chunks(), file.content_type)
     except Exception as e:
         print(f"ERROR: Failed to save file: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
-        
-    doc_title = title if title else file.filename
-    file_url = f"/uploads/{saved_filename}"
-    file_size = os.path.getsize(file_path)
-    
+
+    return await save_uploaded_document(current_user, file_id, title or file.filename, case_id,
+                                        file.content_type, content_hash, file_size)
+
+
+async def save_uploaded_document(current_user: dict, file_id: str, title: str, case_id: Optional[str],
+                                 content_type: Optional[str], content_hash: str, file_size: int) -> Document:
+    """Record a document for a blob already referenced in the blob store"""
     doc_obj = Document(
         id=file_id,
         user_id=current_user['id'],
         case_id=case_id or "unassigned",
-        title=doc_title,
-        file_url=file_url,
-        file_type=file.content_type or "application/octet-stream",
-        file_size=file_size
+        title=title,
+        file_url=f"/api/documents/{file_id}/file",
+        file_type=content_type or "application/octet-stream",
+        file_size=file_size,
+        content_hash=content_hash
     )
     
     doc = doc_obj.model_dump()
@@ -98,26 +121,143 @@ async def upload_document(
         print(f"DEBUG: DB insertion successful.")
     except Exception as e:
         print(f"ERROR: DB insertion failed: {str(e)}")
+        await blob_store.release(content_hash)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-        
+
+    # Searchable by title and case id now; the text is indexed once processing extracts it
+    await document_search.index_document(file_id)
+    # Thumbnails, page count and text are produced in the background
+    await document_processor.enqueue(doc)
+    doc_obj.processing_status = 'queued'
     return doc_obj
 
+
+# Resumable uploads: init a session, PUT chunks at their offsets, then complete with the SHA-256
+@router.post("/uploads")
+async def create_upload_session(data: UploadSessionCreate, current_user: dict = Depends(get_current_user)):
+    """Start a resumable upload"""
+    session = await chunked_uploads.create(current_user['id'], **data.model_dump())
+    return public_session(session)
+
+
+@router.get("/uploads/{upload_id}")
+async def get_upload_session(upload_id: str, current_user: dict = Depends(get_current_user)):
+    """Upload progress, including the chunks still missing (to resume after a dropped connection)"""
+    return public_session(await chunked_uploads.get(upload_id, current_user['id']))
+
+
+@router.put("/uploads/{upload_id}")
+async def put_upload_chunk(upload_id: str, request: Request, offset: int = Query(..., ge=0),
+                           current_user: dict = Depends(get_current_user)):
+    """Write one chunk (the raw request body) at `offset`; chunks may arrive in any order"""
+    session = await chunked_uploads.write_chunk(upload_id, current_user['id'], offset, request.stream())
+    return public_session(session)
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=Document)
+async def complete_upload(upload_id: str, data: UploadComplete, current_user: dict = Depends(get_current_user)):
+    """Verify the assembled file against its SHA-256 and create the document"""
+    session, content_hash, file_size = await chunked_uploads.complete(upload_id, current_user['id'], data.sha256)
+    try:
+        # The document takes the upload id, so cleanup can tell whether it was recorded
+        return await save_uploaded_document(current_user, upload_id, session.get('title') or session['filename'],
+                                            session.get('case_id'), session.get('content_type'), content_hash, file_size)
+    finally:
+        # Recorded, or released by save_uploaded_document on failure
+        await chunked_uploads.finish(upload_id)
+
+
+@router.delete("/uploads/{upload_id}")
+async def cancel_upload(upload_id: str, current_user: dict = Depends(get_current_user)):
+    """Abandon a resumable upload and discard its chunks"""
+    await chunked_uploads.cancel(upload_id, current_user['id'])
+    return {"success": True}
+
+
+optional_security = HTTPBearer(auto_error=False)
+
+
+async def readable_document(doc_id: str, user_id: str) -> dict:
+    """A document the user owns or that has been shared with them"""
+    doc = await db.documents.find_one(
+        {"id": doc_id, "$or": [{"user_id": user_id}, {"shared_with": user_id}]},
+        {"_id": 0, "id": 1, "title": 1, "file_type": 1, "content_hash": 1, "file_path": 1}
+    )
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return doc
+
+
+@router.post("/{doc_id}/download-url")
+async def create_download_url(doc_id: str, current_user: dict = Depends(get_current_user)):
+    """Short-lived URL for opening a document in a new tab or an embedded viewer"""
+    await readable_document(doc_id, current_user["id"])
+    token = create_download_token(current_user["id"], doc_id)
+    return {"url": f"/api/documents/{doc_id}/file?token={token}", "expires_in": DOWNLOAD_TOKEN_SECONDS}
+
+
+@router.get("/{doc_id}/file")
+async def get_document_file(
+    doc_id: str,
+    request: Request,
+    token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """Download a document (owner or shared_with only), with Range and If-None-Match support.
+
+    Authenticate with the usual bearer token, or `?token=` from /download-url.
+    """
+    doc = await readable_document(doc_id, await download_user_id(doc_id, token, credentials))
+    return serve_document(
+        doc,
+        range_header=request.headers.get("range"),
+        if_none_match=request.headers.get("if-none-match"),
+        if_range=request.headers.get("if-range")
+    )
+
+async def download_user_id(doc_id: str, token: Optional[str],
+                           credentials: Optional[HTTPAuthorizationCredentials]) -> str:
+    """User from the bearer token, or from a ?token= issued for this document"""
+    if credentials is not None:
+        return decode_session_token(credentials.credentials).get("user_id")
+    if token:
+        return decode_download_token(token, doc_id)
+    raise HTTPException(status_code=401, detail="Not authenticated")
+
+
+@router.get("/{doc_id}/{kind}")
+async def get_document_image(
+    doc_id: str,
+    kind: Literal["thumbnail", "preview"],
+    request: Request,
+    token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """First-page/image thumbnail or larger preview produced by the processing pipeline"""
+    doc = await readable_document(doc_id, await download_user_id(doc_id, token, credentials))
+    return serve_preview(doc, kind, if_none_match=request.headers.get("if-none-match"))
+
 @router.delete("/{doc_id}")
 async def delete_document(doc_id: str, current_user: dict = Depends(get_current_user)):
     """Delete a document and its file"""
     print(f"DEBUG: Attempting to delete document: {doc_id} for user: {current_user['id']}")
     
-    doc = await db.documents.find_one({"id": doc_id, "user_id": current_user["id"]})
+    # Delete first: only the request that actually removed the record releases its file,
+    # so a double click or a retry can't drop the blob's reference count twice
+    doc = await db.documents.find_one_and_delete({"id": doc_id, "user_id": current_user["id"]})
     if not doc:
         print(f"ERROR: Document {doc_id} not found or unauthorized")
         raise HTTPException(status_code=404, detail="Document not found")
+    print(f"DEBUG: Document record removed from database.")
         
-    # Remove file from disk
+    # Release the blob (collected once nothing references it), or remove a pre-blob-store file
     file_url = doc.get("file_url", "")
-    print(f"DEBUG: Found document in DB. File URL: {file_url}")
+    print(f"DEBUG: File URL: {file_url}")
     
-    if file_url.startswith("/uploads/"):
-        filename = file_url.replace("/uploads/", "")
+    if doc.get("content_hash"):
+        await blob_store.release(doc["content_hash"])
+    elif doc.get("file_path") or file_url.startswith("/uploads/"):
+        filename = doc.get("file_path") or file_url.replace("/uploads/", "")
         file_path = UPLOAD_DIR / filename
         print(f"DEBUG: Deleting file: {file_path}")
         if file_path.exists():
@@ -126,9 +266,7 @@ async def delete_document(doc_id: str, current_user: dict = Depends(get_current_
         else:
             print(f"WARNING: File not found on disk at {file_path}")
             
-    # Remove from DB
-    await db.documents.delete_one({"id": doc_id})
-    print(f"DEBUG: Document record removed from database.")
+    await document_search.remove_document(doc_id)
     return {"success": True}
 @router.post("/{doc_id}/share")
 async def share_document(doc_id: str, client_id: str = Form(...), current_user: dict = Depends(get_current_user)):
@@ -141,6 +279,7 @@ async def share_document(doc_id: str, client_id: str = Form(...), current_user:
         {"id": doc_id},
         {"$addToSet": {"shared_with": client_id}}
     )
+    await document_search.index_document(doc_id)
     
     # Optionally create a notification for the client
     from routes.notifications import create_notification
@@ -6,6 +6,7 @@ import uuid
 from models.event import Event, EventCreate
 from services.database import db
 from routes.auth import get_current_user
+from services.availability import availability
 
 router = APIRouter(prefix="/events", tags=["Events"])
 
@@ -28,6 +29,7 @@ async def create_event(event_data: EventCreate, current_user: dict = Depends(get
     doc['created_at'] = doc['created_at'].isoformat()
     
     await db.events.insert_one(doc)
+    availability.add_event(doc)
     return event_obj
 
 @router.get("", response_model=List[Event])
@@ -61,5 +63,7 @@ async def delete_event(event_id: str, current_user: dict = Depends(get_current_u
     
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Event not found or unauthorized")
+    
+    availability.remove_event(current_user['id'], event_id)
         
     return {"message": "Event deleted successfully"}
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
 from typing import List
 from models.firm_client import (
     FirmClientApplication, FirmClient, FirmClientLogin, ClientCaseUpdate
 )
 from services.database import db
+from services.password_pool import password_pool
+from services.applications import status_counts
 from passlib.context import CryptContext
 from datetime import datetime
 import os
@@ -12,6 +14,9 @@ from jose import jwt
 router = APIRouter(prefix="/firm-clients", tags=["Firm Clients"])
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Application lists never need the password hash or an inline photo
+LIST_PROJECTION = {"password": 0, "password_hash": 0, "photo": 0}
+
 # Submit client application to join a law firm
 @router.post("/applications")
 async def submit_firm_client_application(application: FirmClientApplication):
@@ -30,7 +35,7 @@ async def submit_firm_client_application(application: FirmClientApplication):
         app_dict = application.model_dump()
         
         # Hash the password before storing
-        app_dict["password"] = pwd_context.hash(application.password)
+        app_dict["password"] = await password_pool.run(pwd_context.hash, application.password)
         
         await collection.insert_one(app_dict)
         
@@ -57,7 +62,7 @@ async def get_firm_client_applications(law_firm_id: str, status: str = None):
         if status:
             query["status"] = status
         
-        applications = await collection.find(query).to_list(length=100)
+        applications = await collection.find(query, LIST_PROJECTION).to_list(length=100)
         
         # Convert ObjectId to string if present
         for app in applications:
@@ -73,11 +78,11 @@ async def get_firm_client_applications(law_firm_id: str, status: str = None):
 
 # Get ALL client applications (for admin)
 @router.get("/applications/all")
-async def get_all_client_applications():
-    """Get all client applications across all law firms (Admin only)"""
+async def get_all_client_applications(limit: int = Query(200, ge=1, le=1000)):
+    """Get the newest client applications across all law firms (Admin only)"""
     try:
         collection = db.firm_client_applications
-        applications = await collection.find({}).to_list(length=1000)
+        applications = await collection.find({}, LIST_PROJECTION).sort("_id", -1).to_list(length=limit)
         
         # Convert ObjectId to string if present
         for app in applications:
@@ -91,6 +96,11 @@ async def get_all_client_applications():
             detail=f"Error fetching applications: {str(e)}"
         )
 
+@router.get("/applications/stats")
+async def get_client_application_stats():
+    """Counts of client applications by status"""
+    return await status_counts(db.firm_client_applications)
+
 # Approve/Reject client application
 @router.put("/applications/{application_id}/status")
 async def update_client_application_status(
@@ -135,7 +145,7 @@ async def update_client_application_status(
             # If password doesn't exist (old applications), generate a temp password
             if not hashed_password:
                 temp_password = f"Client@{application['email'].split('@')[0][:4]}{application_id[:4]}"
-                hashed_password = pwd_context.hash(temp_password)
+                hashed_password = await password_pool.run(pwd_context.hash, temp_password)
             
             client = FirmClient(
                 id=application_id,
@@ -190,7 +200,7 @@ async def register_paid_firm_client(client_data: dict):
             )
         
         # Hash password
-        hashed_password = pwd_context.hash(client_data.get("password"))
+        hashed_password = await password_pool.run(pwd_context.hash, client_data.get("password"))
         
         # Create client ID
         import uuid
@@ -339,7 +349,7 @@ async def firm_client_login(credentials: FirmClientLogin):
             if application:
                 # Check if password exists in application (from old flow)
                 if "password" in application and application.get("password"):
-                    if not pwd_context.verify(credentials.password, application["password"]):
+                    if not await password_pool.run(pwd_context.verify, credentials.password, application["password"]):
                         raise HTTPException(
                             status_code=status.HTTP_401_UNAUTHORIZED,
                             detail="Invalid credentials"
@@ -370,7 +380,7 @@ async def firm_client_login(credentials: FirmClientLogin):
                 )
             
             # Verify password
-            if not pwd_context.verify(credentials.password, client["password"]):
+            if not await password_pool.run(pwd_context.verify, credentials.password, client["password"]):
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid credentials"
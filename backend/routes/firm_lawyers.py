@@ -2,7 +2,8 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Optional
 from datetime import datetime, timezone
 from services.database import db
-from services.auth import hash_password, verify_password, create_token
+from services.auth import hash_password_async, verify_password_async, create_token
+from services.user_cache import invalidate_user
 from models.firm_lawyer import FirmLawyerCreate, FirmLawyerLogin, TaskCreate
 from pydantic import BaseModel, EmailStr
 import uuid
@@ -38,7 +39,7 @@ async def firm_lawyer_login(login_data: FirmLawyerLogin):
         raise HTTPException(status_code=401, detail='Invalid credentials')
     
     password_field = user.get('password_hash') or user.get('password')
-    if not password_field or not verify_password(login_data.password, password_field):
+    if not password_field or not await verify_password_async(login_data.password, password_field):
         raise HTTPException(status_code=401, detail='Invalid credentials')
     
     if not user.get('is_active', True):
@@ -71,7 +72,7 @@ async def submit_firm_lawyer_application(application: FirmLawyerApplicationCreat
         'full_name': application.full_name,
         'email': application.email,
         'phone': application.phone,
-        'password_hash': hash_password(application.password),
+        'password_hash': await hash_password_async(application.password),
         'firm_id': application.firm_id,
         'firm_name': application.firm_name,
         'specialization': application.specialization,
@@ -157,7 +158,7 @@ async def create_firm_lawyer(lawyer_data: FirmLawyerCreate, firm_id: str, firm_n
         'id': lawyer_id,
         'full_name': lawyer_data.full_name,
         'email': lawyer_data.email,
-        'password_hash': hash_password(lawyer_data.password),
+        'password_hash': await hash_password_async(lawyer_data.password),
         'phone': lawyer_data.phone,
         'specialization': lawyer_data.specialization,
         'experience_years': lawyer_data.experience_years,
@@ -209,6 +210,7 @@ async def update_lawyer_status(lawyer_id: str, is_active: bool):
         {'id': lawyer_id, 'user_type': 'firm_lawyer'},
         {'$set': {'is_active': is_active}}
     )
+    await invalidate_user(lawyer_id)
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail='Lawyer not found')
     return {'message': f'Lawyer {"activated" if is_active else "deactivated"} successfully'}
@@ -218,6 +220,7 @@ async def update_lawyer_status(lawyer_id: str, is_active: bool):
 async def delete_firm_lawyer(lawyer_id: str):
     """Delete a firm lawyer"""
     result = await db.users.delete_one({'id': lawyer_id, 'user_type': 'firm_lawyer'})
+    await invalidate_user(lawyer_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail='Lawyer not found')
     return {'message': 'Lawyer deleted successfully'}
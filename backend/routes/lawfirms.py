@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from typing import List
 from datetime import datetime
 from services.database import db
-from services.auth import hash_password
+from services.auth import hash_password_async
+from services.text_search import text_search
 
 from pydantic import BaseModel, EmailStr
 from typing import Optional
@@ -43,6 +44,18 @@ async def get_lawfirms():
     return lawfirms
 
 
+@router.get("/text-search")
+async def text_search_lawfirms(q: str = Query(..., min_length=1, max_length=200), limit: int = Query(20, ge=1, le=50)):
+    """Ranked free-text search over firm name, practice areas, description and location"""
+    return {'query': q, 'results': await text_search.search('law_firm', q, limit)}
+
+
+@router.get("/autocomplete")
+async def autocomplete_lawfirms(q: str = Query(..., min_length=1, max_length=100), limit: int = Query(10, ge=1, le=20)):
+    """Indexed terms completing the last word of `q`"""
+    return {'query': q, 'suggestions': await text_search.suggest('law_firm', q, limit)}
+
+
 @router.post("/applications")
 async def submit_lawfirm_application(application: LawFirmApplicationCreate):
     """Submit a law firm application"""
@@ -66,7 +79,7 @@ async def submit_lawfirm_application(application: LawFirmApplicationCreate):
         'contact_email': application.contact_email,
         'contact_phone': application.contact_phone,
         'contact_designation': application.contact_designation,
-        'password_hash': hash_password(application.password),
+        'password_hash': await hash_password_async(application.password),
         'address': application.address,
         'city': application.city,
         'state': application.state,
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Literal, Optional
+from datetime import datetime, timedelta
 from models.user import User
 from models.lawyer_application import LawyerApplication, LawyerApplicationCreate
 from services.database import db
-from services.auth import hash_password
+from services.auth import hash_password_async
+from services.availability import availability, to_naive
+from services.lawyer_search import build_filter, search_lawyers
+from services.text_search import text_search
+from services.media import media_store
 
 router = APIRouter(prefix="/lawyers", tags=["Lawyers"])
 
@@ -14,20 +18,89 @@ async def get_lawyers():
     """Get all lawyers"""
     lawyers = await db.users.find(
         {'user_type': 'lawyer'}, 
-        {'_id': 0, 'password': 0}
+        {'_id': 0, 'password': 0, 'password_hash': 0, 'search': 0}
     ).to_list(100)
     
     for lawyer in lawyers:
         if isinstance(lawyer.get('created_at'), str):
             dt_str = lawyer['created_at'].replace('Z', '+00:00') if lawyer['created_at'].endswith('Z') else lawyer['created_at']
             lawyer['created_at'] = datetime.fromisoformat(dt_str)
-        # Ensure ID is string
-        lawyer['id'] = str(lawyer['_id'])
-        del lawyer['_id']
     
     return lawyers
 
 
+@router.get("/search")
+async def search_lawyer_directory(
+    state: Optional[str] = None,
+    city: Optional[str] = None,
+    court: Optional[str] = None,
+    specialization: Optional[str] = None,
+    languages: Optional[List[str]] = Query(None),
+    min_experience: Optional[int] = Query(None, ge=0),
+    min_rating: Optional[float] = Query(None, ge=0, le=5),
+    fee_min: Optional[int] = Query(None, ge=0),
+    fee_max: Optional[int] = Query(None, ge=0),
+    sort: Literal['relevance', 'rating', 'experience', 'fee'] = 'relevance',
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    Filtered, sorted and keyset-paginated lawyer directory.
+    Facet counts and the total are returned with the first page only;
+    pass `next_cursor` back as `cursor` for the following pages.
+    """
+    query = build_filter(
+        state=state, city=city, court=court, specialization=specialization,
+        languages=languages, min_experience=min_experience, min_rating=min_rating,
+        fee_min=fee_min, fee_max=fee_max
+    )
+    return await search_lawyers(query, sort=sort, cursor=cursor, limit=limit, include_facets=cursor is None)
+
+
+@router.get("/text-search")
+async def text_search_lawyers(q: str = Query(..., min_length=1, max_length=200), limit: int = Query(20, ge=1, le=50)):
+    """
+    Ranked free-text search over name, specialization, bio, education, court and location.
+    Understands Hindi and English; the last word matches as a prefix.
+    """
+    return {'query': q, 'results': await text_search.search('lawyer', q, limit)}
+
+
+@router.get("/autocomplete")
+async def autocomplete_lawyers(q: str = Query(..., min_length=1, max_length=100), limit: int = Query(10, ge=1, le=20)):
+    """Indexed terms completing the last word of `q`"""
+    return {'query': q, 'suggestions': await text_search.suggest('lawyer', q, limit)}
+
+
+MAX_AVAILABILITY_WINDOW_DAYS = 62
+
+
+@router.get("/{lawyer_id}/availability")
+async def get_lawyer_availability(
+    lawyer_id: str,
+    from_: datetime = Query(..., alias="from"),
+    to: datetime = Query(...),
+    duration: int = Query(30, ge=5, le=480)
+):
+    """Free windows of at least `duration` minutes between `from` and `to`"""
+    window_start, window_end = to_naive(from_), to_naive(to)
+    if window_end <= window_start:
+        raise HTTPException(status_code=400, detail='`to` must be after `from`')
+    if window_end - window_start > timedelta(days=MAX_AVAILABILITY_WINDOW_DAYS):
+        raise HTTPException(status_code=400, detail=f'Window cannot exceed {MAX_AVAILABILITY_WINDOW_DAYS} days')
+    
+    schedule = await availability.get(lawyer_id)
+    windows = schedule.free_windows(window_start, window_end, duration)
+    
+    return {
+        'lawyer_id': lawyer_id,
+        'from': window_start.isoformat(),
+        'to': window_end.isoformat(),
+        'duration_minutes': duration,
+        'free': [{'start': start.isoformat(), 'end': end.isoformat()} for start, end in windows]
+    }
+
+
 @router.post("/applications")
 async def submit_lawyer_application(application: LawyerApplicationCreate):
     """Submit a lawyer application"""
@@ -40,13 +113,20 @@ async def submit_lawyer_application(application: LawyerApplicationCreate):
     if existing_user:
         raise HTTPException(status_code=400, detail='A user with this email already exists')
     
+    # Inline photos go to the uploads store; only their URLs are kept
+    try:
+        photo = await media_store.store_photo(application.photo)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     # Create application
     app_data = LawyerApplication(
         name=application.name,
         email=application.email,
         phone=application.phone,
-        password_hash=hash_password(application.password),
-        photo=application.photo,
+        password_hash=await hash_password_async(application.password),
+        photo=photo['photo'],
+        photo_thumbnail=photo.get('photo_thumbnail'),
         bar_council_number=application.bar_council_number,
         specialization=application.specialization,
         experience=application.experience,
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone
 import uuid
 from services.database import db
 from routes.auth import get_current_user
 from models.message import Message, MessageCreate
+from services.conversations import get_inbox, record_message, mark_read
+from services.realtime import publish_to_user
+from services.pagination import encode_cursor, decode_cursor, parse_cursor_datetime, keyset_filter
 
 router = APIRouter(prefix="/messages", tags=["Messages"])
 
@@ -12,84 +15,86 @@ router = APIRouter(prefix="/messages", tags=["Messages"])
 async def get_recent_conversations(current_user: dict = Depends(get_current_user)):
     """
     Fetch recent conversations for the current user.
-    Aggregates messages to find unique contacts and the last message exchanged.
+    Reads the materialized inbox maintained by send_message, so the cost
+    does not grow with the total message history.
     """
-    user_id = current_user['id']
-    
-    # Aggregation pipeline to get recent conversations
-    pipeline = [
-        {
-            "$match": {
-                "$or": [
-                    {"sender_id": user_id},
-                    {"receiver_id": user_id}
-                ]
-            }
-        },
-        {
-            "$sort": {"timestamp": -1}
-        },
-        {
-            "$group": {
-                "_id": {
-                    "$cond": [
-                        {"$eq": ["$sender_id", user_id]},
-                        "$receiver_id",
-                        "$sender_id"
-                    ]
-                },
-                "last_message": {"$first": "$$ROOT"}
-            }
-        },
-        {
-            "$replaceRoot": {"newRoot": "$last_message"}
-        },
-        {
-            "$sort": {"timestamp": -1}
-        }
-    ]
-    
-    recent_messages = await db.messages.aggregate(pipeline).to_list(length=20)
+    entries = await get_inbox(current_user['id'], limit=20)
     
     conversations = []
-    for msg in recent_messages:
-        other_user_id = msg['receiver_id'] if msg['sender_id'] == user_id else msg['sender_id']
-        
-        # Determine who the other person is
-        # Try to find in users collection (lawyers, clients, etc.)
-        other_user = await db.users.find_one({"id": other_user_id})
-        
-        # If not found in users, might be a lawyer finding a user, or vice versa
-        if not other_user:
-             other_user = await db.lawyers.find_one({"id": other_user_id})
-
-        # Fallback name if not found
-        name = other_user.get('full_name', 'Unknown User') if other_user else 'Unknown User'
-        avatar_letter = name[0] if name else '?'
-        
+    for entry in entries:
+        name = entry.get('other_user_name') or 'Unknown User'
         conversations.append({
-            "id": other_user_id,
+            "id": entry['other_user_id'],
+            "other_user_id": entry['other_user_id'],
             "name": name,
-            "message": msg['content'],
-            "timestamp": msg['timestamp'],
-            "unread": 0, # TODO: Implement unread count
-            "avatar": avatar_letter,
+            "message": entry['last_message'],
+            "timestamp": entry['last_message_at'],
+            "unread": entry.get('unread', 0),
+            "avatar": name[0] if name else '?',
             "online": False # Data not available yet
         })
         
     return conversations
 
+def message_cursor(message: dict) -> str:
+    """Keyset cursor for a message: its timestamp plus id as tie-breaker"""
+    return encode_cursor(message['timestamp'], message['id'])
+
+
+def decode_message_cursor(cursor: str):
+    timestamp, message_id = decode_cursor(cursor, 2)
+    return parse_cursor_datetime(timestamp), message_id
+
+
 @router.get("/{other_user_id}")
-async def get_conversation(other_user_id: str, current_user: dict = Depends(get_current_user)):
-    """Fetch conversation history with a specific user"""
+async def get_conversation(
+    other_user_id: str,
+    response: Response,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Fetch one page of conversation history with a specific user.
+    Without a cursor the newest page is returned; pass the X-Before-Cursor
+    header value as `before` to scroll back, or X-After-Cursor as `after`
+    to fetch newer messages. Messages in a page are oldest-first.
+    """
+    if before and after:
+        raise HTTPException(status_code=400, detail="Use either before or after, not both")
     user_id = current_user['id']
     
-    messages = await db.messages.find({
+    query = {
         "$or": [
             {"sender_id": user_id, "receiver_id": other_user_id},
             {"sender_id": other_user_id, "receiver_id": user_id}
         ]
-    }).sort("timestamp", 1).to_list(length=100)
+    }
+    
+    # Keyset on (timestamp, id) so each page is an index range scan
+    direction = 1 if after else -1
+    sort = [("timestamp", direction), ("id", direction)]
+    cursor = after or before
+    if cursor:
+        query = {"$and": [query, keyset_filter(sort, list(decode_message_cursor(cursor)))]}
+    
+    # Fetch one extra row to know whether another page exists
+    messages = await db.messages.find(query, {"_id": 0}).sort(sort).limit(limit + 1).to_list(length=limit + 1)
+    
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if direction == -1:
+        messages.reverse()
+    
+    if messages:
+        if has_more or after:
+            response.headers["X-Before-Cursor"] = message_cursor(messages[0])
+        response.headers["X-After-Cursor"] = message_cursor(messages[-1])
+    elif after:
+        # Nothing newer yet; keep polling from the same position
+        response.headers["X-After-Cursor"] = after
+    response.headers["X-Has-More"] = "true" if has_more else "false"
     
     return messages
 
@@ -103,4 +108,13 @@ async def send_message(message_data: MessageCreate, current_user: dict = Depends
     )
     
     await db.messages.insert_one(new_message.model_dump())
+    await record_message(new_message.model_dump(), sender_name=current_user.get('full_name'))
+    await publish_to_user(new_message.receiver_id, "message", new_message.model_dump())
+    await publish_to_user(new_message.sender_id, "message", new_message.model_dump())
     return new_message
+
+@router.post("/{other_user_id}/read")
+async def mark_conversation_read(other_user_id: str, current_user: dict = Depends(get_current_user)):
+    """Mark all messages from another user as read and reset the unread count"""
+    updated = await mark_read(current_user['id'], other_user_id)
+    return {"success": True, "marked_read": updated}
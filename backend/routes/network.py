@@ -7,6 +7,7 @@ from models.network import NetworkMessage, NetworkMessageCreate
 from models.user import User
 from services.database import db
 from routes.auth import get_current_user
+from services.realtime import publish_to_state
 
 router = APIRouter(prefix="/network", tags=["Network"])
 
@@ -68,5 +69,6 @@ async def send_network_message(
     )
     
     await db.network_messages.insert_one(new_message.model_dump())
+    await publish_to_state(user_state, "network_message", new_message.model_dump())
     
     return {"message": "Message sent", "data": new_message.model_dump()}
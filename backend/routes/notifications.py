@@ -3,6 +3,7 @@ from typing import List
 from models.notification import Notification
 from services.database import db
 from routes.auth import get_current_user
+from services.notification_queue import notification_queue
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
@@ -29,7 +30,7 @@ async def mark_as_read(notification_id: str, current_user: dict = Depends(get_cu
     return {"success": True}
 
 async def create_notification(user_id: str, title: str, message: str, n_type: str, related_id: str = None):
-    """Helper function to create a notification"""
+    """Queue a notification; it is batch-inserted and pushed to the user by the flusher"""
     notification = Notification(
         user_id=user_id,
         title=title,
@@ -37,4 +38,4 @@ async def create_notification(user_id: str, title: str, message: str, n_type: st
         type=n_type,
         related_id=related_id
     )
-    await db.notifications.insert_one(notification.model_dump())
+    await notification_queue.enqueue(notification.model_dump())
@@ -0,0 +1,95 @@
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
+import logging
+from services.auth import decode_session_token
+from services.user_cache import user_cache
+from services.realtime import hub, user_channel, state_channel
+
+router = APIRouter(prefix="/realtime", tags=["Realtime"])
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_SECONDS = 15
+
+
+async def authenticate(token: str) -> dict:
+    """Resolve a JWT (passed as a query param, since browsers can't set WS/SSE headers)"""
+    payload = decode_session_token(token)
+    user = await user_cache.get_user(payload.get('user_id', ''))
+    if not user:
+        raise HTTPException(status_code=404, detail='User not found')
+    return user
+
+
+def channels_for(user: dict) -> list:
+    """A user hears their own events plus their state's lawyer network"""
+    channels = [user_channel(user['id'])]
+    user_state = user.get('state')
+    if not user_state and user['id'].startswith('dummy_'):
+        user_state = 'Delhi'
+    if user_state:
+        channels.append(state_channel(user_state))
+    return channels
+
+
+@router.websocket("/ws")
+async def realtime_websocket(websocket: WebSocket, token: str = Query(...)):
+    """Push messages, notifications and network posts over a WebSocket"""
+    try:
+        user = await authenticate(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscription = hub.subscribe(channels_for(user))
+
+    async def forward():
+        while True:
+            event = await subscription.queue.get()
+            await websocket.send_json(event)
+
+    async def drain():
+        # Clients may send pings; anything received just keeps the socket alive
+        while True:
+            await websocket.receive_text()
+
+    tasks = [asyncio.create_task(forward()), asyncio.create_task(drain())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            # Disconnects surface here as WebSocketDisconnect/RuntimeError
+            if not task.cancelled() and task.exception() and not isinstance(task.exception(), WebSocketDisconnect):
+                logger.debug(f"Realtime socket for {user['id']} closed: {task.exception()}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        hub.unsubscribe(subscription)
+
+
+@router.get("/events")
+async def realtime_events(request: Request, token: str = Query(...)):
+    """Server-Sent Events fallback for clients that cannot open a WebSocket"""
+    user = await authenticate(token)
+    subscription = hub.subscribe(channels_for(user))
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
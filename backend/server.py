@@ -2,9 +2,11 @@ from fastapi import FastAPI, APIRouter
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+import asyncio
 import os
 import logging
 from pathlib import Path
+from typing import Optional
 import sys
 
 # Add backend directory to path for imports
@@ -33,9 +35,23 @@ from routes import (
     messages_router,
     network_router,
     events_router,
-    notifications_router
+    notifications_router,
+    realtime_router
 )
 from services.database import close_db
+from services.indexes import ensure_indexes
+from services.password_pool import password_pool
+from services.realtime import hub
+from services.notification_queue import notification_queue
+from services.lawyer_search import backfill_search_fields
+from services.text_search import text_search
+from services.chat_cards import backfill_chat_cards
+from services.media import media_store, MEDIA_DIR
+from services.blob_store import blob_store
+from services.chunked_uploads import chunked_uploads
+from services.document_files import backfill_document_files
+from services.document_processing import document_processor
+from services.document_search import document_search
 
 # Create the main app
 app = FastAPI(title="Lxwyer Up API")
@@ -73,6 +89,7 @@ api_router.include_router(messages_router)
 api_router.include_router(network_router)
 api_router.include_router(events_router)
 api_router.include_router(notifications_router)
+api_router.include_router(realtime_router)
 
 # Legacy endpoint for lawyer applications (for backward compatibility)
 from routes.lawyers import submit_lawyer_application
@@ -89,10 +106,11 @@ api_router.post("/firm-lawyer-applications")(submit_firm_lawyer_application)
 # Include the router in the main app
 app.include_router(api_router)
 
-# Mount uploads directory to serve files
-if not os.path.exists(ROOT_DIR / "uploads"):
-    os.makedirs(ROOT_DIR / "uploads")
-app.mount("/uploads", StaticFiles(directory=ROOT_DIR / "uploads"), name="uploads")
+# Only public media (profile photos) is served statically; documents go
+# through the authenticated /api/documents/{id}/file endpoint
+if not os.path.exists(MEDIA_DIR):
+    os.makedirs(MEDIA_DIR)
+app.mount("/uploads/media", StaticFiles(directory=MEDIA_DIR), name="media")
 
 # CORS middleware
 app.add_middleware(
@@ -101,6 +119,7 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Before-Cursor", "X-After-Cursor", "X-Has-More", "X-Chat-Cache"],
 )
 
 # Configure logging
@@ -111,6 +130,54 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+async def run_backfills() -> None:
+    """One-off data migrations; idempotent, so every worker may run them after startup"""
+    # Build the text index first so early searches don't pay for it
+    migrations = [
+        ('text index', text_search.build, None),
+        ('lawyer search fields', backfill_search_fields, "Added search fields to {} lawyer profiles"),
+        ('document files', backfill_document_files, "Moved {} documents to the authenticated file endpoint"),
+        ('document search', document_search.backfill, "Indexed {} documents for full-text search"),
+        ('chat cards', backfill_chat_cards, "Parsed cards for {} chat history entries"),
+    ]
+    for name, migrate, message in migrations:
+        try:
+            count = await migrate()
+            if count and message:
+                logger.info(message.format(count))
+        except Exception as e:
+            logger.warning(f"Startup backfill '{name}' failed: {e}")
+
+
+_backfills: Optional[asyncio.Task] = None
+
+
+@app.on_event("startup")
+async def start_services():
+    global _backfills
+    await hub.start()
+    notification_queue.start()
+    blob_store.start()
+    chunked_uploads.start()
+    document_processor.start()
+    drift = await ensure_indexes()
+    if drift:
+        logger.info(f"Index drift reconciled for: {', '.join(drift)}")
+    # O(N) backfills run in the background so the worker serves traffic right away
+    _backfills = asyncio.create_task(run_backfills())
+    # Inline base64 photos move to the uploads store in the background
+    media_store.start_migration()
+
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if _backfills is not None:
+        _backfills.cancel()
+    # Drain queued notifications while the database is still reachable
+    await notification_queue.stop()
+    await blob_store.stop()
+    await chunked_uploads.stop()
+    await document_processor.stop()
     await close_db()
+    password_pool.shutdown()
+    await hub.stop()
@@ -1,8 +1,12 @@
 # Services Package
-from .auth import hash_password, verify_password, create_token, decode_token
+from .auth import (
+    hash_password, verify_password, hash_password_async, verify_password_async,
+    create_token, decode_token, decode_session_token
+)
 from .database import get_db, db
 
 __all__ = [
-    'hash_password', 'verify_password', 'create_token', 'decode_token',
+    'hash_password', 'verify_password', 'hash_password_async', 'verify_password_async',
+    'create_token', 'decode_token', 'decode_session_token',
     'get_db', 'db'
 ]
@@ -0,0 +1,273 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from .database import db
+from .lawyer_search import search_fields
+from .text_search import text_search
+
+STATUSES = ('pending', 'approved', 'rejected')
+# Transient status of applications claimed by a bulk approval
+REVIEWING = 'reviewing'
+MAX_BULK_IDS = 500
+# A claim older than this belongs to a request that died; its applications go back to pending
+REVIEW_CLAIM_SECONDS = 300
+
+SECRET_FIELDS = ['password', 'password_hash']
+
+# Inline base64 photos are dropped from lists (URLs are kept); `has_photo`
+# tells the client whether to fetch the full application for it
+_PHOTO_IS_STRING = {'$eq': [{'$type': '$photo'}, 'string']}
+LIST_STAGES = [
+    {'$unset': SECRET_FIELDS},
+    {'$set': {
+        'has_photo': {'$and': [_PHOTO_IS_STRING, {'$ne': ['$photo', '']}]},
+        'photo': {'$cond': [
+            {'$and': [_PHOTO_IS_STRING, {'$ne': [{'$substrCP': ['$photo', 0, 5]}, 'data:']}]},
+            '$photo',
+            '$$REMOVE'
+        ]}
+    }}
+]
+
+
+async def find_applications(collection, query: dict, limit: int) -> list:
+    """Newest-first applications matching `query` in list form (see LIST_STAGES)"""
+    applications = await collection.aggregate([
+        {'$match': query},
+        {'$sort': {'_id': -1}},
+        {'$limit': limit},
+        *LIST_STAGES
+    ]).to_list(length=limit)
+    for application in applications:
+        application['_id'] = str(application['_id'])
+    return applications
+
+
+def lawyer_user_from_application(application: dict) -> dict:
+    """User document for an approved lawyer application"""
+    user_data = {
+        'id': str(uuid.uuid4()),
+        'email': application['email'],
+        'password': application.get('password_hash') or application.get('password'),
+        'full_name': application.get('full_name') or application.get('name'),
+        'user_type': 'lawyer',
+        'phone': application['phone'],
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'is_approved': True,
+        # Lawyer specific fields
+        'photo': application.get('photo'),
+        'photo_thumbnail': application.get('photo_thumbnail'),
+        'bar_council_number': application.get('bar_council_number'),
+        'specialization': application.get('specialization'),
+        'experience_years': application.get('experience_years') or application.get('experience'),
+        'cases_won': application.get('cases_won', 0),
+        'state': application.get('state'),
+        'city': application.get('city'),
+        'court': application.get('court', ''),
+        'education': application.get('education'),
+        'languages': application.get('languages', []),
+        'fee_range': application.get('fee_range', '₹5,000 - ₹15,000'),
+        'bio': application.get('bio', 'Experienced lawyer'),
+        'office_address': application.get('office_address'),
+        'rating': 4.5,
+        'is_verified': True
+    }
+    user_data['search'] = search_fields(user_data)
+    return user_data
+
+
+def lawfirm_user_from_application(application: dict) -> dict:
+    """User document for an approved law firm application"""
+    return {
+        'id': str(uuid.uuid4()),
+        'email': application['contact_email'],
+        'password_hash': application['password_hash'],
+        'full_name': application['contact_name'],
+        'firm_name': application['firm_name'],
+        'user_type': 'law_firm',
+        'phone': application['contact_phone'],
+        'created_at': datetime.now(timezone.utc),
+        # Law firm specific fields
+        'registration_number': application['registration_number'],
+        'established_year': application['established_year'],
+        'website': application.get('website'),
+        'contact_designation': application.get('contact_designation'),
+        'address': application.get('address'),
+        'city': application['city'],
+        'state': application['state'],
+        'pincode': application.get('pincode'),
+        'practice_areas': application['practice_areas'],
+        'total_lawyers': application['total_lawyers'],
+        'total_staff': application.get('total_staff', 0),
+        'description': application['description'],
+        'achievements': application.get('achievements'),
+        'is_verified': True
+    }
+
+
+# kind -> (collection name, user builder)
+KINDS = {
+    'lawyer': ('lawyer_applications', lawyer_user_from_application),
+    'lawfirm': ('lawfirm_applications', lawfirm_user_from_application),
+}
+
+
+def collection_for(kind: str):
+    if kind not in KINDS:
+        raise HTTPException(status_code=404, detail='Unknown application type')
+    return db[KINDS[kind][0]]
+
+
+async def status_counts(collection, query: dict = None) -> dict:
+    """{pending, approved, rejected, reviewing, total} from one $group.
+
+    Matching on status first lets the status index cover the whole pipeline,
+    so no application document (or photo) is read.
+    """
+    rows = await collection.aggregate([
+        {'$match': {**(query or {}), 'status': {'$in': [*STATUSES, REVIEWING]}}},
+        {'$group': {'_id': '$status', 'count': {'$sum': 1}}}
+    ]).to_list(length=None)
+    counts = {status: 0 for status in (*STATUSES, REVIEWING)}
+    for row in rows:
+        counts[row['_id']] = row['count']
+    counts['total'] = sum(counts.values())
+    return counts
+
+
+async def list_applications(kind: str, status: Optional[str] = None, cursor: Optional[str] = None,
+                            limit: int = 50) -> dict:
+    """Newest-first keyset page of applications in list form (no inline photos or password hashes)"""
+    query = {}
+    if status:
+        query['status'] = status
+    if cursor:
+        try:
+            query['_id'] = {'$lt': ObjectId(cursor)}
+        except InvalidId:
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+
+    applications = await find_applications(collection_for(kind), query, limit + 1)
+    has_more = len(applications) > limit
+    applications = applications[:limit]
+
+    return {
+        'applications': applications,
+        'next_cursor': applications[-1]['_id'] if has_more else None,
+        'has_more': has_more
+    }
+
+
+def _object_ids(ids: List[str]) -> tuple:
+    valid, invalid = [], []
+    for app_id in dict.fromkeys(ids):
+        try:
+            valid.append(ObjectId(app_id))
+        except (InvalidId, TypeError):
+            invalid.append(app_id)
+    return valid, invalid
+
+
+async def release_reviews(collection, query: dict) -> None:
+    await collection.update_many(
+        {**query, 'status': REVIEWING},
+        {'$set': {'status': 'pending'}, '$unset': {'review_batch': '', 'review_claimed_at': ''}}
+    )
+
+
+async def _approve_claimed(collection, build_user, batch_id: str, review: dict) -> tuple:
+    """Create user accounts for the applications claimed by `batch_id`; (done ids, failures)"""
+    claimed = await collection.find({'review_batch': batch_id, 'status': REVIEWING}).to_list(length=None)
+
+    users, failed_index = [], {}
+    for application in claimed:
+        try:
+            users.append(build_user(application))
+        except KeyError as e:
+            failed_index[len(users)] = f'Missing field {e}'
+            users.append(None)
+
+    inserts = [InsertOne(user) for user in users if user is not None]
+    insert_positions = [i for i, user in enumerate(users) if user is not None]
+    if inserts:
+        try:
+            await db.users.bulk_write(inserts, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get('writeErrors', []):
+                position = insert_positions[error['index']]
+                failed_index[position] = 'User account already exists' if error.get('code') == 11000 else error.get('errmsg')
+
+    updates, done, failed = [], [], []
+    for i, application in enumerate(claimed):
+        if i in failed_index:
+            updates.append(UpdateOne({'_id': application['_id']},
+                                     {'$set': {'status': 'pending'}, '$unset': {'review_batch': '', 'review_claimed_at': ''}}))
+            failed.append({'id': str(application['_id']), 'reason': failed_index[i]})
+        else:
+            updates.append(UpdateOne({'_id': application['_id']},
+                                     {'$set': {'status': 'approved', **review}, '$unset': {'review_claimed_at': ''}}))
+            done.append(str(application['_id']))
+            text_search.index_profile(users[i])
+    if updates:
+        await collection.bulk_write(updates, ordered=False)
+    return done, failed
+
+
+async def bulk_review(kind: str, ids: List[str], action: str, reviewed_by: str = None) -> dict:
+    """Approve or reject many pending applications in a few round-trips.
+
+    Applications are first claimed atomically (pending -> reviewing) with this
+    batch's id, so a concurrent single or bulk review can't process them twice.
+    Approvals insert all user accounts in one unordered bulk_write; any that
+    fail (e.g. the email already has an account) go back to pending, as do
+    the claims of a batch that raised or of a request that died mid-batch.
+    """
+    collection = collection_for(kind)
+    build_user = KINDS[kind][1]
+    object_ids, invalid = _object_ids(ids)
+    batch_id = str(uuid.uuid4())
+    now = datetime.now(timezone.utc).isoformat()
+    review = {'reviewed_at': now, 'reviewed_by': reviewed_by}
+
+    if action == 'reject':
+        await collection.update_many(
+            {'_id': {'$in': object_ids}, 'status': 'pending'},
+            {'$set': {'status': 'rejected', 'review_batch': batch_id, **review}}
+        )
+        claimed = await collection.find({'_id': {'$in': object_ids}, 'review_batch': batch_id}, {'_id': 1}).to_list(length=None)
+        done = [str(application['_id']) for application in claimed]
+        failed = []
+    else:
+        stale = (datetime.now(timezone.utc) - timedelta(seconds=REVIEW_CLAIM_SECONDS)).isoformat()
+        # Claims left behind by a request that died (or made before claims were timestamped)
+        await release_reviews(collection, {'$or': [{'review_claimed_at': {'$lt': stale}},
+                                                   {'review_claimed_at': {'$exists': False}}]})
+        await collection.update_many(
+            {'_id': {'$in': object_ids}, 'status': 'pending'},
+            {'$set': {'status': REVIEWING, 'review_batch': batch_id, 'review_claimed_at': now}}
+        )
+        try:
+            done, failed = await _approve_claimed(collection, build_user, batch_id, review)
+        finally:
+            # No-op unless the batch raised before every claim was settled
+            await release_reviews(collection, {'review_batch': batch_id})
+
+    processed = set(done) | {item['id'] for item in failed}
+    skipped = [{'id': app_id, 'reason': 'Invalid id'} for app_id in invalid]
+    skipped += [{'id': str(oid), 'reason': 'Not found or already processed'}
+                for oid in object_ids if str(oid) not in processed]
+
+    return {
+        'action': action,
+        'processed': done,
+        'failed': failed,
+        'skipped': skipped,
+        'stats': await status_counts(collection)
+    }
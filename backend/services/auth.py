@@ -3,10 +3,12 @@ import jwt
 import os
 from datetime import datetime, timezone, timedelta
 from fastapi import HTTPException
+from .password_pool import password_pool
 
 JWT_SECRET = os.environ.get('JWT_SECRET', 'your-secret-key')
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_DAYS = 30
+DOWNLOAD_TOKEN_SECONDS = int(os.environ.get('DOWNLOAD_TOKEN_SECONDS', '600'))
 
 
 def hash_password(password: str) -> str:
@@ -19,6 +21,16 @@ def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
 
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the password pool without blocking the event loop"""
+    return await password_pool.run(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    """Verify a password on the password pool without blocking the event loop"""
+    return await password_pool.run(verify_password, password, hashed)
+
+
 def create_token(user_id: str, user_type: str) -> str:
     """Create a JWT token for a user"""
     payload = {
@@ -29,6 +41,25 @@ def create_token(user_id: str, user_type: str) -> str:
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
 
+def create_download_token(user_id: str, doc_id: str) -> str:
+    """Short-lived token for one document, usable as ?token= where headers can't be sent (links, PDF viewers)"""
+    payload = {
+        'user_id': user_id,
+        'doc_id': doc_id,
+        'scope': 'download',
+        'exp': datetime.now(timezone.utc) + timedelta(seconds=DOWNLOAD_TOKEN_SECONDS)
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+
+def decode_download_token(token: str, doc_id: str) -> str:
+    """User id from a download token, which must have been issued for `doc_id`"""
+    payload = decode_token(token)
+    if payload.get('scope') != 'download' or payload.get('doc_id') != doc_id:
+        raise HTTPException(status_code=401, detail='Invalid token')
+    return payload['user_id']
+
+
 def create_admin_token(email: str) -> str:
     """Create a JWT token for admin"""
     payload = {
@@ -49,6 +80,14 @@ def decode_token(token: str) -> dict:
         raise HTTPException(status_code=401, detail='Invalid token')
 
 
+def decode_session_token(token: str) -> dict:
+    """Decode a login token; scoped tokens (e.g. document downloads, which travel in URLs) are refused"""
+    payload = decode_token(token)
+    if payload.get('scope'):
+        raise HTTPException(status_code=401, detail='Invalid token')
+    return payload
+
+
 def verify_admin_token(token: str) -> dict:
     """Verify admin token"""
     try:
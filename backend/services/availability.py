@@ -0,0 +1,211 @@
+import bisect
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from .database import db
+from .ttl_cache import TTLCache
+from .user_cache import user_cache
+
+AVAILABILITY_TTL_SECONDS = float(os.environ.get('AVAILABILITY_TTL_SECONDS', '60'))
+AVAILABILITY_MAX_LAWYERS = int(os.environ.get('AVAILABILITY_MAX_LAWYERS', '5000'))
+# Booking date/time strings are wall-clock times in this zone
+APP_TIMEZONE = ZoneInfo(os.environ.get('APP_TIMEZONE', 'Asia/Kolkata'))
+
+# Booking statuses that no longer occupy the lawyer's calendar
+INACTIVE_BOOKING_STATUSES = ('cancelled', 'rejected')
+
+
+def to_naive(value: datetime) -> datetime:
+    """Calendar times are compared as naive APP_TIMEZONE wall-clock, like booking date/time strings"""
+    if value.tzinfo is not None:
+        value = value.astimezone(APP_TIMEZONE).replace(tzinfo=None)
+    return value
+
+
+def parse_event_time(value) -> Optional[datetime]:
+    """Parse an event start/end stored as an ISO string (or datetime)"""
+    if isinstance(value, datetime):
+        return to_naive(value)
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return to_naive(datetime.fromisoformat(value.replace('Z', '+00:00')))
+    except ValueError:
+        return None
+
+
+def parse_booking_start(date_str: str, time_str: str) -> Optional[datetime]:
+    """Parse a booking's date + time ("HH:MM" or "HH:MM AM/PM")"""
+    if not date_str or not time_str:
+        return None
+    time_str = time_str.strip()
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d %I:%M %p"):
+        try:
+            return datetime.strptime(f"{date_str} {time_str}", fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def booking_interval(booking: dict) -> Optional[Tuple[datetime, datetime]]:
+    start = parse_booking_start(booking.get('date'), booking.get('time'))
+    if start is None:
+        return None
+    return start, start + timedelta(minutes=booking.get('duration_minutes') or 30)
+
+
+def event_interval(event: dict) -> Optional[Tuple[datetime, datetime]]:
+    start = parse_event_time(event.get('start_time'))
+    end = parse_event_time(event.get('end_time'))
+    if start is None or end is None or end <= start:
+        return None
+    return start, end
+
+
+class LawyerSchedule:
+    """Busy intervals for one lawyer, kept as a sorted, merged interval array.
+
+    `_busy` maps a source key (event:<id> / booking:<id>) to its interval so
+    single entries can be removed; `_starts`/`_ends` hold the union of all
+    intervals, sorted and non-overlapping, for O(log n) overlap checks.
+    """
+
+    def __init__(self):
+        self._busy: Dict[str, Tuple[datetime, datetime]] = {}
+        self._starts: List[datetime] = []
+        self._ends: List[datetime] = []
+
+    def _rebuild(self) -> None:
+        starts, ends = [], []
+        for start, end in sorted(self._busy.values()):
+            if ends and start <= ends[-1]:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        self._starts, self._ends = starts, ends
+
+    def add(self, key: str, start: datetime, end: datetime) -> None:
+        previous = self._busy.get(key)
+        self._busy[key] = (start, end)
+        if previous is not None:
+            self._rebuild()
+            return
+
+        # Insert into the merged array, absorbing any neighbours it touches
+        i = bisect.bisect_left(self._ends, start)
+        j = bisect.bisect_right(self._starts, end)
+        if i < j:
+            start = min(start, self._starts[i])
+            end = max(end, self._ends[j - 1])
+        self._starts[i:j] = [start]
+        self._ends[i:j] = [end]
+
+    def remove(self, key: str) -> None:
+        if self._busy.pop(key, None) is not None:
+            self._rebuild()
+
+    def is_free(self, start: datetime, end: datetime, ignore: str = None) -> bool:
+        if ignore and ignore in self._busy:
+            # Rare path (reschedule): check against everything except `ignore`
+            return not any(
+                s < end and e > start for key, (s, e) in self._busy.items() if key != ignore
+            )
+        i = bisect.bisect_left(self._starts, end)
+        return i == 0 or self._ends[i - 1] <= start
+
+    def free_windows(self, window_start: datetime, window_end: datetime,
+                     min_minutes: int) -> List[Tuple[datetime, datetime]]:
+        """Gaps of at least `min_minutes` inside [window_start, window_end)"""
+        min_length = timedelta(minutes=min_minutes)
+        windows = []
+        cursor = window_start
+        i = max(0, bisect.bisect_right(self._starts, window_start) - 1)
+        while i < len(self._starts) and self._starts[i] < window_end:
+            if self._ends[i] > cursor:
+                if self._starts[i] - cursor >= min_length:
+                    windows.append((cursor, self._starts[i]))
+                cursor = max(cursor, self._ends[i])
+            i += 1
+        if window_end - cursor >= min_length:
+            windows.append((cursor, window_end))
+        return windows
+
+
+async def lawyer_exists(lawyer_id: str) -> bool:
+    if await user_cache.get_user(lawyer_id):
+        return True
+    return await db.lawyers.find_one({'id': lawyer_id}, {'_id': 1}) is not None
+
+
+class AvailabilityIndex:
+    """Per-lawyer schedules loaded lazily from events and bookings.
+
+    Writes in this worker update the schedule incrementally; entries are
+    reloaded after `ttl` seconds so writes from other workers are picked up.
+    At most `max_lawyers` schedules are kept, least recently used first out.
+    """
+
+    def __init__(self, ttl: float = AVAILABILITY_TTL_SECONDS, max_lawyers: int = AVAILABILITY_MAX_LAWYERS):
+        self._schedules = TTLCache(ttl, max_lawyers)
+
+    async def _load(self, lawyer_id: str) -> LawyerSchedule:
+        schedule = LawyerSchedule()
+        async for event in db.events.find({'lawyer_id': lawyer_id}, {'_id': 0, 'id': 1, 'start_time': 1, 'end_time': 1}):
+            interval = event_interval(event)
+            if interval:
+                schedule._busy[f"event:{event['id']}"] = interval
+        async for booking in db.bookings.find(
+            {'lawyer_id': lawyer_id, 'status': {'$nin': list(INACTIVE_BOOKING_STATUSES)}},
+            {'_id': 0, 'id': 1, 'date': 1, 'time': 1, 'duration_minutes': 1}
+        ):
+            interval = booking_interval(booking)
+            if interval:
+                schedule._busy[f"booking:{booking['id']}"] = interval
+        schedule._rebuild()
+        # The public availability endpoint takes any id; only remember real lawyers
+        if schedule._busy or await lawyer_exists(lawyer_id):
+            self._schedules.set(lawyer_id, schedule)
+        return schedule
+
+    async def get(self, lawyer_id: str) -> LawyerSchedule:
+        schedule = self._schedules.get(lawyer_id)
+        if schedule is None:
+            return await self._load(lawyer_id)
+        return schedule
+
+    def _cached(self, lawyer_id: str) -> Optional[LawyerSchedule]:
+        # Only patch schedules already in memory; others load fresh on demand
+        return self._schedules.peek(lawyer_id)
+
+    def add_event(self, event: dict) -> None:
+        schedule = self._cached(event.get('lawyer_id'))
+        interval = event_interval(event)
+        if schedule is not None and interval:
+            schedule.add(f"event:{event['id']}", *interval)
+
+    def remove_event(self, lawyer_id: str, event_id: str) -> None:
+        schedule = self._cached(lawyer_id)
+        if schedule is not None:
+            schedule.remove(f"event:{event_id}")
+
+    def add_booking(self, booking: dict) -> None:
+        schedule = self._cached(booking.get('lawyer_id'))
+        if schedule is None:
+            return
+        key = f"booking:{booking['id']}"
+        interval = booking_interval(booking)
+        if interval and booking.get('status') not in INACTIVE_BOOKING_STATUSES:
+            schedule.add(key, *interval)
+        else:
+            schedule.remove(key)
+
+    def remove_booking(self, lawyer_id: str, booking_id: str) -> None:
+        schedule = self._cached(lawyer_id)
+        if schedule is not None:
+            schedule.remove(f"booking:{booking_id}")
+
+
+availability = AvailabilityIndex()
@@ -0,0 +1,315 @@
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import AsyncIterator, Optional, Tuple
+
+import anyio
+from pymongo import ReturnDocument
+
+from .database import db
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR = Path(__file__).parent.parent / "uploads" / "blobs"
+# Unreferenced blobs are kept this long so a just-deleted document can be re-uploaded cheaply
+BLOB_GC_GRACE_SECONDS = float(os.environ.get('BLOB_GC_GRACE_SECONDS', '3600'))
+BLOB_GC_INTERVAL_SECONDS = float(os.environ.get('BLOB_GC_INTERVAL_SECONDS', '600'))
+BLOB_GC_BATCH = 200
+TRASH_SUFFIX = '.deleting'
+
+
+class BlobWriter:
+    """Receives one blob's bytes; `commit` publishes them under a key, `abort` discards them"""
+
+    async def write(self, chunk: bytes) -> None:
+        raise NotImplementedError
+
+    async def commit(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def abort(self) -> None:
+        raise NotImplementedError
+
+
+class BlobBackend:
+    """Interface for where blob bytes live (local disk now, an object store later).
+
+    Keys are opaque strings; the store uses the SHA-256 hex digest, plus a
+    suffixed key while a blob is being garbage-collected.
+    """
+
+    def writer(self) -> BlobWriter:
+        raise NotImplementedError
+
+    async def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    async def move(self, key: str, new_key: str) -> bool:
+        """Rename a blob; False if it didn't exist"""
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Filesystem path for zero-copy serving, or None for remote backends"""
+        return None
+
+    async def usage(self) -> dict:
+        raise NotImplementedError
+
+
+class _LocalWriter(BlobWriter):
+    def __init__(self, backend: 'LocalFilesystemBackend'):
+        self.backend = backend
+        self.tmp_path = backend.root / 'tmp' / uuid.uuid4().hex
+        self._file = None
+
+    async def write(self, chunk: bytes) -> None:
+        if self._file is None:
+            self.tmp_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = await anyio.open_file(self.tmp_path, 'wb')
+        await self._file.write(chunk)
+
+    async def _close(self) -> None:
+        if self._file is not None:
+            await self._file.aclose()
+            self._file = None
+
+    async def commit(self, key: str) -> None:
+        if self._file is None:
+            await self.write(b'')
+        await self._close()
+        path = self.backend._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self.tmp_path, path)
+
+    async def abort(self) -> None:
+        await self._close()
+        self.tmp_path.unlink(missing_ok=True)
+
+
+class LocalFilesystemBackend(BlobBackend):
+    """Blobs as files under root/ab/cd/<key>, written via a temp file and an atomic rename"""
+
+    def __init__(self, root: Path = BLOB_DIR):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key[2:4] / key
+
+    def writer(self) -> BlobWriter:
+        return _LocalWriter(self)
+
+    async def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    async def move(self, key: str, new_key: str) -> bool:
+        try:
+            os.replace(self._path(key), self._path(new_key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    async def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self._path(key)
+
+    async def usage(self) -> dict:
+        self.root.mkdir(parents=True, exist_ok=True)
+        disk = shutil.disk_usage(self.root)
+        return {'backend': 'local', 'root': str(self.root), 'disk_total_bytes': disk.total,
+                'disk_free_bytes': disk.free}
+
+
+class BlobStore:
+    """Content-addressed, reference-counted storage for uploaded documents.
+
+    Uploads are hashed while they stream to the backend, so identical files are
+    stored once under their SHA-256. `db.blobs` holds one row per blob with its
+    reference count; blobs whose count stays at zero past the grace period are
+    removed by a background sweep.
+    """
+
+    def __init__(self, backend: Optional[BlobBackend] = None, grace_seconds: float = BLOB_GC_GRACE_SECONDS,
+                 interval_seconds: float = BLOB_GC_INTERVAL_SECONDS):
+        self.backend = backend or LocalFilesystemBackend()
+        self.grace_seconds = grace_seconds
+        self.interval_seconds = interval_seconds
+        self._collector: Optional[asyncio.Task] = None
+        # async callables given the key of each collected blob (to drop data derived from it)
+        self.collect_hooks = []
+        self.uploads = 0
+        self.deduplicated = 0
+        self.bytes_received = 0
+        self.bytes_deduplicated = 0
+        self.collected = 0
+        self.bytes_collected = 0
+        self.last_gc_ms = 0.0
+
+    async def put_stream(self, chunks: AsyncIterator[bytes], content_type: Optional[str] = None,
+                         expected_sha256: Optional[str] = None) -> Tuple[str, int]:
+        """Store a stream of bytes and take a reference to it; returns (sha256, size).
+
+        With `expected_sha256`, a mismatching stream is discarded with a ValueError.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        writer = self.backend.writer()
+        try:
+            async for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                await writer.write(chunk)
+        except BaseException:
+            await writer.abort()
+            raise
+
+        key = digest.hexdigest()
+        if expected_sha256 is not None and key != expected_sha256.lower():
+            await writer.abort()
+            raise ValueError('Checksum mismatch')
+        # Take the reference before checking for the file: a sweep that already
+        # claimed this blob sees the new reference and puts the file back
+        previous = await db.blobs.find_one_and_update(
+            {'_id': key},
+            {
+                '$inc': {'refs': 1},
+                '$set': {'state': 'live'},
+                '$setOnInsert': {'size': size, 'content_type': content_type,
+                                 'created_at': datetime.now(timezone.utc)}
+            },
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+        if await self.backend.exists(key):
+            await writer.abort()
+        else:
+            await writer.commit(key)
+
+        self.uploads += 1
+        self.bytes_received += size
+        if previous is not None and previous.get('state') == 'live':
+            self.deduplicated += 1
+            self.bytes_deduplicated += size
+        return key, size
+
+    async def release(self, key: str) -> None:
+        """Drop one reference; the blob is collected once unreferenced for the grace period"""
+        await db.blobs.update_one(
+            {'_id': key, 'refs': {'$gt': 0}},
+            {'$inc': {'refs': -1}, '$set': {'released_at': datetime.now(timezone.utc)}}
+        )
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self.backend.local_path(key)
+
+    async def collect_garbage(self) -> int:
+        """Delete blobs unreferenced since before the grace period; returns how many.
+
+        Each blob is claimed (state 'deleting') and its file moved aside before
+        the row is removed. If an upload re-references it meanwhile, the row no
+        longer matches and the file is moved back.
+        """
+        started = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=self.grace_seconds)
+        collected = 0
+        for _ in range(BLOB_GC_BATCH):
+            # Claims left behind by a sweep that died are retried after the grace period
+            blob = await db.blobs.find_one_and_update(
+                {'refs': {'$lte': 0}, 'released_at': {'$lt': cutoff}, '$or': [
+                    {'state': 'live'},
+                    {'state': 'deleting', 'claimed_at': {'$lt': cutoff}}
+                ]},
+                {'$set': {'state': 'deleting', 'claimed_at': now}}
+            )
+            if blob is None:
+                break
+            key = blob['_id']
+            moved = await self.backend.move(key, key + TRASH_SUFFIX)
+            removed = await db.blobs.delete_one({'_id': key, 'state': 'deleting', 'refs': {'$lte': 0}})
+            if removed.deleted_count:
+                await self.backend.delete(key + TRASH_SUFFIX)
+                for hook in self.collect_hooks:
+                    await hook(key)
+                collected += 1
+                self.bytes_collected += blob.get('size', 0)
+            elif moved and not await self.backend.exists(key):
+                await self.backend.move(key + TRASH_SUFFIX, key)
+            else:
+                await self.backend.delete(key + TRASH_SUFFIX)
+        self.collected += collected
+        self.last_gc_ms = (time.perf_counter() - started) * 1000
+        return collected
+
+    def start(self) -> None:
+        if self._collector is None or self._collector.done():
+            self._collector = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._collector is not None:
+            self._collector.cancel()
+            self._collector = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                collected = await self.collect_garbage()
+                if collected:
+                    logger.info(f'Collected {collected} unreferenced blobs')
+            except Exception as e:
+                logger.warning(f'Blob garbage collection failed: {e}')
+            await asyncio.sleep(self.interval_seconds)
+
+    async def stats(self) -> dict:
+        """Stored vs. referenced bytes from db.blobs, plus backend disk usage and counters"""
+        rows = await db.blobs.aggregate([
+            {'$group': {
+                '_id': None,
+                'blobs': {'$sum': 1},
+                'stored_bytes': {'$sum': '$size'},
+                'logical_bytes': {'$sum': {'$multiply': ['$size', {'$max': ['$refs', 0]}]}},
+                'references': {'$sum': '$refs'},
+                'unreferenced': {'$sum': {'$cond': [{'$lte': ['$refs', 0]}, 1, 0]}}
+            }}
+        ]).to_list(1)
+        totals = rows[0] if rows else {'blobs': 0, 'stored_bytes': 0, 'logical_bytes': 0,
+                                       'references': 0, 'unreferenced': 0}
+        totals.pop('_id', None)
+        return {
+            **totals,
+            'dedup_ratio': round(totals['logical_bytes'] / totals['stored_bytes'], 3) if totals['stored_bytes'] else 1.0,
+            'uploads': self.uploads,
+            'deduplicated_uploads': self.deduplicated,
+            'bytes_received': self.bytes_received,
+            'bytes_deduplicated': self.bytes_deduplicated,
+            'collected': self.collected,
+            'bytes_collected': self.bytes_collected,
+            'last_gc_ms': round(self.last_gc_ms, 2),
+            'grace_seconds': self.grace_seconds,
+            'backend': await self.backend.usage()
+        }
+
+
+blob_store = BlobStore()
+
+
+def configure_blob_store(backend: Optional[BlobBackend] = None, grace_seconds: float = None,
+                         interval_seconds: float = None) -> BlobStore:
+    """Swap in another backend or GC timings (call once at startup)"""
+    if backend is not None:
+        blob_store.backend = backend
+    if grace_seconds is not None:
+        blob_store.grace_seconds = grace_seconds
+    if interval_seconds is not None:
+        blob_store.interval_seconds = interval_seconds
+    return blob_store
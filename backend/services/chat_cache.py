@@ -0,0 +1,181 @@
+import hashlib
+import math
+import os
+import unicodedata
+from typing import Dict, Optional, Tuple
+
+from .text_search import tokenize
+from .ttl_cache import TTLCache
+
+CHAT_CACHE_TTL_SECONDS = float(os.environ.get('CHAT_CACHE_TTL_SECONDS', '21600'))
+CHAT_CACHE_MAX_ENTRIES = int(os.environ.get('CHAT_CACHE_MAX_ENTRIES', '2000'))
+# Similarity matching is opt-in: a near-miss answer is worse than an LLM call
+CHAT_CACHE_SEMANTIC = os.environ.get('CHAT_CACHE_SEMANTIC', '0') == '1'
+CHAT_CACHE_SIMILARITY = float(os.environ.get('CHAT_CACHE_SIMILARITY', '0.9'))
+EMBEDDING_DIMENSIONS = 4096
+
+
+def normalize_message(message: str) -> str:
+    """Case, whitespace and punctuation-insensitive form of a question"""
+    text = unicodedata.normalize('NFC', message.lower())
+    return ' '.join(''.join(char if char.isalnum() or unicodedata.category(char).startswith('M') else ' '
+                            for char in text).split())
+
+
+class HashingEmbedder:
+    """Feature-hashed word unigrams and bigrams (Hindi-aware tokens) as a sparse, L2-normalised
+    {dimension: weight} vector. Needs no model; any object with the same embed() can be
+    plugged in through configure_chat_cache().
+    """
+
+    def __init__(self, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def _slot(self, feature: str) -> int:
+        return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big') % self.dimensions
+
+    def embed(self, text: str) -> Dict[int, float]:
+        tokens = tokenize(text)
+        features = tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]
+        vector: Dict[int, float] = {}
+        for feature in features:
+            slot = self._slot(feature)
+            vector[slot] = vector.get(slot, 0.0) + 1.0
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {slot: weight / norm for slot, weight in vector.items()} if norm else {}
+
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(slot, 0.0) for slot, weight in a.items())
+
+
+class ChatResponseCache:
+    """TTL + LRU cache of assistant replies keyed by system prompt + normalised message.
+
+    Lookups try the exact key first, then (when semantic matching is enabled)
+    the most similar cached question under the same system prompt.
+    """
+
+    def __init__(self, ttl: float = CHAT_CACHE_TTL_SECONDS, max_entries: int = CHAT_CACHE_MAX_ENTRIES,
+                 semantic: bool = CHAT_CACHE_SEMANTIC, similarity: float = CHAT_CACHE_SIMILARITY,
+                 embedder: Optional[HashingEmbedder] = None):
+        self.semantic = semantic
+        self.similarity = similarity
+        self.embedder = embedder or HashingEmbedder()
+        self._entries = TTLCache(ttl, max_entries, on_remove=self._forget_vector)
+        # prompt hash -> {key: vector}, the local vector index for similarity lookups
+        self._vectors: Dict[str, Dict[str, Dict[int, float]]] = {}
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    @staticmethod
+    def _prompt_hash(system_prompt: str) -> str:
+        return hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()[:16]
+
+    def _key(self, prompt_hash: str, normalized: str) -> str:
+        return hashlib.sha256(f'{prompt_hash}:{normalized}'.encode('utf-8')).hexdigest()
+
+    def _forget_vector(self, key: str, entry: dict) -> None:
+        self._vectors.get(entry['prompt_hash'], {}).pop(key, None)
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        if entry is not None:
+            self._forget_vector(key, entry)
+
+    def _nearest(self, prompt_hash: str, vector: Dict[int, float]) -> Optional[str]:
+        best_key, best_score = None, self.similarity
+        for key, candidate in list(self._vectors.get(prompt_hash, {}).items()):
+            score = cosine(vector, candidate)
+            if score >= best_score and self._entries.peek(key) is not None:
+                best_key, best_score = key, score
+        return best_key
+
+    def get(self, message: str, system_prompt: str) -> Tuple[Optional[str], str]:
+        """(response, 'hit' | 'semantic-hit' | 'miss')"""
+        prompt_hash = self._prompt_hash(system_prompt)
+        normalized = normalize_message(message)
+        key = self._key(prompt_hash, normalized)
+        outcome = 'hit'
+
+        entry = self._entries.get(key)
+        if entry is None and self.semantic and normalized:
+            similar = self._nearest(prompt_hash, self.embedder.embed(normalized))
+            if similar is not None:
+                entry, outcome = self._entries.get(similar), 'semantic-hit'
+
+        if entry is None:
+            self.misses += 1
+            return None, 'miss'
+
+        entry['hits'] += 1
+        if outcome == 'hit':
+            self.hits += 1
+        else:
+            self.semantic_hits += 1
+        return entry['response'], outcome
+
+    def set(self, message: str, system_prompt: str, response: str) -> None:
+        prompt_hash = self._prompt_hash(system_prompt)
+        normalized = normalize_message(message)
+        if not normalized:
+            return
+        key = self._key(prompt_hash, normalized)
+        self._drop(key)
+        if self.semantic:
+            self._vectors.setdefault(prompt_hash, {})[key] = self.embedder.embed(normalized)
+        self._entries.set(key, {
+            'message': normalized,
+            'prompt_hash': prompt_hash,
+            'response': response,
+            'hits': 0
+        })
+
+    def record_bypass(self) -> None:
+        self.bypassed += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._vectors.clear()
+
+    def stats(self, top: int = 10) -> dict:
+        lookups = self.hits + self.semantic_hits + self.misses
+        popular = sorted(self._entries.values(), key=lambda entry: -entry['hits'])[:top]
+        return {
+            'entries': len(self._entries),
+            'max_entries': self._entries.max_entries,
+            'ttl_seconds': self._entries.ttl,
+            'semantic': self.semantic,
+            'similarity_threshold': self.similarity,
+            'hits': self.hits,
+            'semantic_hits': self.semantic_hits,
+            'misses': self.misses,
+            'bypassed': self.bypassed,
+            'evictions': self._entries.evictions,
+            'hit_rate': round((self.hits + self.semantic_hits) / lookups, 4) if lookups else 0.0,
+            'top_entries': [{'message': entry['message'], 'hits': entry['hits']} for entry in popular]
+        }
+
+
+chat_cache = ChatResponseCache()
+
+
+def configure_chat_cache(embedder: Optional[HashingEmbedder] = None, semantic: bool = None, similarity: float = None,
+                         ttl: float = None, max_entries: int = None) -> ChatResponseCache:
+    """Swap in an embedding model or new limits (call once at startup)"""
+    if embedder is not None:
+        chat_cache.embedder = embedder
+    if semantic is not None:
+        chat_cache.semantic = semantic
+    if similarity is not None:
+        chat_cache.similarity = similarity
+    if ttl is not None:
+        chat_cache._entries.ttl = ttl
+    if max_entries is not None:
+        chat_cache._entries.max_entries = max_entries
+    chat_cache.clear()
+    return chat_cache
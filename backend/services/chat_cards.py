@@ -0,0 +1,131 @@
+import json
+import re
+from typing import List, Optional, Tuple
+
+from .database import db
+from .chat_service import CardStreamParser
+
+CARD_TYPES = ('greeting', 'question', 'info', 'advice', 'action', 'warning', 'definition')
+DEFAULT_CARD_TYPE = 'info'
+MAX_CARDS = 8
+MAX_TITLE_CHARS = 120
+MAX_CONTENT_CHARS = 2000
+# Keys models use instead of `content`/`title`
+CONTENT_ALIASES = ('content', 'text', 'body', 'message', 'description')
+TITLE_ALIASES = ('title', 'heading', 'header')
+
+CODE_FENCE = re.compile(r'```(?:json|JSON)?\s*([\s\S]*?)```')
+TRAILING_COMMA = re.compile(r',\s*([}\]])')
+SMART_QUOTES = str.maketrans({'“': '"', '”': '"', '„': '"'})
+# '## Heading' or '**Heading**:' starts a section in markdown replies
+SECTION_START = re.compile(r'(?m)^(?=#{1,3}\s|\*\*[^*\n]+\*\*:)')
+HEADING = re.compile(r'^(?:#{1,3}\s*(.+?)\s*(?:\n|$)|\*\*([^*\n]+)\*\*:\s*)')
+
+
+def normalize_card(card) -> Optional[dict]:
+    """Coerce one model-produced card to {type, title, content}; None if it carries no text"""
+    if not isinstance(card, dict):
+        return None
+    title = next((card[key] for key in TITLE_ALIASES if isinstance(card.get(key), str)), '')
+    content = next((card[key] for key in CONTENT_ALIASES if isinstance(card.get(key), (str, list))), '')
+    if isinstance(content, list):
+        content = '\n'.join(f'• {item}' for item in content if isinstance(item, str))
+    title, content = title.strip()[:MAX_TITLE_CHARS], content.strip()[:MAX_CONTENT_CHARS]
+    if not title and not content:
+        return None
+    card_type = str(card.get('type', '')).strip().lower()
+    return {
+        'type': card_type if card_type in CARD_TYPES else DEFAULT_CARD_TYPE,
+        'title': title,
+        'content': content
+    }
+
+
+def _cards_from_json(value) -> Optional[list]:
+    if isinstance(value, dict) and isinstance(value.get('cards'), list):
+        return value['cards']
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict) and any(key in value for key in CONTENT_ALIASES):
+        return [value]
+    return None
+
+
+def _load_json(text: str) -> Optional[list]:
+    candidates = [text]
+    start, end = text.find('{'), text.rfind('}')
+    if 0 <= start < end:
+        candidates.append(text[start:end + 1])
+    for candidate in candidates:
+        for attempt in (candidate, TRAILING_COMMA.sub(r'\1', candidate.translate(SMART_QUOTES))):
+            try:
+                cards = _cards_from_json(json.loads(attempt))
+            except ValueError:
+                continue
+            if cards is not None:
+                return cards
+    return None
+
+
+def _cards_from_markdown(text: str) -> list:
+    cards = []
+    for section in SECTION_START.split(text):
+        section = section.strip()
+        if not section:
+            continue
+        heading = HEADING.match(section)
+        if heading:
+            title = (heading.group(1) or heading.group(2)).replace('*', '').replace('#', '').strip()
+            content = section[heading.end():].strip()
+        else:
+            title, content = '', section
+        cards.append({'type': DEFAULT_CARD_TYPE, 'title': title, 'content': content})
+    return cards
+
+
+def parse_cards(raw: str) -> Tuple[List[dict], bool]:
+    """Validated cards from a raw LLM reply, and whether it needed repairing.
+
+    Tries, in order: strict JSON; fenced/embedded JSON with trailing commas and
+    smart quotes fixed; complete cards salvaged from truncated JSON; and finally
+    markdown sections or the plain text as info cards.
+    """
+    text = (raw or '').strip()
+    cards, repaired = None, False
+    try:
+        cards = _cards_from_json(json.loads(text))
+    except ValueError:
+        pass
+
+    if cards is None:
+        repaired = True
+        fenced = CODE_FENCE.search(text)
+        cards = _load_json(fenced.group(1) if fenced else text)
+    if cards is None:
+        cards = CardStreamParser().feed(text) or None
+    if cards is None and text:
+        cards = _cards_from_markdown(text)
+
+    valid = [card for card in map(normalize_card, cards or []) if card is not None][:MAX_CARDS]
+    return valid, repaired or len(valid) != len(cards or [])
+
+
+def cards_json(cards: List[dict]) -> str:
+    """Canonical `{"cards": [...]}` string returned as `response` for older clients"""
+    return json.dumps({'cards': cards}, ensure_ascii=False)
+
+
+async def backfill_chat_cards() -> int:
+    """Parse `cards` for chat history saved before they were stored.
+
+    The original reply moves to `raw_response`, where new turns keep theirs.
+    """
+    updated = 0
+    async for turn in db.chat_history.find({'cards': {'$exists': False}}, {'_id': 1, 'response': 1}):
+        cards, repaired = parse_cards(turn.get('response'))
+        result = await db.chat_history.update_one(
+            {'_id': turn['_id'], 'cards': {'$exists': False}},
+            {'$set': {'cards': cards, 'repaired': repaired}, '$rename': {'response': 'raw_response'}}
+        )
+        updated += result.modified_count
+    return updated
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import List
+
+from .database import db
+from .chat_service import send_chat_message
+from .chat_cards import parse_cards
+
+logger = logging.getLogger(__name__)
+
+CHAT_CONTEXT_TURNS = int(os.environ.get('CHAT_CONTEXT_TURNS', '10'))
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.environ.get('CHAT_CONTEXT_TOKEN_BUDGET', '1500'))
+# Older turns are folded into the summary once this many are waiting
+CHAT_SUMMARY_BATCH = int(os.environ.get('CHAT_SUMMARY_BATCH', '10'))
+CHAT_SUMMARY_MAX_TURNS = 100
+CHAT_SUMMARY_MAX_CHARS = 2000
+TURN_PROJECTION = {'_id': 0, 'message': 1, 'cards': 1, 'timestamp': 1}
+
+SUMMARY_SYSTEM_PROMPT = """You maintain a running summary of a conversation between a user and a legal assistant for an Indian legal tech platform.
+Merge the previous summary with the new turns into one plain-text summary of at most 150 words.
+Keep the facts that matter for later advice: the user's situation, parties, dates, amounts, places, documents and what was already advised.
+Output only the summary text, no JSON or markdown."""
+
+
+def estimate_tokens(text: str) -> int:
+    """~4 bytes per token; UTF-8 length keeps Devanagari (3 bytes/char) from being undercounted"""
+    return len(text.encode('utf-8')) // 4 + 1
+
+
+def cards_text(cards: List[dict]) -> str:
+    """Cards flattened to 'title: content' lines (much cheaper to resend than JSON)"""
+    return '\n'.join(f"{card.get('title', '')}: {card.get('content', '')}".strip(': ') for card in cards)
+
+
+def format_turn(turn: dict) -> str:
+    return f"User: {turn.get('message', '')}\nAssistant: {cards_text(turn.get('cards') or [])}"
+
+
+def select_turns(summary: str, turns: List[dict], message: str, budget: int = CHAT_CONTEXT_TOKEN_BUDGET) -> List[str]:
+    """Newest turns (oldest-first in the result) that fit in the budget after the summary and message"""
+    remaining = budget - estimate_tokens(summary) - estimate_tokens(message)
+    selected = []
+    for turn in turns:
+        text = format_turn(turn)
+        cost = estimate_tokens(text)
+        if cost > remaining:
+            break
+        selected.append(text)
+        remaining -= cost
+    return selected[::-1]
+
+
+async def build_context_message(user_id: str, message: str) -> str:
+    """Prompt for `message` carrying the stored summary and the most recent turns.
+
+    Only the last CHAT_CONTEXT_TURNS turns are read (user_id_timestamp_id index),
+    and those are trimmed to CHAT_CONTEXT_TOKEN_BUDGET, so the prompt stays
+    bounded however long the history grows.
+    """
+    summary_doc, turns = await asyncio.gather(
+        db.chat_summaries.find_one({'user_id': user_id}, {'_id': 0, 'summary': 1, 'summarized_until': 1}),
+        db.chat_history.find({'user_id': user_id}, TURN_PROJECTION)
+            .sort('timestamp', -1).limit(CHAT_CONTEXT_TURNS).to_list(CHAT_CONTEXT_TURNS)
+    )
+    summary = (summary_doc or {}).get('summary', '')
+    summarized_until = (summary_doc or {}).get('summarized_until')
+    if summarized_until:
+        turns = [turn for turn in turns if turn.get('timestamp', '') > summarized_until]
+
+    recent = select_turns(summary, turns, message)
+    if not summary and not recent:
+        return message
+
+    parts = []
+    if summary:
+        parts.append(f"[Conversation so far]\n{summary}")
+    if recent:
+        parts.append("[Recent messages]\n" + "\n\n".join(recent))
+    parts.append(f"[Current message]\n{message}")
+    return "\n\n".join(parts)
+
+
+class ChatSummarizer:
+    """Folds turns that have left the context window into a stored rolling summary.
+
+    Runs in the background after a reply is saved; one run per user at a time.
+    """
+
+    def __init__(self):
+        self._running = {}
+        self.runs = 0
+        self.failures = 0
+
+    def schedule(self, user_id: str) -> None:
+        task = self._running.get(user_id)
+        if task is not None and not task.done():
+            return
+        self._running[user_id] = asyncio.create_task(self._run(user_id))
+
+    async def _run(self, user_id: str) -> None:
+        try:
+            await self.summarize(user_id)
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"Chat summary for {user_id} failed: {e}")
+        finally:
+            self._running.pop(user_id, None)
+
+    async def summarize(self, user_id: str) -> bool:
+        """Summarise unsummarised turns older than the window; returns True if the summary changed"""
+        summary_doc = await db.chat_summaries.find_one({'user_id': user_id}, {'_id': 0}) or {}
+        query = {'user_id': user_id}
+        if summary_doc.get('summarized_until'):
+            query['timestamp'] = {'$gt': summary_doc['summarized_until']}
+
+        pending = await db.chat_history.find(query, TURN_PROJECTION).sort('timestamp', 1) \
+            .limit(CHAT_SUMMARY_MAX_TURNS + CHAT_CONTEXT_TURNS).to_list(CHAT_SUMMARY_MAX_TURNS + CHAT_CONTEXT_TURNS)
+        # Turns still inside the window are sent verbatim and don't need summarising yet
+        older = pending[:-CHAT_CONTEXT_TURNS] if len(pending) > CHAT_CONTEXT_TURNS else []
+        if len(older) < CHAT_SUMMARY_BATCH:
+            return False
+
+        previous = summary_doc.get('summary', '')
+        request = (f"Previous summary:\n{previous or '(none)'}\n\nNew turns:\n"
+                   + "\n\n".join(format_turn(turn) for turn in older))
+        summary = await send_chat_message(request, f'summary_{user_id}', SUMMARY_SYSTEM_PROMPT, stateless=True)
+        cards, _ = parse_cards(summary)
+        summary = (cards_text(cards) if cards else summary.strip())[:CHAT_SUMMARY_MAX_CHARS]
+
+        await db.chat_summaries.update_one(
+            {'user_id': user_id},
+            {
+                '$set': {
+                    'summary': summary,
+                    'summarized_until': older[-1]['timestamp'],
+                    'updated_at': datetime.now(timezone.utc).isoformat()
+                },
+                '$inc': {'turns_summarized': len(older)}
+            },
+            upsert=True
+        )
+        self.runs += 1
+        return True
+
+    def stats(self) -> dict:
+        return {'running': len(self._running), 'runs': self.runs, 'failures': self.failures}
+
+
+chat_summarizer = ChatSummarizer()
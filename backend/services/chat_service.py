@@ -1,9 +1,13 @@
 import os
+import json
 import logging
 import uuid
 from datetime import datetime, timezone
-from emergentintegrations.llm.chat import LlmChat, UserMessage
 from fastapi import HTTPException
+from .llm_pool import llm_clients
+
+LLM_PROVIDER = os.environ.get('LLM_PROVIDER', 'gemini')
+LLM_MODEL = os.environ.get('LLM_MODEL', 'gemini-3-flash-preview')
 
 # Default system prompt for legal assistant
 DEFAULT_SYSTEM_PROMPT = """You are a helpful legal assistant for Lxwyer Up, an Indian legal tech platform.
@@ -32,26 +36,88 @@ RULES:
 - ONLY output valid JSON, no markdown or extra text"""
 
 
-async def send_chat_message(message: str, session_id: str, system_prompt: str = None) -> str:
+async def send_chat_message(message: str, session_id: str, system_prompt: str = None, stateless: bool = False) -> str:
     """Send a message to the LLM chat and get response"""
     prompt = system_prompt if system_prompt else DEFAULT_SYSTEM_PROMPT
     
     try:
-        chat_client = LlmChat(
-            api_key=os.environ.get('EMERGENT_LLM_KEY'),
-            session_id=session_id,
-            system_message=prompt
-        ).with_model('gemini', 'gemini-3-flash-preview')
-        
-        user_message = UserMessage(text=message)
-        response = await chat_client.send_message(user_message)
-        
-        return response
+        return await llm_clients.send(LLM_PROVIDER, LLM_MODEL, prompt, session_id, message, stateless)
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f'Chat service error: {str(e)}')
         raise HTTPException(status_code=500, detail=f'Chat service error: {str(e)}')
 
 
+async def stream_chat_message(message: str, session_id: str, system_prompt: str = None, stateless: bool = False):
+    """Yield response text chunks as the LLM produces them.
+
+    Backends without `stream_message` yield the whole response as one chunk.
+    Errors are raised as-is; the caller decides how to report them mid-stream.
+    """
+    prompt = system_prompt if system_prompt else DEFAULT_SYSTEM_PROMPT
+    async for chunk in llm_clients.stream(LLM_PROVIDER, LLM_MODEL, prompt, session_id, message, stateless):
+        if chunk:
+            yield chunk
+
+
+class CardStreamParser:
+    """Pull complete card objects out of a partially received `{"cards": [...]}` reply.
+
+    Tracks bracket depth outside of string literals, so each card is emitted as
+    soon as its closing brace arrives; text around the JSON (e.g. markdown
+    fences) is ignored.
+    """
+
+    def __init__(self):
+        self.text = ''
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escaped = False
+        self._card_start = None
+
+    def feed(self, chunk: str) -> list:
+        """Add a chunk; returns the cards completed by it"""
+        self.text += chunk
+        cards = []
+        for i in range(self._pos, len(self.text)):
+            char = self.text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            
+            if char == '"':
+                self._in_string = True
+            elif char in '{[':
+                # A card is an object directly inside the top-level object's array
+                if char == '{' and self._stack == ['{', '[']:
+                    self._card_start = i
+                self._stack.append(char)
+            elif char in '}]' and self._stack:
+                self._stack.pop()
+                if char == '}' and self._stack == ['{', '['] and self._card_start is not None:
+                    card = self._load(self.text[self._card_start:i + 1])
+                    if card is not None:
+                        cards.append(card)
+                    self._card_start = None
+        self._pos = len(self.text)
+        return cards
+
+    @staticmethod
+    def _load(raw: str):
+        try:
+            card = json.loads(raw)
+        except ValueError:
+            return None
+        return card if isinstance(card, dict) else None
+
+
 def generate_guest_session_id() -> str:
     """Generate a unique session ID for guest users"""
     return f"guest_{uuid.uuid4()}"
@@ -0,0 +1,292 @@
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import AsyncIterator, Optional, Tuple
+
+import anyio
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+from .database import db
+from .blob_store import blob_store
+
+logger = logging.getLogger(__name__)
+
+SESSION_DIR = Path(__file__).parent.parent / "uploads" / "sessions"
+UPLOAD_CHUNK_BYTES = int(os.environ.get('UPLOAD_CHUNK_BYTES', str(8 * 1024 * 1024)))
+UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', str(1024 * 1024 * 1024)))
+UPLOAD_SESSION_TTL_SECONDS = float(os.environ.get('UPLOAD_SESSION_TTL_SECONDS', '86400'))
+UPLOAD_CLEANUP_INTERVAL_SECONDS = float(os.environ.get('UPLOAD_CLEANUP_INTERVAL_SECONDS', '900'))
+# Per-user limits on unfinished sessions, so one account can't fill the disk with sparse files
+UPLOAD_MAX_SESSIONS_PER_USER = int(os.environ.get('UPLOAD_MAX_SESSIONS_PER_USER', '5'))
+UPLOAD_MAX_PENDING_BYTES_PER_USER = int(os.environ.get('UPLOAD_MAX_PENDING_BYTES_PER_USER',
+                                                       str(2 * UPLOAD_MAX_BYTES)))
+READ_BYTES = 1024 * 1024
+
+
+def chunk_count(size: int, chunk_size: int) -> int:
+    return max(1, -(-size // chunk_size))
+
+
+def missing_chunks(session: dict) -> list:
+    received = set(session.get('received', []))
+    return [index for index in range(session['chunks']) if index not in received]
+
+
+def public_session(session: dict) -> dict:
+    """What the client needs to resume: chunk size and which chunks are still missing"""
+    return {
+        'upload_id': session['id'],
+        'filename': session['filename'],
+        'size': session['size'],
+        'chunk_size': session['chunk_size'],
+        'chunks': session['chunks'],
+        'received': len(session.get('received', [])),
+        'missing': missing_chunks(session),
+        'status': session['status'],
+        'expires_at': session['expires_at'].isoformat()
+    }
+
+
+class ChunkedUploads:
+    """Resumable uploads: init a session, PUT fixed-size chunks at their offsets
+    (in any order, concurrently), then complete with the file's SHA-256.
+
+    Chunks are written in place into a sparse file under uploads/sessions; the
+    assembled file is streamed into the blob store on completion. Sessions idle
+    past their expiry are deleted with their partial file.
+
+    A completed session stays behind as 'stored' (holding the blob reference)
+    until the document is recorded under the upload id and `finish` is
+    called; cleanup releases the reference if that never happened.
+    """
+
+    def __init__(self, chunk_size: int = UPLOAD_CHUNK_BYTES, ttl_seconds: float = UPLOAD_SESSION_TTL_SECONDS):
+        self.chunk_size = chunk_size
+        self.ttl_seconds = ttl_seconds
+        self._cleaner: Optional[asyncio.Task] = None
+        self.created = 0
+        self.completed = 0
+        self.abandoned = 0
+        self.chunks_received = 0
+        self.bytes_received = 0
+        self.checksum_failures = 0
+        self.rejected = 0
+        self.released = 0
+
+    def _path(self, upload_id: str) -> Path:
+        return SESSION_DIR / upload_id
+
+    def _expiry(self) -> datetime:
+        return datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+
+    async def create(self, user_id: str, filename: str, size: int, content_type: Optional[str] = None,
+                     case_id: Optional[str] = None, title: Optional[str] = None) -> dict:
+        if size > UPLOAD_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f'File exceeds the {UPLOAD_MAX_BYTES} byte limit')
+        session = {
+            'id': str(uuid.uuid4()),
+            'user_id': user_id,
+            'filename': filename,
+            'size': size,
+            'content_type': content_type,
+            'case_id': case_id,
+            'title': title,
+            'chunk_size': self.chunk_size,
+            'chunks': chunk_count(size, self.chunk_size),
+            'received': [],
+            'status': 'open',
+            'created_at': datetime.now(timezone.utc),
+            'expires_at': self._expiry()
+        }
+        # Insert, then count including this session: concurrent creates can't both slip under the limit
+        await db.upload_sessions.insert_one(session)
+        session.pop('_id', None)
+        try:
+            await self._check_quota(user_id)
+        except HTTPException:
+            await db.upload_sessions.delete_one({'id': session['id']})
+            raise
+        SESSION_DIR.mkdir(parents=True, exist_ok=True)
+        with open(self._path(session['id']), 'wb') as f:
+            f.truncate(size)
+        self.created += 1
+        return session
+
+    async def _check_quota(self, user_id: str) -> None:
+        rows = await db.upload_sessions.aggregate([
+            {'$match': {'user_id': user_id, 'expires_at': {'$gt': datetime.now(timezone.utc)}}},
+            {'$group': {'_id': None, 'sessions': {'$sum': 1}, 'bytes': {'$sum': '$size'}}}
+        ]).to_list(1)
+        usage = rows[0] if rows else {'sessions': 0, 'bytes': 0}
+        if usage['sessions'] > UPLOAD_MAX_SESSIONS_PER_USER:
+            self.rejected += 1
+            raise HTTPException(status_code=429, detail=f'At most {UPLOAD_MAX_SESSIONS_PER_USER} uploads can be in progress')
+        if usage['bytes'] > UPLOAD_MAX_PENDING_BYTES_PER_USER:
+            self.rejected += 1
+            raise HTTPException(status_code=429,
+                                detail=f'Uploads in progress cannot exceed {UPLOAD_MAX_PENDING_BYTES_PER_USER} bytes')
+
+    async def get(self, upload_id: str, user_id: str) -> dict:
+        session = await db.upload_sessions.find_one({'id': upload_id, 'user_id': user_id}, {'_id': 0})
+        if not session:
+            raise HTTPException(status_code=404, detail='Upload session not found')
+        session['expires_at'] = session['expires_at'].replace(tzinfo=timezone.utc)
+        return session
+
+    async def write_chunk(self, upload_id: str, user_id: str, offset: int, body: AsyncIterator[bytes]) -> dict:
+        """Write one chunk at `offset` (a multiple of the chunk size); rewriting a chunk is harmless"""
+        session = await self.get(upload_id, user_id)
+        if session['status'] != 'open':
+            raise HTTPException(status_code=409, detail='Upload is already being completed')
+        if offset < 0 or offset % session['chunk_size'] or offset >= max(session['size'], 1):
+            raise HTTPException(status_code=400, detail=f"Offset must be a multiple of {session['chunk_size']} within the file")
+        expected = min(session['chunk_size'], session['size'] - offset)
+
+        written = 0
+        try:
+            async with await anyio.open_file(self._path(upload_id), 'r+b') as f:
+                await f.seek(offset)
+                async for piece in body:
+                    written += len(piece)
+                    if written > expected:
+                        raise HTTPException(status_code=413, detail=f'Chunk must be {expected} bytes')
+                    await f.write(piece)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail='Upload session not found')
+        if written != expected:
+            raise HTTPException(status_code=400, detail=f'Chunk must be {expected} bytes, got {written}')
+
+        session = await db.upload_sessions.find_one_and_update(
+            {'id': upload_id, 'status': 'open'},
+            {
+                '$addToSet': {'received': offset // session['chunk_size']},
+                '$set': {'expires_at': self._expiry()}
+            },
+            projection={'_id': 0},
+            return_document=ReturnDocument.AFTER
+        )
+        if session is None:
+            raise HTTPException(status_code=409, detail='Upload is no longer open')
+        self.chunks_received += 1
+        self.bytes_received += written
+        session['expires_at'] = session['expires_at'].replace(tzinfo=timezone.utc)
+        return session
+
+    async def _read(self, upload_id: str):
+        async with await anyio.open_file(self._path(upload_id), 'rb') as f:
+            while chunk := await f.read(READ_BYTES):
+                yield chunk
+
+    async def complete(self, upload_id: str, user_id: str, sha256: str) -> Tuple[dict, str, int]:
+        """Verify and store the assembled file; returns (session, content_hash, size).
+
+        The session is claimed first, so concurrent completes can't store it twice.
+        On a missing chunk or checksum mismatch it stays open for the client to fix.
+        The caller records the document under `upload_id`, then calls `finish`.
+        """
+        session = await db.upload_sessions.find_one_and_update(
+            {'id': upload_id, 'user_id': user_id, 'status': 'open'},
+            {'$set': {'status': 'completing', 'expires_at': self._expiry()}},
+            projection={'_id': 0},
+            return_document=ReturnDocument.AFTER
+        )
+        if session is None:
+            await self.get(upload_id, user_id)
+            raise HTTPException(status_code=409, detail='Upload is already being completed')
+
+        missing = missing_chunks(session)
+        try:
+            if missing:
+                raise HTTPException(status_code=400, detail={'message': 'Upload is incomplete', 'missing': missing})
+            try:
+                content_hash, size = await blob_store.put_stream(self._read(upload_id), session.get('content_type'),
+                                                                 expected_sha256=sha256)
+            except ValueError:
+                self.checksum_failures += 1
+                raise HTTPException(status_code=400, detail='Checksum does not match the uploaded data')
+        except BaseException:
+            await db.upload_sessions.update_one({'id': upload_id}, {'$set': {'status': 'open'}})
+            raise
+
+        # Until `finish`, the session records the blob reference in case the process dies first
+        await db.upload_sessions.update_one(
+            {'id': upload_id},
+            {'$set': {'status': 'stored', 'content_hash': content_hash, 'expires_at': self._expiry()}}
+        )
+        self._path(upload_id).unlink(missing_ok=True)
+        self.completed += 1
+        return session, content_hash, size
+
+    async def finish(self, upload_id: str) -> None:
+        """Forget a stored session once its document exists (or its reference was released)"""
+        await db.upload_sessions.delete_one({'id': upload_id, 'status': 'stored'})
+
+    async def _discard(self, upload_id: str) -> None:
+        self._path(upload_id).unlink(missing_ok=True)
+        await db.upload_sessions.delete_one({'id': upload_id})
+
+    async def cancel(self, upload_id: str, user_id: str) -> None:
+        session = await self.get(upload_id, user_id)
+        if session['status'] != 'open':
+            raise HTTPException(status_code=409, detail='Upload is already being completed')
+        await self._discard(upload_id)
+
+    async def cleanup(self) -> int:
+        """Delete sessions (and their partial files) that have expired.
+
+        A stored session whose document was never recorded releases its blob reference.
+        """
+        removed = 0
+        expired = db.upload_sessions.find({'expires_at': {'$lt': datetime.now(timezone.utc)}},
+                                          {'_id': 0, 'id': 1, 'status': 1, 'content_hash': 1})
+        async for session in expired:
+            if session.get('status') == 'stored' and session.get('content_hash'):
+                claimed = await db.upload_sessions.delete_one({'id': session['id'], 'status': 'stored'})
+                if claimed.deleted_count and not await db.documents.find_one({'id': session['id']}, {'_id': 1}):
+                    await blob_store.release(session['content_hash'])
+                    self.released += 1
+                continue
+            await self._discard(session['id'])
+            removed += 1
+        self.abandoned += removed
+        return removed
+
+    def start(self) -> None:
+        if self._cleaner is None or self._cleaner.done():
+            self._cleaner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._cleaner is not None:
+            self._cleaner.cancel()
+            self._cleaner = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                removed = await self.cleanup()
+                if removed:
+                    logger.info(f'Removed {removed} abandoned upload sessions')
+            except Exception as e:
+                logger.warning(f'Upload session cleanup failed: {e}')
+            await asyncio.sleep(UPLOAD_CLEANUP_INTERVAL_SECONDS)
+
+    async def stats(self) -> dict:
+        return {
+            'open_sessions': await db.upload_sessions.count_documents({}),
+            'chunk_size': self.chunk_size,
+            'created': self.created,
+            'completed': self.completed,
+            'abandoned': self.abandoned,
+            'chunks_received': self.chunks_received,
+            'bytes_received': self.bytes_received,
+            'checksum_failures': self.checksum_failures,
+            'rejected': self.rejected,
+            'released': self.released
+        }
+
+
+chunked_uploads = ChunkedUploads()
@@ -0,0 +1,106 @@
+from datetime import datetime, timezone
+
+from .database import db
+from .user_cache import user_cache
+
+# Users whose inbox has been backfilled, so the marker is only read once per process
+_backfilled = set()
+
+
+async def get_display_name(user_id: str) -> str:
+    """Resolve a user's display name (users first, then legacy lawyers collection)"""
+    user = await user_cache.get_user(user_id)
+    if not user:
+        user = await db.lawyers.find_one({'id': user_id}, {'_id': 0, 'full_name': 1})
+    return user.get('full_name', 'Unknown User') if user else 'Unknown User'
+
+
+async def record_message(message: dict, sender_name: str = None) -> None:
+    """Update both participants' inbox entries for a newly sent message"""
+    sender_id = message['sender_id']
+    receiver_id = message['receiver_id']
+    sender_name = sender_name or await get_display_name(sender_id)
+    receiver_name = await get_display_name(receiver_id)
+
+    last = {
+        'last_message': message['content'],
+        'last_message_at': message['timestamp'],
+        'last_sender_id': sender_id
+    }
+
+    await db.conversations.update_one(
+        {'user_id': sender_id, 'other_user_id': receiver_id},
+        {'$set': {**last, 'other_user_name': receiver_name}, '$setOnInsert': {'unread': 0}},
+        upsert=True
+    )
+    await db.conversations.update_one(
+        {'user_id': receiver_id, 'other_user_id': sender_id},
+        {'$set': {**last, 'other_user_name': sender_name}, '$inc': {'unread': 1}},
+        upsert=True
+    )
+
+
+async def mark_read(user_id: str, other_user_id: str) -> int:
+    """Mark every message from other_user_id to user_id as read"""
+    result = await db.messages.update_many(
+        {'sender_id': other_user_id, 'receiver_id': user_id, 'read': False},
+        {'$set': {'read': True}}
+    )
+    if result.modified_count:
+        # Decrement rather than reset, so a message that arrived meanwhile stays unread
+        await db.conversations.update_one(
+            {'user_id': user_id, 'other_user_id': other_user_id},
+            [{'$set': {'unread': {'$max': [0, {'$subtract': ['$unread', result.modified_count]}]}}}]
+        )
+    return result.modified_count
+
+
+async def backfill_conversations(user_id: str) -> None:
+    """Build a user's inbox entries from message history (for data predating the index)"""
+    pipeline = [
+        {"$match": {"$or": [{"sender_id": user_id}, {"receiver_id": user_id}]}},
+        {"$sort": {"timestamp": -1}},
+        {"$group": {
+            "_id": {"$cond": [{"$eq": ["$sender_id", user_id]}, "$receiver_id", "$sender_id"]},
+            "last_message": {"$first": "$$ROOT"},
+            "unread": {"$sum": {"$cond": [
+                {"$and": [{"$eq": ["$receiver_id", user_id]}, {"$ne": ["$read", True]}]}, 1, 0
+            ]}}
+        }}
+    ]
+    async for row in db.messages.aggregate(pipeline):
+        msg = row['last_message']
+        await db.conversations.update_one(
+            {'user_id': user_id, 'other_user_id': row['_id']},
+            {'$setOnInsert': {
+                'other_user_name': await get_display_name(row['_id']),
+                'last_message': msg['content'],
+                'last_message_at': msg['timestamp'],
+                'last_sender_id': msg['sender_id'],
+                'unread': row['unread']
+            }},
+            upsert=True
+        )
+
+
+async def ensure_backfilled(user_id: str) -> None:
+    """Backfill a user's inbox once; db.conversation_backfills records who is done"""
+    if user_id in _backfilled:
+        return
+    if not await db.conversation_backfills.find_one({'_id': user_id}, {'_id': 1}):
+        await backfill_conversations(user_id)
+        await db.conversation_backfills.update_one(
+            {'_id': user_id},
+            {'$setOnInsert': {'backfilled_at': datetime.now(timezone.utc).isoformat()}},
+            upsert=True
+        )
+    _backfilled.add(user_id)
+
+
+async def get_inbox(user_id: str, limit: int = 20) -> list:
+    """Return the user's most recent conversations from the materialized index"""
+    # Not keyed on an empty inbox: one message after the deploy would hide all older conversations
+    await ensure_backfilled(user_id)
+    return await db.conversations.find(
+        {'user_id': user_id}, {'_id': 0}
+    ).sort('last_message_at', -1).to_list(length=limit)
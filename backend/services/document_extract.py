@@ -0,0 +1,132 @@
+# CPU-bound document processing, run in worker processes by document_processing.
+# Nothing here touches the database: functions take a file path and return plain data.
+import io
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # page counts fall back to scanning the file; no text or PDF thumbnails
+    PdfReader = None
+
+PREVIEW_DIR = Path(__file__).parent.parent / "uploads" / "previews"
+THUMBNAIL_SIZE = int(os.environ.get('DOCUMENT_THUMBNAIL_SIZE', '320'))
+PREVIEW_SIZE = int(os.environ.get('DOCUMENT_PREVIEW_SIZE', '1280'))
+TEXT_MAX_CHARS = int(os.environ.get('DOCUMENT_TEXT_MAX_CHARS', '500000'))
+JPEG_QUALITY = 85
+PDF_PAGE = re.compile(rb'/Type\s*/Page(?![a-zA-Z])')
+TEXT_TYPES = ('text/', 'application/json', 'application/xml')
+
+
+def preview_paths(content_hash: str) -> dict:
+    """Relative paths of the derived images for a blob (shared by every document with that content)"""
+    folder = Path(content_hash[:2])
+    return {'thumbnail': (folder / f'{content_hash}_thumb.jpg').as_posix(),
+            'preview': (folder / f'{content_hash}_preview.jpg').as_posix()}
+
+
+def file_kind(path: str, content_type: Optional[str]) -> str:
+    content_type = (content_type or '').lower()
+    with open(path, 'rb') as f:
+        head = f.read(8)
+    if head.startswith(b'%PDF') or content_type == 'application/pdf':
+        return 'pdf'
+    if content_type.startswith('image/'):
+        return 'image'
+    if content_type.startswith(TEXT_TYPES):
+        return 'text'
+    try:
+        with Image.open(path):
+            return 'image'
+    except (UnidentifiedImageError, OSError):
+        return 'other'
+
+
+def _save_jpeg(image: Image.Image, max_size: int, relative_path: str) -> str:
+    image = image.copy()
+    image.thumbnail((max_size, max_size), Image.LANCZOS)
+    if image.mode not in ('RGB', 'L'):
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(rgba, mask=rgba.split()[-1])
+        image = background
+    path = PREVIEW_DIR / relative_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    image.convert('RGB').save(tmp, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    os.replace(tmp, path)
+    return relative_path
+
+
+def _write_previews(image: Image.Image, content_hash: str) -> dict:
+    image = ImageOps.exif_transpose(image)
+    paths = preview_paths(content_hash)
+    return {'thumbnail': _save_jpeg(image, THUMBNAIL_SIZE, paths['thumbnail']),
+            'preview': _save_jpeg(image, PREVIEW_SIZE, paths['preview'])}
+
+
+def _first_page_image(reader) -> Optional[Image.Image]:
+    """Largest embedded image on page 1; scanned PDFs (FIRs, stamped affidavits) are one image per page"""
+    try:
+        images = list(reader.pages[0].images)
+    except Exception:
+        return None
+    if not images:
+        return None
+    largest = max(images, key=lambda image: len(image.data))
+    try:
+        return Image.open(io.BytesIO(largest.data))
+    except (UnidentifiedImageError, OSError):
+        return None
+
+
+def _process_pdf(path: str, content_hash: str, result: dict) -> None:
+    if PdfReader is None:
+        with open(path, 'rb') as f:
+            result['page_count'] = len(PDF_PAGE.findall(f.read()))
+        return
+    reader = PdfReader(path)
+    result['page_count'] = len(reader.pages)
+    texts, length = [], 0
+    for page in reader.pages:
+        if length >= TEXT_MAX_CHARS:
+            break
+        text = page.extract_text() or ''
+        texts.append(text)
+        length += len(text)
+    result['text'] = '\n'.join(texts)[:TEXT_MAX_CHARS]
+    first_page = _first_page_image(reader)
+    if first_page is not None:
+        result.update(_write_previews(first_page, content_hash))
+
+
+def process_file(path: str, content_type: Optional[str], content_hash: str) -> dict:
+    """Page count, extracted text and thumbnail/preview images for one stored file"""
+    result = {'kind': file_kind(path, content_type), 'page_count': None, 'text': '',
+              'thumbnail': None, 'preview': None}
+    if result['kind'] == 'pdf':
+        _process_pdf(path, content_hash, result)
+    elif result['kind'] == 'image':
+        try:
+            with Image.open(path) as image:
+                result['page_count'] = getattr(image, 'n_frames', 1)
+                image.seek(0)
+                result.update(_write_previews(image, content_hash))
+        except UnidentifiedImageError:
+            # The kind came from the client's content type (SVG, HEIC, mislabelled files);
+            # retrying can't help, so store it without previews
+            result['kind'] = 'other'
+    elif result['kind'] == 'text':
+        with open(path, 'rb') as f:
+            result['text'] = f.read(TEXT_MAX_CHARS * 4).decode('utf-8', errors='replace')[:TEXT_MAX_CHARS]
+        result['page_count'] = 1
+    return result
+
+
+def remove_previews(content_hash: str) -> None:
+    for relative_path in preview_paths(content_hash).values():
+        (PREVIEW_DIR / relative_path).unlink(missing_ok=True)
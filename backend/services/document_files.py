@@ -0,0 +1,178 @@
+import os
+import re
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from fastapi import HTTPException
+from starlette.responses import Response
+
+from .database import db
+from .blob_store import blob_store
+from .document_extract import PREVIEW_DIR, preview_paths
+
+LEGACY_UPLOAD_DIR = Path(__file__).parent.parent / "uploads"
+DOCUMENT_CACHE_CONTROL = os.environ.get('DOCUMENT_CACHE_CONTROL', 'private, max-age=86400')
+SEND_BYTES = 256 * 1024
+BYTE_RANGE = re.compile(r'^\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) for a single `bytes=` range; None means send the whole file.
+
+    Multi-range and malformed headers are ignored (RFC 9110 lets servers do
+    that); ranges that start past the end raise RangeNotSatisfiable.
+    """
+    match = BYTE_RANGE.match(header or '')
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    if size == 0:
+        # No byte of an empty file can be addressed
+        raise RangeNotSatisfiable()
+    first, last = match.groups()
+    if first == '':
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable()
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        raise RangeNotSatisfiable()
+    if end < start:
+        return None
+    return start, end
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/"x" matches "x" """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    bare = etag[2:] if etag.startswith('W/') else etag
+    return any((tag.strip()[2:] if tag.strip().startswith('W/') else tag.strip()) == bare
+               for tag in if_none_match.split(','))
+
+
+def document_file(doc: dict) -> Tuple[Path, str]:
+    """(path, ETag) of a document's bytes: strong from the content hash, or weak
+    from size and mtime for files stored before the blob store"""
+    if doc.get('content_hash'):
+        path = blob_store.local_path(doc['content_hash'])
+        if path is not None and path.exists():
+            return path, f'"{doc["content_hash"]}"'
+    elif doc.get('file_path'):
+        path = LEGACY_UPLOAD_DIR / Path(doc['file_path']).name
+        if path.exists():
+            stat = path.stat()
+            return path, f'W/"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+    raise HTTPException(status_code=404, detail='Document file not found')
+
+
+def content_disposition(filename: str) -> str:
+    quoted = quote(filename or 'document')
+    return f"inline; filename*=utf-8''{quoted}"
+
+
+class DocumentFileResponse(Response):
+    """Sends [start, end] of a file.
+
+    Uses the ASGI zero-copy send extension (sendfile) or pathsend when the
+    server advertises them; otherwise streams SEND_BYTES reads from a thread.
+    """
+
+    def __init__(self, path: Path, start: int, end: int, status_code: int, headers: dict,
+                 media_type: Optional[str] = None):
+        self.path = path
+        self.start = start
+        self.end = end
+        self.full_file = start == 0 and end == path.stat().st_size - 1
+        super().__init__(status_code=status_code, headers={**headers, 'content-length': str(end - start + 1)},
+                         media_type=media_type)
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.raw_headers})
+        extensions = scope.get('extensions') or {}
+        length = self.end - self.start + 1
+        if scope.get('method') == 'HEAD' or length <= 0:
+            await send({'type': 'http.response.body', 'body': b''})
+        elif 'http.response.zerocopysend' in extensions:
+            with open(self.path, 'rb') as f:
+                await send({'type': 'http.response.zerocopysend', 'file': f.fileno(),
+                            'offset': self.start, 'count': length})
+        elif 'http.response.pathsend' in extensions and self.full_file:
+            await send({'type': 'http.response.pathsend', 'path': str(self.path)})
+        else:
+            async with await anyio.open_file(self.path, 'rb') as f:
+                await f.seek(self.start)
+                remaining = length
+                while remaining > 0:
+                    chunk = await f.read(min(SEND_BYTES, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': remaining > 0})
+                if remaining > 0:
+                    await send({'type': 'http.response.body', 'body': b''})
+        if self.background is not None:
+            await self.background()
+
+
+def serve_document(doc: dict, range_header: Optional[str] = None, if_none_match: Optional[str] = None,
+                   if_range: Optional[str] = None) -> Response:
+    """200/206/304/416 response for a document the caller may read"""
+    path, etag = document_file(doc)
+    return serve_file(path, etag, doc.get('file_type') or 'application/octet-stream', doc.get('title'),
+                      range_header, if_none_match, if_range)
+
+
+def serve_preview(doc: dict, kind: str, if_none_match: Optional[str] = None) -> Response:
+    """A document's generated 'thumbnail' or 'preview' JPEG"""
+    path = PREVIEW_DIR / preview_paths(doc['content_hash'])[kind] if doc.get('content_hash') else None
+    if path is None or not path.exists():
+        raise HTTPException(status_code=404, detail='Preview not available')
+    return serve_file(path, f'"{doc["content_hash"]}-{kind}"', 'image/jpeg', f"{doc.get('title') or 'document'}.jpg",
+                      if_none_match=if_none_match)
+
+
+def serve_file(path: Path, etag: str, media_type: str, filename: Optional[str], range_header: Optional[str] = None,
+               if_none_match: Optional[str] = None, if_range: Optional[str] = None) -> Response:
+    headers = {'etag': etag, 'cache-control': DOCUMENT_CACHE_CONTROL, 'accept-ranges': 'bytes'}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    size = path.stat().st_size
+    headers['content-disposition'] = content_disposition(filename)
+    # A stale If-Range (strong comparison only) means the client's partial copy is outdated
+    if if_range and (if_range.strip() != etag or etag.startswith('W/')):
+        range_header = None
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={**headers, 'content-range': f'bytes */{size}'})
+
+    if byte_range is None:
+        return DocumentFileResponse(path, 0, size - 1, 200, headers, media_type)
+    start, end = byte_range
+    headers['content-range'] = f'bytes {start}-{end}/{size}'
+    return DocumentFileResponse(path, start, end, 206, headers, media_type)
+
+
+async def backfill_document_files() -> int:
+    """Point documents stored as public /uploads/<file> at the authenticated endpoint"""
+    updated = 0
+    query = {'content_hash': None, 'file_path': None, 'file_url': {'$regex': '^/uploads/'}}
+    async for doc in db.documents.find(query, {'_id': 1, 'id': 1, 'file_url': 1}):
+        await db.documents.update_one(
+            {'_id': doc['_id']},
+            {'$set': {'file_path': doc['file_url'][len('/uploads/'):],
+                      'file_url': f"/api/documents/{doc['id']}/file"}}
+        )
+        updated += 1
+    return updated
@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from pymongo import ReturnDocument
+
+from .database import db
+from .blob_store import blob_store
+from .document_extract import PREVIEW_DIR, process_file, remove_previews
+from .document_search import document_search
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_WORKERS = int(os.environ.get('DOCUMENT_WORKERS', str(min(2, os.cpu_count() or 1))))
+DOCUMENT_JOB_MAX_ATTEMPTS = int(os.environ.get('DOCUMENT_JOB_MAX_ATTEMPTS', '3'))
+DOCUMENT_JOB_TIMEOUT_SECONDS = float(os.environ.get('DOCUMENT_JOB_TIMEOUT_SECONDS', '300'))
+DOCUMENT_JOB_POLL_SECONDS = float(os.environ.get('DOCUMENT_JOB_POLL_SECONDS', '5'))
+DOCUMENT_JOB_RETRY_SECONDS = 30.0
+# A running job whose worker died is picked up again once its lease runs out
+DOCUMENT_JOB_LEASE_SECONDS = DOCUMENT_JOB_TIMEOUT_SECONDS + 60
+
+
+class PoolRestarted(Exception):
+    """The job's worker pool was replaced because of another job; it is requeued without using an attempt"""
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=DOCUMENT_JOB_RETRY_SECONDS * 2 ** (attempts - 1))
+
+
+def result_fields(doc_id: str, result: dict) -> dict:
+    """Fields recorded on the Document for a processing result"""
+    return {
+        'processing_status': 'done',
+        'processing_error': None,
+        'processed_at': datetime.now(timezone.utc).isoformat(),
+        'page_count': result.get('page_count'),
+        'text_chars': len(result.get('text') or ''),
+        'thumbnail_url': f'/api/documents/{doc_id}/thumbnail' if result.get('thumbnail') else None,
+        'preview_url': f'/api/documents/{doc_id}/preview' if result.get('preview') else None
+    }
+
+
+class DocumentProcessor:
+    """Persistent job queue (db.document_jobs) drained by a process pool.
+
+    Uploads only insert a job, so they pay no processing latency. Jobs are
+    claimed with a lease, so several app workers can share the queue and a
+    crashed run is retried; failures back off exponentially up to
+    DOCUMENT_JOB_MAX_ATTEMPTS. Results are keyed by content hash, so a file
+    uploaded again is never processed twice.
+    """
+
+    def __init__(self, workers: int = DOCUMENT_WORKERS):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(workers)
+        self._active = set()
+        self.enqueued = 0
+        self.processed = 0
+        self.reused = 0
+        self.retried = 0
+        self.requeued = 0
+        self.failed = 0
+        self.pool_restarts = 0
+        self.total_seconds = 0.0
+
+    async def enqueue(self, doc: dict) -> None:
+        """Queue processing for a newly stored document"""
+        if not doc.get('content_hash'):
+            return
+        now = datetime.now(timezone.utc)
+        await db.document_jobs.insert_one({
+            'id': str(uuid.uuid4()),
+            'document_id': doc['id'],
+            'content_hash': doc['content_hash'],
+            'file_type': doc.get('file_type'),
+            'status': 'queued',
+            'attempts': 0,
+            'run_after': now,
+            'created_at': now
+        })
+        await db.documents.update_one({'id': doc['id']}, {'$set': {'processing_status': 'queued'}})
+        self.enqueued += 1
+        self._wake.set()
+
+    async def _claim(self) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        return await db.document_jobs.find_one_and_update(
+            {'$or': [
+                {'status': 'queued', 'run_after': {'$lte': now}},
+                {'status': 'running', 'leased_until': {'$lt': now}}
+            ]},
+            {'$set': {'status': 'running', 'leased_until': now + timedelta(seconds=DOCUMENT_JOB_LEASE_SECONDS)},
+             '$inc': {'attempts': 1}},
+            sort=[('run_after', 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _existing_result(self, content_hash: str) -> Optional[dict]:
+        """Result of an earlier job for the same content, if its text and previews are still there"""
+        text = await db.document_texts.find_one({'_id': content_hash})
+        if text is None:
+            return None
+        result = {'page_count': text.get('page_count'), 'text': text.get('text', '')}
+        for key in ('thumbnail', 'preview'):
+            path = text.get(key)
+            result[key] = path if path and (PREVIEW_DIR / path).exists() else None
+            if path and result[key] is None:
+                return None
+        return result
+
+    async def _run_in_pool(self, job: dict) -> dict:
+        path = blob_store.local_path(job['content_hash'])
+        if path is None or not path.exists():
+            raise FileNotFoundError(f"Blob {job['content_hash']} is missing")
+        executor = self._executor
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(executor, process_file, str(path), job.get('file_type'), job['content_hash']),
+                timeout=DOCUMENT_JOB_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            # Cancelling the future doesn't stop the worker; kill the pool so a hung file can't hold it
+            self._replace_executor(executor, terminate=True)
+            raise
+        except BrokenProcessPool:
+            if self._executor is not executor:
+                # Another job already restarted the pool (its timeout killed our worker, or it broke it first)
+                raise PoolRestarted('Worker pool was restarted by another job')
+            # A worker crashed (e.g. a malformed file killed it); start a fresh pool
+            self._replace_executor(executor)
+            raise
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                raise
+            # Our future was cancelled by another job replacing the pool, not this task
+            raise PoolRestarted('Worker pool was restarted by another job')
+
+    def _replace_executor(self, broken: ProcessPoolExecutor, terminate: bool = False) -> None:
+        """Swap in a new pool, unless another job already replaced `broken`"""
+        if self._executor is not broken or broken is None:
+            return
+        if terminate:
+            for process in list((broken._processes or {}).values()):
+                process.terminate()
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._new_executor()
+        self.pool_restarts += 1
+
+    async def process(self, job: dict) -> None:
+        if job['attempts'] > DOCUMENT_JOB_MAX_ATTEMPTS:
+            # Only reachable by re-claiming expired leases, i.e. the run keeps dying
+            await self._fail(job, RuntimeError('Processing did not finish'))
+            return
+        started = time.perf_counter()
+        try:
+            result = await self._existing_result(job['content_hash'])
+            if result is not None:
+                self.reused += 1
+            else:
+                result = await self._run_in_pool(job)
+                await db.document_texts.update_one(
+                    {'_id': job['content_hash']},
+                    {'$set': {'text': result['text'], 'page_count': result['page_count'], 'kind': result['kind'],
+                              'thumbnail': result['thumbnail'], 'preview': result['preview']}},
+                    upsert=True
+                )
+                self.processed += 1
+        except Exception as e:
+            await self._fail(job, e)
+            return
+        finally:
+            self.total_seconds += time.perf_counter() - started
+
+        await db.documents.update_one({'id': job['document_id']}, {'$set': result_fields(job['document_id'], result)})
+        await document_search.index_document(job['document_id'])
+        await db.document_jobs.update_one(
+            {'id': job['id']},
+            {'$set': {'status': 'done', 'finished_at': datetime.now(timezone.utc)}, '$unset': {'leased_until': ''}}
+        )
+
+    async def _fail(self, job: dict, error: Exception) -> None:
+        message = f'{type(error).__name__}: {error}'[:500]
+        if isinstance(error, PoolRestarted):
+            # Not this job's fault: run it again right away and give back the attempt the claim took
+            self.requeued += 1
+            logger.info(f"Requeued document {job['document_id']}: {message}")
+            await db.document_jobs.update_one(
+                {'id': job['id']},
+                {'$set': {'status': 'queued', 'run_after': datetime.now(timezone.utc)},
+                 '$inc': {'attempts': -1}, '$unset': {'leased_until': ''}}
+            )
+            self._wake.set()
+            return
+        if job['attempts'] < DOCUMENT_JOB_MAX_ATTEMPTS:
+            self.retried += 1
+            update = {'status': 'queued', 'run_after': datetime.now(timezone.utc) + retry_delay(job['attempts'])}
+            logger.warning(f"Processing document {job['document_id']} failed (attempt {job['attempts']}): {message}")
+        else:
+            self.failed += 1
+            update = {'status': 'failed', 'finished_at': datetime.now(timezone.utc)}
+            await db.documents.update_one({'id': job['document_id']},
+                                          {'$set': {'processing_status': 'failed', 'processing_error': message}})
+            logger.error(f"Giving up on document {job['document_id']}: {message}")
+        await db.document_jobs.update_one({'id': job['id']}, {'$set': {**update, 'error': message},
+                                                              '$unset': {'leased_until': ''}})
+
+    async def _run_job(self, job: dict) -> None:
+        try:
+            await self.process(job)
+        except Exception as e:
+            logger.error(f"Document job {job['id']} crashed: {e}")
+        finally:
+            self._semaphore.release()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._semaphore.acquire()
+                job = await self._claim()
+                if job is None:
+                    self._semaphore.release()
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=DOCUMENT_JOB_POLL_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                task = asyncio.create_task(self._run_job(job))
+                self._active.add(task)
+                task.add_done_callback(self._active.discard)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._semaphore.release()
+                logger.warning(f'Document job queue poll failed: {e}')
+                await asyncio.sleep(DOCUMENT_JOB_POLL_SECONDS)
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn: forking a process that runs an event loop and driver threads isn't safe
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def start(self) -> None:
+        if self._runner is None or self._runner.done():
+            self._executor = self._executor or self._new_executor()
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            self._runner = None
+        for task in list(self._active):
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def forget(self, content_hash: str) -> None:
+        """Drop derived data once the blob itself has been garbage-collected"""
+        await db.document_texts.delete_one({'_id': content_hash})
+        await asyncio.get_running_loop().run_in_executor(None, remove_previews, content_hash)
+
+    async def stats(self) -> dict:
+        rows = await db.document_jobs.aggregate([{'$group': {'_id': '$status', 'count': {'$sum': 1}}}]).to_list(None)
+        runs = self.processed + self.reused
+        return {
+            'workers': self.workers,
+            'active': len(self._active),
+            'jobs': {row['_id']: row['count'] for row in rows},
+            'enqueued': self.enqueued,
+            'processed': self.processed,
+            'reused': self.reused,
+            'retried': self.retried,
+            'requeued': self.requeued,
+            'failed': self.failed,
+            'pool_restarts': self.pool_restarts,
+            'avg_ms': round(self.total_seconds / runs * 1000, 2) if runs else 0.0
+        }
+
+
+document_processor = DocumentProcessor()
+blob_store.collect_hooks.append(document_processor.forget)
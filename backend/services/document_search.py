@@ -0,0 +1,249 @@
+import logging
+import math
+import re
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from fastapi import HTTPException
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from .database import db
+from .pagination import encode_cursor, decode_cursor
+from .text_search import tokenize, NUKTA, LATENCY_SAMPLES
+
+logger = logging.getLogger(__name__)
+
+# field -> weight; a title or case id match matters more than one in the body
+DOCUMENT_FIELDS = {'title': 3.0, 'case_id': 2.0, 'text': 1.0}
+MAX_CANDIDATES = 5000
+SNIPPET_CHARS = 200
+MAX_HIGHLIGHTS = 10
+K1 = 1.2
+B = 0.75
+# Bump when tokenize() changes, so stored terms are rebuilt by the startup backfill
+SEARCH_INDEX_VERSION = 2
+# Token characters, as in text_search.TOKEN
+WORD_CHARS = r'0-9a-z\u00c0-\u024f\u0900-\u0963\u0966-\u097f'
+# Only what ranking and result cards need; `terms` and `tf` can be large
+ROW_PROJECTION = {'_id': 0, 'document_id': 1, 'title': 1, 'case_id': 1, 'content_hash': 1,
+                  'file_type': 1, 'uploaded_at': 1, 'length': 1}
+
+
+def term_weights(doc: dict, text: str) -> dict:
+    weights = defaultdict(float)
+    for field, weight in DOCUMENT_FIELDS.items():
+        for token in tokenize(text if field == 'text' else doc.get(field)):
+            weights[token] += weight
+    return dict(weights)
+
+
+def highlight(text: str, terms: List[str], limit: int = SNIPPET_CHARS) -> dict:
+    """Window of `text` around the first match, with [start, end) offsets of the matches.
+
+    Offsets rather than markup keep client rendering free of HTML injection.
+    Query terms are stems, so they match as word prefixes ('lawyer' finds 'lawyers').
+    """
+    folded = text.lower()
+    if len(folded) != len(text):
+        text = folded
+    if not text or not terms:
+        return {'snippet': text[:limit], 'highlights': []}
+    # 'property' is the stem of 'properties' too
+    alternatives = '|'.join(re.escape(term[:-1]) + '(?:y|ie)' if term.endswith('y') else re.escape(term)
+                            for term in sorted(terms, key=len, reverse=True))
+    pattern = re.compile(rf'(?<![{WORD_CHARS}])(?:{alternatives})[{WORD_CHARS}{NUKTA}]*')
+
+    first = pattern.search(folded)
+    start = 0
+    if first is not None and first.start() > limit // 3:
+        # Start on a word boundary a little before the first match
+        start = text.rfind(' ', 0, first.start() - limit // 3) + 1
+    end = min(len(text), start + limit)
+    if end < len(text) and text.rfind(' ', start, end) > start:
+        end = text.rfind(' ', start, end)
+
+    prefix = '…' if start > 0 else ''
+    highlights = [[match.start() - start + len(prefix), min(match.end(), end) - start + len(prefix)]
+                  for match in pattern.finditer(folded, start, end)][:MAX_HIGHLIGHTS]
+    return {'snippet': prefix + text[start:end] + ('…' if end < len(text) else ''), 'highlights': highlights}
+
+
+def rank(candidates: List[dict], terms: List[str], total_docs: int, df: dict) -> List[dict]:
+    """Score rows (with `tf` and `length`) by BM25, best first, ties by document id"""
+    total_docs = max(total_docs, 1)
+    avg_length = (sum(row.get('length', 0) for row in candidates) / len(candidates)) if candidates else 1.0
+    for row in candidates:
+        score = 0.0
+        for term in terms:
+            weight = row.get('tf', {}).get(term, 0.0)
+            idf = math.log(1 + (total_docs - df[term] + 0.5) / (df[term] + 0.5))
+            score += idf * weight * (K1 + 1) / (weight + K1 * (1 - B + B * row.get('length', 0) / (avg_length or 1.0)))
+        row['score'] = round(score, 4)
+    return sorted(candidates, key=lambda row: (-row['score'], row['document_id']))
+
+
+def page_after(ranked: List[dict], cursor: Optional[str], limit: int) -> tuple:
+    """(page, has_more) of ranked rows following the (score, document id) cursor"""
+    if cursor:
+        after_score, after_id = decode_cursor(cursor, 2)
+        try:
+            ranked = [row for row in ranked
+                      if row['score'] < after_score or (row['score'] == after_score and row['document_id'] > after_id)]
+        except TypeError:
+            # Well-formed scalars of the wrong kind, e.g. a string score
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+    return ranked[:limit], len(ranked) > limit
+
+
+class DocumentSearchService:
+    """Ranked search over the documents a user owns or that are shared with them.
+
+    db.document_search holds one row per (reader, document) with the document's
+    distinct terms, so a query is one {user_id, terms: {$all}} lookup on the
+    user_id_terms index; candidates are then ranked with BM25 over the user's
+    own documents. Rows are upserted per reader (unique on user_id +
+    document_id) whenever a document is stored, processed or shared, and
+    removed with it.
+    """
+
+    def __init__(self):
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.indexed = 0
+        self.removed = 0
+
+    async def index_document(self, doc_id: str) -> bool:
+        """(Re)build the search rows of one document; False if it no longer exists"""
+        doc = await db.documents.find_one({'id': doc_id}, {'_id': 0, 'id': 1, 'user_id': 1, 'shared_with': 1, 'title': 1,
+                                                           'case_id': 1, 'content_hash': 1, 'file_type': 1,
+                                                           'uploaded_at': 1})
+        if doc is None:
+            await self.remove_document(doc_id)
+            return False
+        text = await self._text(doc.get('content_hash'))
+
+        weights = term_weights(doc, text)
+        readers = list(dict.fromkeys([doc['user_id'], *(doc.get('shared_with') or [])]))
+        row = {
+            'title': doc.get('title'),
+            'case_id': doc.get('case_id'),
+            'content_hash': doc.get('content_hash'),
+            'file_type': doc.get('file_type'),
+            'uploaded_at': doc.get('uploaded_at'),
+            'terms': list(weights),
+            'tf': weights,
+            'length': sum(weights.values())
+        }
+        upserts = [UpdateOne({'user_id': reader, 'document_id': doc_id}, {'$set': row}, upsert=True)
+                   for reader in readers]
+        try:
+            await db.document_search.bulk_write(upserts, ordered=False)
+        except BulkWriteError as e:
+            # Two concurrent upserts of a new row: one wins the unique index, the other becomes an update
+            if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+                raise
+            await db.document_search.bulk_write(upserts, ordered=False)
+        await db.document_search.delete_many({'document_id': doc_id, 'user_id': {'$nin': readers}})
+
+        # A delete that raced this write leaves no document behind; neither may the rows
+        if not await db.documents.find_one({'id': doc_id}, {'_id': 1}):
+            await self.remove_document(doc_id)
+            return False
+        # Text stored by processing while this ran: index it too (its own reindex may have finished first)
+        if not text and await self._text(doc.get('content_hash')):
+            return await self.index_document(doc_id)
+        await db.documents.update_one({'id': doc_id}, {'$set': {'indexed_at': datetime.now(timezone.utc).isoformat(),
+                                                                'search_version': SEARCH_INDEX_VERSION}})
+        self.indexed += 1
+        return True
+
+    async def _text(self, content_hash: Optional[str]) -> str:
+        if not content_hash:
+            return ''
+        stored = await db.document_texts.find_one({'_id': content_hash}, {'text': 1})
+        return (stored or {}).get('text') or ''
+
+    async def remove_document(self, doc_id: str) -> None:
+        result = await db.document_search.delete_many({'document_id': doc_id})
+        if result.deleted_count:
+            self.removed += 1
+
+    async def search(self, user_id: str, query: str, case_id: Optional[str] = None, cursor: Optional[str] = None,
+                     limit: int = 10) -> dict:
+        """Page of ranked matches (every query word must appear) with highlighted snippets"""
+        started = time.perf_counter()
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return {'query': query, 'results': [], 'total': 0, 'next_cursor': None, 'has_more': False}
+
+        match = {'user_id': user_id, 'terms': {'$all': terms}}
+        if case_id:
+            match['case_id'] = case_id
+        projection = {**ROW_PROJECTION, **{f'tf.{term}': 1 for term in terms}}
+        candidates = await db.document_search.find(match, projection).to_list(MAX_CANDIDATES)
+
+        total_docs = await db.document_search.count_documents({'user_id': user_id})
+        df = {term: sum(1 for row in candidates if term in row.get('tf', {})) for term in terms}
+        if len(terms) > 1:
+            # Candidates only contain rows with every term; count each term on its own for idf
+            for term in terms:
+                df[term] = await db.document_search.count_documents({'user_id': user_id, 'terms': term})
+        candidates = rank(candidates, terms, total_docs, df)
+        total = len(candidates)
+        page, has_more = page_after(candidates, cursor, limit)
+
+        texts = {}
+        hashes = [row['content_hash'] for row in page if row.get('content_hash')]
+        if hashes:
+            async for stored in db.document_texts.find({'_id': {'$in': hashes}}, {'text': 1}):
+                texts[stored['_id']] = stored.get('text') or ''
+
+        results = []
+        for row in page:
+            title = highlight(row.get('title') or '', terms, limit=len(row.get('title') or ''))
+            body = highlight(texts.get(row.get('content_hash'), ''), terms)
+            results.append({
+                'id': row['document_id'],
+                'title': row.get('title'),
+                'title_highlights': title['highlights'],
+                'case_id': row.get('case_id'),
+                'file_type': row.get('file_type'),
+                'uploaded_at': row.get('uploaded_at'),
+                'score': row['score'],
+                'snippet': body['snippet'],
+                'highlights': body['highlights']
+            })
+
+        self.latencies.append((time.perf_counter() - started) * 1000)
+        return {
+            'query': query,
+            'results': results,
+            'total': total,
+            'next_cursor': encode_cursor(page[-1]['score'], page[-1]['document_id']) if has_more else None,
+            'has_more': has_more
+        }
+
+    async def backfill(self) -> int:
+        """Index documents stored before search rows were maintained, or with an older tokenizer"""
+        indexed = 0
+        async for doc in db.documents.find({'search_version': {'$ne': SEARCH_INDEX_VERSION}}, {'_id': 0, 'id': 1}):
+            # Rows from before the unique index may be duplicated; start the document over
+            await db.document_search.delete_many({'document_id': doc['id']})
+            if await self.index_document(doc['id']):
+                indexed += 1
+        return indexed
+
+    def stats(self) -> dict:
+        samples = sorted(self.latencies)
+        return {
+            'indexed': self.indexed,
+            'removed': self.removed,
+            'queries': len(samples),
+            'p50_ms': round(samples[len(samples) // 2], 3) if samples else 0.0,
+            'p95_ms': round(samples[int(len(samples) * 0.95) - 1], 3) if samples else 0.0
+        }
+
+
+document_search = DocumentSearchService()
@@ -0,0 +1,210 @@
+import logging
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+from .database import db
+
+logger = logging.getLogger(__name__)
+
+
+def _index(keys, name, **options) -> IndexModel:
+    """Build a named index model (names are what reconciliation compares on)"""
+    return IndexModel(keys, name=name, **options)
+
+
+# Declarative index registry: collection name -> indexes that must exist.
+# Every entry backs a query issued from routes/ or services/.
+INDEXES = {
+    'users': [
+        _index([('id', ASCENDING)], 'id_unique', unique=True, sparse=True),
+        _index([('email', ASCENDING), ('user_type', ASCENDING)], 'email_user_type_unique', unique=True),
+        _index([('firm_id', ASCENDING), ('user_type', ASCENDING)], 'firm_id_user_type'),
+        # Lawyer directory: one index per sort order, plus the common filter prefixes
+        _index([('user_type', ASCENDING), ('search.rank', DESCENDING), ('id', ASCENDING)], 'directory_rank'),
+        _index([('user_type', ASCENDING), ('search.rating', DESCENDING), ('id', ASCENDING)], 'directory_rating'),
+        _index([('user_type', ASCENDING), ('search.experience', DESCENDING), ('id', ASCENDING)], 'directory_experience'),
+        _index([('user_type', ASCENDING), ('search.fee_min', ASCENDING), ('id', ASCENDING)], 'directory_fee'),
+        _index([('user_type', ASCENDING), ('state', ASCENDING), ('city', ASCENDING), ('search.rank', DESCENDING),
+                ('id', ASCENDING)], 'directory_location_rank'),
+        _index([('user_type', ASCENDING), ('specialization', ASCENDING), ('search.rank', DESCENDING),
+                ('id', ASCENDING)], 'directory_specialization_rank'),
+        _index([('user_type', ASCENDING), ('languages', ASCENDING), ('search.rank', DESCENDING)],
+               'directory_languages_rank'),
+    ],
+    'bookings': [
+        _index([('id', ASCENDING)], 'id'),
+        _index([('lawyer_id', ASCENDING), ('created_at', DESCENDING)], 'lawyer_id_created_at'),
+        _index([('client_id', ASCENDING), ('is_free_trial', ASCENDING)], 'client_id_is_free_trial'),
+    ],
+    'slot_reservations': [
+        _index([('lawyer_id', ASCENDING), ('slot', ASCENDING)], 'lawyer_id_slot_unique', unique=True),
+        _index([('booking_id', ASCENDING)], 'booking_id'),
+    ],
+    'messages': [
+        _index([('sender_id', ASCENDING), ('receiver_id', ASCENDING), ('timestamp', DESCENDING), ('id', DESCENDING)],
+               'sender_receiver_timestamp_id'),
+        _index([('receiver_id', ASCENDING), ('timestamp', DESCENDING)], 'receiver_timestamp'),
+        _index([('receiver_id', ASCENDING), ('sender_id', ASCENDING), ('read', ASCENDING)], 'receiver_sender_read'),
+    ],
+    'conversations': [
+        _index([('user_id', ASCENDING), ('other_user_id', ASCENDING)], 'user_id_other_user_id_unique', unique=True),
+        _index([('user_id', ASCENDING), ('last_message_at', DESCENDING)], 'user_id_last_message_at'),
+    ],
+    'lawyer_stats': [
+        _index([('lawyer_id', ASCENDING)], 'lawyer_id_unique', unique=True),
+    ],
+    'lawyer_clients': [
+        _index([('lawyer_id', ASCENDING), ('client_name', ASCENDING)], 'lawyer_id_client_name_unique', unique=True),
+    ],
+    'notifications': [
+        _index([('id', ASCENDING)], 'id'),
+        _index([('user_id', ASCENDING), ('created_at', DESCENDING)], 'user_id_created_at'),
+    ],
+    'network_messages': [
+        _index([('state', ASCENDING), ('timestamp', DESCENDING)], 'state_timestamp'),
+    ],
+    'cases': [
+        _index([('id', ASCENDING)], 'id'),
+        _index([('user_id', ASCENDING), ('status', ASCENDING)], 'user_id_status'),
+        _index([('user_id', ASCENDING), ('created_at', DESCENDING)], 'user_id_created_at'),
+    ],
+    'documents': [
+        _index([('id', ASCENDING)], 'id'),
+        _index([('user_id', ASCENDING), ('case_id', ASCENDING)], 'user_id_case_id'),
+    ],
+    'document_search': [
+        # One row per (reader, document); queries are {user_id, terms: {$all: [...]}}
+        _index([('user_id', ASCENDING), ('terms', ASCENDING)], 'user_id_terms'),
+        _index([('user_id', ASCENDING), ('document_id', ASCENDING)], 'user_id_document_id_unique', unique=True),
+        _index([('document_id', ASCENDING)], 'document_id'),
+    ],
+    'blobs': [
+        # Garbage collection scans unreferenced blobs by release time
+        _index([('refs', ASCENDING), ('released_at', ASCENDING)], 'refs_released_at'),
+    ],
+    'document_jobs': [
+        _index([('id', ASCENDING)], 'id'),
+        _index([('status', ASCENDING), ('run_after', ASCENDING)], 'status_run_after'),
+        _index([('status', ASCENDING), ('leased_until', ASCENDING)], 'status_leased_until'),
+    ],
+    'upload_sessions': [
+        _index([('id', ASCENDING), ('user_id', ASCENDING)], 'id_user_id'),
+        _index([('expires_at', ASCENDING)], 'expires_at'),
+        # Per-user quota of unexpired sessions
+        _index([('user_id', ASCENDING), ('expires_at', ASCENDING)], 'user_id_expires_at'),
+    ],
+    'events': [
+        _index([('id', ASCENDING)], 'id'),
+        _index([('lawyer_id', ASCENDING), ('start_time', ASCENDING), ('end_time', ASCENDING)],
+               'lawyer_id_start_end'),
+    ],
+    'chat_history': [
+        _index([('user_id', ASCENDING), ('timestamp', DESCENDING), ('id', DESCENDING)], 'user_id_timestamp_id'),
+    ],
+    'chat_summaries': [
+        _index([('user_id', ASCENDING)], 'user_id_unique', unique=True),
+    ],
+    'lawyer_applications': [
+        _index([('email', ASCENDING)], 'email'),
+        _index([('status', ASCENDING)], 'status'),
+    ],
+    'lawfirm_applications': [
+        _index([('contact_email', ASCENDING)], 'contact_email'),
+        _index([('status', ASCENDING)], 'status'),
+    ],
+    'firm_lawyer_applications': [
+        _index([('id', ASCENDING)], 'id'),
+        _index([('email', ASCENDING)], 'email'),
+        _index([('status', ASCENDING)], 'status'),
+    ],
+    'firm_client_applications': [
+        _index([('id', ASCENDING)], 'id'),
+        _index([('email', ASCENDING), ('law_firm_id', ASCENDING)], 'email_law_firm_id'),
+        _index([('law_firm_id', ASCENDING), ('status', ASCENDING)], 'law_firm_id_status'),
+        _index([('status', ASCENDING)], 'status'),
+    ],
+    'firm_clients': [
+        _index([('id', ASCENDING)], 'id'),
+        _index([('email', ASCENDING)], 'email'),
+        _index([('law_firm_id', ASCENDING)], 'law_firm_id'),
+        _index([('status', ASCENDING)], 'status'),
+    ],
+    'firm_tasks': [
+        _index([('id', ASCENDING)], 'id'),
+        _index([('assigned_to', ASCENDING), ('created_at', DESCENDING)], 'assigned_to_created_at'),
+    ],
+    'client_case_updates': [
+        _index([('client_id', ASCENDING), ('created_at', DESCENDING)], 'client_id_created_at'),
+    ],
+}
+
+# Options that change index behaviour and therefore count as drift when they differ
+_COMPARED_OPTIONS = ('unique', 'sparse', 'expireAfterSeconds', 'partialFilterExpression')
+
+
+def _spec(document: dict) -> dict:
+    """Normalise an index description into a comparable form"""
+    spec = {'key': [(field, direction) for field, direction in dict(document['key']).items()]}
+    for option in _COMPARED_OPTIONS:
+        if document.get(option):
+            spec[option] = document[option]
+    return spec
+
+
+async def check_indexes(registry: dict = None) -> dict:
+    """Compare the registry against the live database without changing anything"""
+    registry = registry if registry is not None else INDEXES
+    report = {}
+
+    for collection_name, models in registry.items():
+        existing = await db[collection_name].index_information()
+        existing = {name: info for name, info in existing.items() if name != '_id_'}
+        wanted = {model.document['name']: model.document for model in models}
+
+        missing = [name for name in wanted if name not in existing]
+        mismatched = [
+            name for name in wanted
+            if name in existing and _spec(wanted[name]) != _spec(existing[name])
+        ]
+        extra = [name for name in existing if name not in wanted]
+
+        if missing or mismatched or extra:
+            report[collection_name] = {'missing': missing, 'mismatched': mismatched, 'extra': extra}
+
+    return report
+
+
+async def ensure_indexes(registry: dict = None) -> dict:
+    """Create missing indexes and rebuild mismatched ones; returns the drift found.
+
+    Extra indexes that are not in the registry are reported but never dropped,
+    so manually created indexes survive a deploy.
+    """
+    registry = registry if registry is not None else INDEXES
+    drift = await check_indexes(registry)
+
+    for collection_name, models in registry.items():
+        collection_drift = drift.get(collection_name)
+        if not collection_drift:
+            continue
+
+        by_name = {model.document['name']: model for model in models}
+        collection = db[collection_name]
+
+        for name in collection_drift['mismatched']:
+            logger.warning(f'Index {collection_name}.{name} does not match registry, rebuilding')
+            await collection.drop_index(name)
+
+        to_create = [by_name[name] for name in collection_drift['missing'] + collection_drift['mismatched']]
+        for model in to_create:
+            try:
+                await collection.create_indexes([model])
+                logger.info(f"Created index {collection_name}.{model.document['name']}")
+            except OperationFailure as e:
+                # e.g. duplicate data blocking a unique index; keep serving
+                logger.error(f"Failed to create index {collection_name}.{model.document['name']}: {str(e)}")
+
+        if collection_drift['extra']:
+            logger.warning(f"Unregistered indexes on {collection_name}: {', '.join(collection_drift['extra'])}")
+
+    return drift
@@ -0,0 +1,146 @@
+import re
+from typing import List, Optional
+
+from .database import db
+from .pagination import encode_cursor, decode_cursor, keyset_filter
+
+FEE_AMOUNT = re.compile(r'\d[\d,]*')
+
+# sort name -> keyset order (id breaks ties so pages are stable)
+SORTS = {
+    'relevance': [('search.rank', -1), ('id', 1)],
+    'rating': [('search.rating', -1), ('id', 1)],
+    'experience': [('search.experience', -1), ('id', 1)],
+    'fee': [('search.fee_min', 1), ('id', 1)],
+}
+
+FACET_FIELDS = ('state', 'city', 'court', 'specialization', 'languages')
+FACET_LIMIT = 50
+
+# Sensitive fields never sent to the directory (`search` is stripped after paging)
+DIRECTORY_PROJECTION = {'_id': 0, 'password': 0, 'password_hash': 0}
+
+
+def parse_fee_range(fee_range) -> tuple:
+    """'₹5,000 - ₹15,000' -> (5000, 15000); a single amount gives (n, n)"""
+    if not isinstance(fee_range, str):
+        return None, None
+    amounts = [int(amount.replace(',', '')) for amount in FEE_AMOUNT.findall(fee_range)]
+    if not amounts:
+        return None, None
+    return min(amounts), max(amounts)
+
+
+def _number(value, default=0):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def search_fields(lawyer: dict) -> dict:
+    """Normalised, always-present sort/filter keys stored under `search`"""
+    rating = _number(lawyer.get('rating'))
+    experience = int(_number(lawyer.get('experience_years') or lawyer.get('experience')))
+    cases_won = _number(lawyer.get('cases_won'))
+    fee_min, fee_max = parse_fee_range(lawyer.get('fee_range'))
+    rank = rating * 20 + min(experience, 40) + min(cases_won, 500) / 50 + (5 if lawyer.get('is_verified') else 0)
+    return {
+        'rank': round(rank, 3),
+        'rating': rating,
+        'experience': experience,
+        'fee_min': fee_min,
+        'fee_max': fee_max
+    }
+
+
+async def backfill_search_fields() -> int:
+    """Add `search` to lawyer profiles created before it existed"""
+    updated = 0
+    async for lawyer in db.users.find({'user_type': 'lawyer', 'search': {'$exists': False}}, {'photo': 0}):
+        await db.users.update_one({'_id': lawyer['_id']}, {'$set': {'search': search_fields(lawyer)}})
+        updated += 1
+    return updated
+
+
+def build_filter(state: str = None, city: str = None, court: str = None, specialization: str = None,
+                 languages: Optional[List[str]] = None, min_experience: int = None, min_rating: float = None,
+                 fee_min: int = None, fee_max: int = None) -> dict:
+    query = {'user_type': 'lawyer'}
+    for field, value in (('state', state), ('city', city), ('court', court), ('specialization', specialization)):
+        if value:
+            query[field] = value
+    if languages:
+        query['languages'] = {'$all': languages}
+    if min_experience is not None:
+        query['search.experience'] = {'$gte': min_experience}
+    if min_rating is not None:
+        query['search.rating'] = {'$gte': min_rating}
+    # Fee filter keeps lawyers whose range overlaps the requested budget
+    if fee_max is not None:
+        query['search.fee_min'] = {'$lte': fee_max}
+    if fee_min is not None:
+        query['search.fee_max'] = {'$gte': fee_min}
+    return query
+
+
+async def get_facets(query: dict) -> dict:
+    """Counts per value of each facet field, plus the total, over the filtered set"""
+    facet_stages = {'total': [{'$count': 'count'}]}
+    for field in FACET_FIELDS:
+        stages = [{'$unwind': f'${field}'}] if field == 'languages' else []
+        stages += [
+            {'$match': {field: {'$nin': [None, '']}}},
+            {'$group': {'_id': f'${field}', 'count': {'$sum': 1}}},
+            {'$sort': {'count': -1, '_id': 1}},
+            {'$limit': FACET_LIMIT}
+        ]
+        facet_stages[field] = stages
+
+    result = await db.users.aggregate([
+        {'$match': query},
+        {'$project': {field: 1 for field in FACET_FIELDS}},
+        {'$facet': facet_stages}
+    ]).to_list(length=1)
+    result = result[0] if result else {}
+
+    facets = {
+        field: [{'value': row['_id'], 'count': row['count']} for row in result.get(field, [])]
+        for field in FACET_FIELDS
+    }
+    total = result.get('total', [])
+    return {'total': total[0]['count'] if total else 0, 'facets': facets}
+
+
+def _sort_value(lawyer: dict, field: str):
+    value = lawyer
+    for part in field.split('.'):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+async def search_lawyers(query: dict, sort: str = 'relevance', cursor: str = None,
+                         limit: int = 20, include_facets: bool = True) -> dict:
+    """One keyset page of lawyers matching `query`"""
+    order = SORTS[sort]
+    if sort == 'fee':
+        # Profiles without a parseable fee can't be placed in fee order
+        query = {'$and': [query, {'search.fee_min': {'$ne': None}}]}
+    page_query = query
+    if cursor:
+        page_query = {'$and': [query, keyset_filter(order, decode_cursor(cursor, len(order)))]}
+
+    lawyers = await db.users.find(page_query, DIRECTORY_PROJECTION).sort(order).limit(limit + 1).to_list(length=limit + 1)
+
+    has_more = len(lawyers) > limit
+    lawyers = lawyers[:limit]
+    next_cursor = None
+    if has_more and lawyers:
+        next_cursor = encode_cursor(*[_sort_value(lawyers[-1], field) for field, _ in order])
+    for lawyer in lawyers:
+        lawyer.pop('search', None)
+
+    result = {'lawyers': lawyers, 'next_cursor': next_cursor, 'has_more': has_more}
+    if include_facets:
+        result.update(await get_facets(query))
+    return result
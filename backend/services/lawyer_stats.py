@@ -0,0 +1,166 @@
+from datetime import datetime, timezone
+from pymongo.errors import DuplicateKeyError
+
+from .database import db
+
+# A rebuild that keeps losing to concurrent updates stops here; their increments are already stored
+REBUILD_ATTEMPTS = 3
+
+
+def month_key(value) -> str:
+    """'YYYY-MM' for a booking date string or datetime, falling back to the current month"""
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m')
+    if isinstance(value, str) and len(value) >= 7 and value[4] == '-':
+        return value[:7]
+    return datetime.now(timezone.utc).strftime('%Y-%m')
+
+
+async def record_case(case: dict) -> None:
+    """Fold a newly created case into its owner's rolling stats"""
+    lawyer_id = case.get('user_id')
+    if not lawyer_id:
+        return
+
+    inc = {'total_cases': 1, 'version': 1}
+    if case.get('status') == 'active':
+        inc['active_cases'] = 1
+
+    try:
+        result = await db.lawyer_clients.update_one(
+            {'lawyer_id': lawyer_id, 'client_name': case.get('client_name')},
+            {'$inc': {'cases': 1}},
+            upsert=True
+        )
+        if result.upserted_id is not None:
+            inc['total_clients'] = 1
+    except DuplicateKeyError:
+        # Lost an upsert race; the other writer counted the client
+        await db.lawyer_clients.update_one(
+            {'lawyer_id': lawyer_id, 'client_name': case.get('client_name')},
+            {'$inc': {'cases': 1}}
+        )
+
+    await db.lawyer_stats.update_one({'lawyer_id': lawyer_id}, {'$inc': inc}, upsert=True)
+
+
+async def record_booking(booking: dict) -> None:
+    """Fold a newly created booking into the lawyer's per-month consultations and revenue"""
+    lawyer_id = booking.get('lawyer_id')
+    if not lawyer_id:
+        return
+
+    month = month_key(booking.get('date'))
+    price = booking.get('price') or 0
+    await db.lawyer_stats.update_one(
+        {'lawyer_id': lawyer_id},
+        {'$inc': {
+            'version': 1,
+            'consultations': 1,
+            'revenue': price,
+            f'months.{month}.consultations': 1,
+            f'months.{month}.revenue': price
+        }},
+        upsert=True
+    )
+
+
+async def move_booking(lawyer_id: str, old_date, new_date, price) -> None:
+    """Move a rescheduled booking's consultation and revenue from its old month to the new one"""
+    old_month, new_month = month_key(old_date), month_key(new_date)
+    if not lawyer_id or old_month == new_month:
+        return
+
+    price = price or 0
+    await db.lawyer_stats.update_one(
+        {'lawyer_id': lawyer_id},
+        {'$inc': {
+            'version': 1,
+            f'months.{old_month}.consultations': -1,
+            f'months.{old_month}.revenue': -price,
+            f'months.{new_month}.consultations': 1,
+            f'months.{new_month}.revenue': price
+        }}
+    )
+
+
+async def rebuild_lawyer_stats(lawyer_id: str) -> dict:
+    """Recompute a lawyer's stats from cases and bookings (backfill / repair).
+
+    Every incremental update bumps `version`; the recomputed fields are only
+    written if it hasn't moved since the aggregation started, so an increment
+    landing in between is never overwritten (the rebuild runs again instead).
+    """
+    for _ in range(REBUILD_ATTEMPTS):
+        current = await db.lawyer_stats.find_one({'lawyer_id': lawyer_id}, {'_id': 0, 'version': 1})
+        case_rows, stats = await _compute_stats(lawyer_id)
+        if current is None:
+            try:
+                await db.lawyer_stats.insert_one({**stats, 'version': 0})
+            except DuplicateKeyError:
+                continue
+        else:
+            # A pre-version document has no field, which {'version': None} also matches
+            result = await db.lawyer_stats.update_one(
+                {'lawyer_id': lawyer_id, 'version': current.get('version')},
+                {'$set': stats}
+            )
+            if result.matched_count == 0:
+                continue
+
+        await db.lawyer_clients.delete_many({'lawyer_id': lawyer_id})
+        if case_rows:
+            await db.lawyer_clients.insert_many([
+                {'lawyer_id': lawyer_id, 'client_name': row['_id'], 'cases': row['cases']} for row in case_rows
+            ])
+        return stats
+
+    return await db.lawyer_stats.find_one({'lawyer_id': lawyer_id}, {'_id': 0})
+
+
+async def _compute_stats(lawyer_id: str):
+    """Per-client case rows and the stats fields, aggregated from cases and bookings"""
+    case_rows = await db.cases.aggregate([
+        {'$match': {'user_id': lawyer_id}},
+        {'$group': {
+            '_id': '$client_name',
+            'cases': {'$sum': 1},
+            'active': {'$sum': {'$cond': [{'$eq': ['$status', 'active']}, 1, 0]}}
+        }}
+    ]).to_list(length=None)
+
+    booking_rows = await db.bookings.aggregate([
+        {'$match': {'lawyer_id': lawyer_id}},
+        {'$group': {
+            '_id': {'$substrCP': [{'$ifNull': ['$date', '']}, 0, 7]},
+            'consultations': {'$sum': 1},
+            'revenue': {'$sum': '$price'}
+        }}
+    ]).to_list(length=None)
+
+    months = {}
+    for row in booking_rows:
+        month = month_key(row['_id'])
+        entry = months.setdefault(month, {'consultations': 0, 'revenue': 0})
+        entry['consultations'] += row['consultations']
+        entry['revenue'] += row['revenue']
+
+    stats = {
+        'lawyer_id': lawyer_id,
+        'total_cases': sum(row['cases'] for row in case_rows),
+        'active_cases': sum(row['active'] for row in case_rows),
+        'total_clients': len(case_rows),
+        'consultations': sum(row['consultations'] for row in booking_rows),
+        'revenue': sum(row['revenue'] for row in booking_rows),
+        'months': months,
+        'initialized': True
+    }
+    return case_rows, stats
+
+
+async def get_lawyer_stats(lawyer_id: str) -> dict:
+    """Read the precomputed stats document, building it on first use"""
+    stats = await db.lawyer_stats.find_one({'lawyer_id': lawyer_id}, {'_id': 0})
+    if not stats or not stats.get('initialized'):
+        stats = await rebuild_lawyer_stats(lawyer_id)
+    return stats
@@ -0,0 +1,202 @@
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import time
+from emergentintegrations.llm.chat import LlmChat, UserMessage
+from fastapi import HTTPException
+
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', '8'))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.environ.get('LLM_QUEUE_TIMEOUT_SECONDS', '10'))
+LLM_TIMEOUT_SECONDS = float(os.environ.get('LLM_TIMEOUT_SECONDS', '60'))
+LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', '2'))
+LLM_RETRY_BASE_SECONDS = float(os.environ.get('LLM_RETRY_BASE_SECONDS', '0.5'))
+LLM_RETRY_MAX_SECONDS = 8.0
+LLM_SESSION_CLIENTS = int(os.environ.get('LLM_SESSION_CLIENTS', '1000'))
+LLM_SESSION_IDLE_SECONDS = float(os.environ.get('LLM_SESSION_IDLE_SECONDS', '1800'))
+
+
+def prompt_hash(system_prompt: str) -> str:
+    return hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()[:16]
+
+
+def provider_concurrency(provider: str) -> int:
+    """LLM_MAX_CONCURRENCY_<PROVIDER> overrides the global limit"""
+    return int(os.environ.get(f'LLM_MAX_CONCURRENCY_{provider.upper()}', str(LLM_MAX_CONCURRENCY)))
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(LLM_RETRY_MAX_SECONDS, LLM_RETRY_BASE_SECONDS * 2 ** attempt))
+
+
+class ProviderLimiter:
+    """Concurrency cap and request counters for one LLM provider"""
+
+    def __init__(self, provider: str, limit: int):
+        self.provider = provider
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+
+    async def acquire(self) -> None:
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=LLM_QUEUE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail='AI assistant is busy, please retry',
+                headers={'Retry-After': '2'}
+            )
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            'limit': self.limit,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'requests': self.requests,
+            'failures': self.failures,
+            'retries': self.retries,
+            'timeouts': self.timeouts,
+            'rejected': self.rejected,
+            'avg_ms': round(self.total_seconds / self.requests * 1000, 2) if self.requests else 0.0
+        }
+
+
+class LlmClientRegistry:
+    """Long-lived LlmChat clients keyed by (provider, model, system prompt hash).
+
+    A conversation keeps its client between messages (bounded LRU with an idle
+    timeout) instead of building a new one per request. Every call passes
+    through the provider's limiter, a timeout, and retries with jittered backoff.
+    """
+
+    def __init__(self, max_clients: int = LLM_SESSION_CLIENTS, idle_seconds: float = LLM_SESSION_IDLE_SECONDS):
+        # Reuse re-sets an entry, so the TTL is an idle timeout
+        self._clients = TTLCache(idle_seconds, max_clients)
+        self._limiters = {}
+        self.created = 0
+        self.reused = 0
+
+    def limiter(self, provider: str) -> ProviderLimiter:
+        if provider not in self._limiters:
+            self._limiters[provider] = ProviderLimiter(provider, provider_concurrency(provider))
+        return self._limiters[provider]
+
+    def client(self, provider: str, model: str, system_prompt: str, session_id: str,
+               stateless: bool = False) -> LlmChat:
+        """Pooled client for the session; `stateless` callers that supply their own
+        context get a fresh client so the backend can't accumulate history"""
+        key = (provider, model, prompt_hash(system_prompt), session_id)
+        chat_client = None if stateless else self._clients.get(key)
+        if chat_client is not None:
+            self._clients.set(key, chat_client)
+            self.reused += 1
+            return chat_client
+
+        chat_client = LlmChat(
+            api_key=os.environ.get('EMERGENT_LLM_KEY'),
+            session_id=session_id,
+            system_message=system_prompt
+        ).with_model(provider, model)
+        self.created += 1
+        if stateless:
+            return chat_client
+        self._clients.set(key, chat_client)
+        return chat_client
+
+    async def send(self, provider: str, model: str, system_prompt: str, session_id: str, text: str,
+                   stateless: bool = False) -> str:
+        chat_client = self.client(provider, model, system_prompt, session_id, stateless)
+        limiter = self.limiter(provider)
+
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            await limiter.acquire()
+            started = time.perf_counter()
+            try:
+                return await asyncio.wait_for(chat_client.send_message(UserMessage(text=text)), timeout=LLM_TIMEOUT_SECONDS)
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    limiter.timeouts += 1
+                if attempt == LLM_MAX_RETRIES:
+                    limiter.failures += 1
+                    raise
+                logger.warning(f'LLM {provider}/{model} attempt {attempt + 1} failed: {e!r}; retrying')
+            finally:
+                limiter.requests += 1
+                limiter.total_seconds += time.perf_counter() - started
+                limiter.release()
+            limiter.retries += 1
+            await asyncio.sleep(backoff_seconds(attempt))
+
+    async def stream(self, provider: str, model: str, system_prompt: str, session_id: str, text: str,
+                     stateless: bool = False):
+        """Yield response chunks. Retries only happen before the first chunk is sent;
+        LLM_TIMEOUT_SECONDS bounds the wait for each chunk."""
+        chat_client = self.client(provider, model, system_prompt, session_id, stateless)
+        if not hasattr(chat_client, 'stream_message'):
+            yield await self.send(provider, model, system_prompt, session_id, text, stateless)
+            return
+
+        limiter = self.limiter(provider)
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            await limiter.acquire()
+            started = time.perf_counter()
+            yielded = False
+            chunks = chat_client.stream_message(UserMessage(text=text)).__aiter__()
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=LLM_TIMEOUT_SECONDS)
+                    except StopAsyncIteration:
+                        return
+                    yielded = True
+                    yield chunk
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    limiter.timeouts += 1
+                if yielded or attempt == LLM_MAX_RETRIES:
+                    limiter.failures += 1
+                    raise
+                logger.warning(f'LLM {provider}/{model} stream attempt {attempt + 1} failed: {e!r}; retrying')
+            finally:
+                limiter.requests += 1
+                limiter.total_seconds += time.perf_counter() - started
+                limiter.release()
+            limiter.retries += 1
+            await asyncio.sleep(backoff_seconds(attempt))
+
+    def stats(self) -> dict:
+        prompts = {(provider, model, digest) for provider, model, digest, _ in self._clients}
+        return {
+            'clients': len(self._clients),
+            'max_clients': self._clients.max_entries,
+            'prompt_variants': len(prompts),
+            'created': self.created,
+            'reused': self.reused,
+            'providers': {provider: limiter.stats() for provider, limiter in self._limiters.items()}
+        }
+
+
+llm_clients = LlmClientRegistry()
@@ -0,0 +1,187 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import io
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .database import db
+from .user_cache import invalidate_user
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = Path(__file__).parent.parent / "uploads"
+MEDIA_DIR = UPLOAD_DIR / "media"
+# Optional origin for stored URLs. Unset, they stay backend-relative (/uploads/media/...) and the
+# frontend prefixes REACT_APP_BACKEND_URL (mediaUrl in App.js), so they survive an origin change
+MEDIA_BASE_URL = os.environ.get('MEDIA_BASE_URL', '').rstrip('/')
+MEDIA_MAX_PHOTO_BYTES = int(os.environ.get('MEDIA_MAX_PHOTO_BYTES', str(5 * 1024 * 1024)))
+MEDIA_MAX_PIXELS = 40_000_000
+MEDIA_THUMBNAIL_SIZE = int(os.environ.get('MEDIA_THUMBNAIL_SIZE', '256'))
+THUMBNAIL_QUALITY = 85
+EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+
+DATA_URL = re.compile(r'^data:image/[\w.+-]+;base64,', re.IGNORECASE)
+# Anything that isn't already a URL or path is treated as inline image data
+INLINE_PHOTO = {'$type': 'string', '$ne': '', '$not': re.compile(r'^(https?:|/)')}
+PHOTO_COLLECTIONS = ('users', 'lawyer_applications')
+
+
+def decode_inline_photo(value: str) -> Optional[bytes]:
+    """Raw bytes of a data: URL or bare base64 photo; None for URLs and empty values"""
+    if not value or value.startswith(('http:', 'https:', '/')):
+        return None
+    encoded = DATA_URL.sub('', value.strip(), count=1)
+    if len(encoded) * 3 // 4 > MEDIA_MAX_PHOTO_BYTES:
+        raise ValueError('Photo is too large')
+    try:
+        return base64.b64decode(''.join(encoded.split()), validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError('Photo is not valid base64 image data')
+
+
+def _write_once(path: Path, data: bytes) -> bool:
+    """Write `data` unless the content-addressed file already exists; True if written"""
+    if path.exists():
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+def _thumbnail(image: Image.Image) -> bytes:
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'L'):
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image.convert('RGBA'), mask=image.convert('RGBA').split()[-1])
+        image = background
+    thumb = ImageOps.fit(image.convert('RGB'), (MEDIA_THUMBNAIL_SIZE, MEDIA_THUMBNAIL_SIZE), Image.LANCZOS)
+    out = io.BytesIO()
+    thumb.save(out, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def save_image(data: bytes) -> dict:
+    """Validate image bytes and store them and a square JPEG thumbnail under their SHA-256.
+
+    Runs in a worker thread. Returns the relative paths and whether the original
+    was new; identical photos map to the same files.
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        if image.format not in EXTENSIONS:
+            raise ValueError(f'Unsupported photo format {image.format}')
+        if image.width * image.height > MEDIA_MAX_PIXELS:
+            raise ValueError('Photo dimensions are too large')
+        image.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise ValueError('Photo is not a readable image')
+
+    digest = hashlib.sha256(data).hexdigest()
+    folder = Path(digest[:2])
+    original = folder / f'{digest}.{EXTENSIONS[image.format]}'
+    thumbnail = folder / f'{digest}_{MEDIA_THUMBNAIL_SIZE}.jpg'
+    created = _write_once(MEDIA_DIR / original, data)
+    if not (MEDIA_DIR / thumbnail).exists():
+        _write_once(MEDIA_DIR / thumbnail, _thumbnail(image))
+    return {'original': original.as_posix(), 'thumbnail': thumbnail.as_posix(), 'created': created}
+
+
+def media_url(relative_path: str) -> str:
+    return f'{MEDIA_BASE_URL}/uploads/media/{relative_path}'
+
+
+class MediaStore:
+    """Moves inline (base64) profile photos out of MongoDB into the uploads store"""
+
+    def __init__(self):
+        self.stored = 0
+        self.deduplicated = 0
+        self.bytes_stored = 0
+        self.failures = 0
+        self.migrated = 0
+        self._migration = None
+
+    async def store_photo(self, value: Optional[str]) -> dict:
+        """{photo, photo_thumbnail} fields for a submitted photo.
+
+        URLs pass through unchanged; inline image data is written to the store
+        and replaced by its URL. Raises ValueError for data that isn't an image.
+        """
+        data = decode_inline_photo(value)
+        if data is None:
+            return {'photo': value or None}
+        if len(data) > MEDIA_MAX_PHOTO_BYTES:
+            raise ValueError('Photo is too large')
+
+        saved = await asyncio.get_running_loop().run_in_executor(None, save_image, data)
+        if saved['created']:
+            self.stored += 1
+            self.bytes_stored += len(data)
+        else:
+            self.deduplicated += 1
+        return {'photo': media_url(saved['original']), 'photo_thumbnail': media_url(saved['thumbnail'])}
+
+    async def migrate_inline_photos(self) -> dict:
+        """Replace inline photos already stored in users and lawyer_applications.
+
+        Each update is conditional on the photo being unchanged, so a profile
+        edited mid-migration keeps the newer value. Safe to re-run.
+        """
+        counts = {}
+        for name in PHOTO_COLLECTIONS:
+            collection = db[name]
+            migrated = failed = 0
+            async for doc in collection.find({'photo': INLINE_PHOTO}, {'_id': 1, 'id': 1, 'photo': 1}):
+                try:
+                    fields = await self.store_photo(doc['photo'])
+                except ValueError as e:
+                    failed += 1
+                    self.failures += 1
+                    logger.warning(f"Could not migrate photo for {name} {doc.get('id', doc['_id'])}: {e}")
+                    continue
+                result = await collection.update_one({'_id': doc['_id'], 'photo': doc['photo']}, {'$set': fields})
+                if result.modified_count:
+                    migrated += 1
+                    if name == 'users' and doc.get('id'):
+                        await invalidate_user(doc['id'])
+            self.migrated += migrated
+            counts[name] = {'migrated': migrated, 'failed': failed}
+        return counts
+
+    def start_migration(self) -> bool:
+        """Run the migration in the background; False if one is already running"""
+        if self._migration is not None and not self._migration.done():
+            return False
+        self._migration = asyncio.create_task(self._run_migration())
+        return True
+
+    async def _run_migration(self) -> None:
+        try:
+            counts = await self.migrate_inline_photos()
+            if any(count['migrated'] or count['failed'] for count in counts.values()):
+                logger.info(f"Inline photo migration: {counts}")
+        except Exception as e:
+            logger.warning(f"Inline photo migration failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            'stored': self.stored,
+            'deduplicated': self.deduplicated,
+            'bytes_stored': self.bytes_stored,
+            'failures': self.failures,
+            'migrated': self.migrated,
+            'migration_running': self._migration is not None and not self._migration.done(),
+            'thumbnail_size': MEDIA_THUMBNAIL_SIZE
+        }
+
+
+media_store = MediaStore()
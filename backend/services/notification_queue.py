@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import os
+import time
+from typing import List, Optional
+from pymongo.errors import AutoReconnect, BulkWriteError, ExecutionTimeout, WTimeoutError
+
+from .database import db
+from .realtime import publish_to_user
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_BATCH_SIZE = int(os.environ.get('NOTIFICATION_BATCH_SIZE', '100'))
+NOTIFICATION_FLUSH_INTERVAL = float(os.environ.get('NOTIFICATION_FLUSH_INTERVAL', '0.05'))
+NOTIFICATION_QUEUE_SIZE = int(os.environ.get('NOTIFICATION_QUEUE_SIZE', '10000'))
+NOTIFICATION_FLUSH_RETRIES = int(os.environ.get('NOTIFICATION_FLUSH_RETRIES', '3'))
+NOTIFICATION_RETRY_DELAY = float(os.environ.get('NOTIFICATION_RETRY_DELAY', '0.5'))
+
+# Errors worth retrying: the batch may go through once the primary is reachable again
+TRANSIENT_ERRORS = (AutoReconnect, ExecutionTimeout, WTimeoutError)
+DUPLICATE_KEY = 11000
+
+
+class NotificationQueue:
+    """Buffers notification inserts and writes them with insert_many.
+
+    A notification waits at most `flush_interval` seconds (or until a batch
+    fills up) before it is persisted and pushed to the recipient. Transient
+    database errors are retried with exponential backoff; rows rejected
+    individually are logged while the rest of the batch goes through.
+    """
+
+    def __init__(self, batch_size: int = NOTIFICATION_BATCH_SIZE,
+                 flush_interval: float = NOTIFICATION_FLUSH_INTERVAL,
+                 max_size: int = NOTIFICATION_QUEUE_SIZE,
+                 retries: int = NOTIFICATION_FLUSH_RETRIES,
+                 retry_delay: float = NOTIFICATION_RETRY_DELAY):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.inserted = 0
+        self.failed = 0
+        self.retried = 0
+        self.batches = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def start(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._queue = self._queue or asyncio.Queue(maxsize=self.max_size)
+            self._flusher = asyncio.create_task(self._run())
+
+    async def enqueue(self, notification: dict) -> None:
+        """Queue a notification document; only blocks if the queue is full"""
+        self.start()
+        await self._queue.put(notification)
+        self.enqueued += 1
+
+    async def _next_batch(self):
+        """Collect up to batch_size items, waiting at most flush_interval after the first"""
+        first = await self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _insert(self, batch: list) -> List[dict]:
+        """Write a batch, retrying transient errors; returns the notifications that were stored"""
+        delay = self.retry_delay
+        for attempt in range(self.retries + 1):
+            try:
+                await db.notifications.insert_many(batch, ordered=False)
+                self.inserted += len(batch)
+                return batch
+            except BulkWriteError as e:
+                return self._partial(batch, e.details, retried=attempt > 0)
+            except TRANSIENT_ERRORS as e:
+                if attempt == self.retries:
+                    error = e
+                    break
+                self.retried += 1
+                logger.warning(f'Retrying {len(batch)} notifications in {delay:.2f}s: {str(e)}')
+                await asyncio.sleep(delay)
+                delay *= 2
+            except Exception as e:
+                error = e
+                break
+
+        self.failed += len(batch)
+        logger.error(f'Failed to insert {len(batch)} notifications: {str(error)}')
+        return []
+
+    def _partial(self, batch: list, details: dict, retried: bool) -> List[dict]:
+        """Account for an unordered insert where only some rows were rejected"""
+        rejected = set()
+        already_written = 0
+        for write_error in details.get('writeErrors', []):
+            # After a retry a duplicate _id is a row the interrupted attempt already stored
+            if retried and write_error.get('code') == DUPLICATE_KEY:
+                already_written += 1
+                continue
+            rejected.add(write_error['index'])
+            notification = batch[write_error['index']]
+            logger.error(f"Failed to insert notification {notification.get('id')}: {write_error.get('errmsg')}")
+
+        self.inserted += details.get('nInserted', 0) + already_written
+        self.failed += len(rejected)
+        return [notification for index, notification in enumerate(batch) if index not in rejected]
+
+    async def _flush(self, batch: list) -> None:
+        started = time.perf_counter()
+        try:
+            batch = await self._insert(batch)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.batches += 1
+            self.last_flush_ms = elapsed
+            self.max_flush_ms = max(self.max_flush_ms, elapsed)
+            self.total_flush_ms += elapsed
+
+        for notification in batch:
+            notification.pop('_id', None)
+            await publish_to_user(notification['user_id'], 'notification', notification)
+
+    async def _run(self) -> None:
+        while True:
+            batch, stopping = await self._next_batch()
+            if batch:
+                await self._flush(batch)
+            if stopping:
+                return
+
+    async def stop(self) -> None:
+        """Stop the flusher after it has written everything still queued"""
+        if self._flusher is not None and not self._flusher.done():
+            await self._queue.put(None)
+            await self._flusher
+        self._flusher = None
+
+        if self._queue is None:
+            return
+        remaining = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                remaining.append(item)
+        for start in range(0, len(remaining), self.batch_size):
+            await self._flush(remaining[start:start + self.batch_size])
+
+    def stats(self) -> dict:
+        return {
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'enqueued': self.enqueued,
+            'inserted': self.inserted,
+            'failed': self.failed,
+            'retried': self.retried,
+            'batches': self.batches,
+            'avg_batch_size': round(self.inserted / self.batches, 2) if self.batches else 0.0,
+            'last_flush_ms': round(self.last_flush_ms, 2),
+            'max_flush_ms': round(self.max_flush_ms, 2),
+            'avg_flush_ms': round(self.total_flush_ms / self.batches, 2) if self.batches else 0.0
+        }
+
+
+notification_queue = NotificationQueue()
@@ -0,0 +1,50 @@
+import base64
+import json
+from datetime import datetime, timezone
+from fastapi import HTTPException
+
+
+def encode_cursor(*values) -> str:
+    """Opaque keyset cursor from the sort key values of the last row on a page"""
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('utf-8')
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Inverse of encode_cursor; raises 400 on malformed input"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('utf-8')))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Only scalars: an object such as {"$ne": null} would otherwise become a query operator
+    if not all(value is None or (isinstance(value, (str, int, float)) and not isinstance(value, bool))
+               for value in values):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def parse_cursor_datetime(value: str) -> datetime:
+    """Restore a datetime cursor value (naive values are UTC, as Mongo returns them)"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def keyset_filter(sort: list, values: list) -> dict:
+    """Mongo filter selecting rows strictly after `values` in the given sort order.
+
+    For sort [(a, -1), (id, 1)] this expands to
+    {a < va} OR {a == va AND id > vid}.
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {prev_field: values[j] for j, (prev_field, _) in enumerate(sort[:i])}
+        clause[field] = {'$gt' if direction == 1 else '$lt': values[i]}
+        clauses.append(clause)
+    return {'$or': clauses}
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+
+# bcrypt releases the GIL while hashing, so threads give real parallelism
+PASSWORD_POOL_WORKERS = int(os.environ.get('PASSWORD_POOL_WORKERS', str(min(4, os.cpu_count() or 1))))
+PASSWORD_POOL_QUEUE_LIMIT = int(os.environ.get('PASSWORD_POOL_QUEUE_LIMIT', '256'))
+
+
+class PasswordPool:
+    """Size-limited worker pool for CPU-bound password hashing.
+
+    Work beyond `workers + queue_limit` outstanding jobs is rejected with a
+    503 instead of piling up behind the event loop.
+    """
+
+    def __init__(self, workers: int = PASSWORD_POOL_WORKERS, queue_limit: int = PASSWORD_POOL_QUEUE_LIMIT):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-pool')
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_pending = 0
+
+    async def run(self, func, *args):
+        """Run func(*args) on the pool, raising 503 when saturated"""
+        if self.pending >= self.workers + self.queue_limit:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail='Authentication service is busy, please retry',
+                headers={'Retry-After': '1'}
+            )
+
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            self.total_seconds += time.perf_counter() - started
+
+    def stats(self) -> dict:
+        return {
+            'workers': self.workers,
+            'queue_limit': self.queue_limit,
+            'in_flight': min(self.pending, self.workers),
+            'queue_depth': max(0, self.pending - self.workers),
+            'max_pending': self.max_pending,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'avg_ms': round(self.total_seconds / self.completed * 1000, 2) if self.completed else 0.0
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_pool = PasswordPool()
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Set
+from fastapi.encoders import jsonable_encoder
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def user_channel(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def state_channel(state: str) -> str:
+    return f"state:{state}"
+
+
+class Broker:
+    """Transport that carries events between workers.
+
+    A multi-worker deployment plugs in an implementation backed by a shared
+    pub/sub system (Redis, NATS, MongoDB change streams); every worker's hub
+    receives every published event through `handler` and delivers it to its
+    own local connections.
+    """
+
+    def __init__(self):
+        self.handler: Optional[Callable[[str, dict], Awaitable[None]]] = None
+
+    async def start(self, handler: Callable[[str, dict], Awaitable[None]]) -> None:
+        self.handler = handler
+
+    async def publish(self, channel: str, event: dict) -> None:
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        self.handler = None
+
+
+class InMemoryBroker(Broker):
+    """Single-process broker (default, and the stand-in for tests)"""
+
+    async def publish(self, channel: str, event: dict) -> None:
+        if self.handler is not None:
+            await self.handler(channel, event)
+
+
+class Subscription:
+    """One connected client: a bounded queue fed from its channels"""
+
+    def __init__(self, channels: Iterable[str], maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self.channels = set(channels)
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def push(self, event: dict) -> None:
+        # A slow client loses its oldest events instead of stalling the hub
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class RealtimeHub:
+    """In-process fan-out of events to WebSocket/SSE subscribers"""
+
+    def __init__(self, broker: Broker = None):
+        self.broker = broker or InMemoryBroker()
+        self._channels: Dict[str, Set[Subscription]] = {}
+        self._started = False
+        self.published = 0
+        self.delivered = 0
+
+    async def start(self) -> None:
+        if not self._started:
+            await self.broker.start(self._deliver)
+            self._started = True
+
+    async def stop(self) -> None:
+        if self._started:
+            await self.broker.stop()
+            self._started = False
+
+    async def set_broker(self, broker: Broker) -> None:
+        """Swap the transport (call at startup, before clients connect)"""
+        await self.stop()
+        self.broker = broker
+        await self.start()
+
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        subscription = Subscription(channels)
+        for channel in subscription.channels:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for channel in subscription.channels:
+            subscribers = self._channels.get(channel)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._channels[channel]
+
+    async def publish(self, channel: str, event_type: str, data) -> None:
+        """Publish an event; failures are logged so callers' writes still succeed"""
+        event = {'type': event_type, 'data': jsonable_encoder(data)}
+        try:
+            await self.start()
+            await self.broker.publish(channel, event)
+            self.published += 1
+        except Exception as e:
+            logger.error(f'Realtime publish to {channel} failed: {str(e)}')
+
+    async def _deliver(self, channel: str, event: dict) -> None:
+        for subscription in list(self._channels.get(channel, ())):
+            subscription.push(event)
+            self.delivered += 1
+
+    def stats(self) -> dict:
+        subscriptions = {sub for subs in self._channels.values() for sub in subs}
+        return {
+            'broker': type(self.broker).__name__,
+            'channels': len(self._channels),
+            'connections': len(subscriptions),
+            'published': self.published,
+            'delivered': self.delivered,
+            'dropped': sum(sub.dropped for sub in subscriptions)
+        }
+
+
+hub = RealtimeHub()
+
+
+async def publish_to_user(user_id: str, event_type: str, data) -> None:
+    await hub.publish(user_channel(user_id), event_type, data)
+
+
+async def publish_to_state(state: str, event_type: str, data) -> None:
+    await hub.publish(state_channel(state), event_type, data)
@@ -0,0 +1,55 @@
+import os
+from datetime import datetime, timedelta, timezone
+from typing import List, Tuple
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from .database import db
+
+# Reservations are taken per time bucket; a booking holds every bucket it touches
+SLOT_MINUTES = int(os.environ.get('SLOT_MINUTES', '15'))
+
+
+def slot_keys(start: datetime, end: datetime) -> List[str]:
+    """Bucket keys covering [start, end), aligned to SLOT_MINUTES"""
+    bucket = start.replace(second=0, microsecond=0)
+    bucket -= timedelta(minutes=bucket.minute % SLOT_MINUTES)
+    keys = []
+    while bucket < end:
+        keys.append(bucket.strftime('%Y-%m-%dT%H:%M'))
+        bucket += timedelta(minutes=SLOT_MINUTES)
+    return keys
+
+
+async def reserve(lawyer_id: str, booking_id: str, interval: Tuple[datetime, datetime]) -> bool:
+    """Claim every bucket of the interval for booking_id, all or nothing.
+
+    The unique (lawyer_id, slot) index makes this a compare-and-set: of
+    several concurrent callers only one can insert a given bucket. Buckets
+    the booking already holds (reschedule onto an overlapping time) are
+    skipped. Returns False if any bucket belongs to another booking.
+    """
+    keys = slot_keys(*interval)
+    held = await db.slot_reservations.distinct('slot', {'lawyer_id': lawyer_id, 'booking_id': booking_id})
+    wanted = [key for key in keys if key not in held]
+    if not wanted:
+        return True
+
+    now = datetime.now(timezone.utc).isoformat()
+    docs = [{'lawyer_id': lawyer_id, 'slot': key, 'booking_id': booking_id, 'created_at': now} for key in wanted]
+    try:
+        await db.slot_reservations.insert_many(docs, ordered=True)
+        return True
+    except (BulkWriteError, DuplicateKeyError):
+        # Roll back whatever part of this attempt got in before the conflict
+        await db.slot_reservations.delete_many(
+            {'lawyer_id': lawyer_id, 'booking_id': booking_id, 'slot': {'$in': wanted}}
+        )
+        return False
+
+
+async def release(booking_id: str, keep: List[str] = None) -> None:
+    """Free a booking's buckets, optionally keeping the ones in `keep`"""
+    query = {'booking_id': booking_id}
+    if keep:
+        query['slot'] = {'$nin': keep}
+    await db.slot_reservations.delete_many(query)
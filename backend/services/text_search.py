@@ -0,0 +1,312 @@
+import asyncio
+import bisect
+import heapq
+import logging
+import math
+import os
+import re
+import time
+import unicodedata
+from collections import defaultdict, deque
+from typing import Dict, List, Optional
+
+from .database import db
+
+logger = logging.getLogger(__name__)
+
+TEXT_INDEX_REFRESH_SECONDS = float(os.environ.get('TEXT_INDEX_REFRESH_SECONDS', '300'))
+TEXT_SEARCH_P95_TARGET_MS = float(os.environ.get('TEXT_SEARCH_P95_TARGET_MS', '20'))
+PREFIX_EXPANSIONS = 20
+MAX_SCORED_POSTINGS = 2000
+LATENCY_SAMPLES = 1000
+
+# Latin (incl. accented) letters, digits and the Devanagari block minus dandas.
+# Python's \w splits Devanagari words at vowel signs, so it can't be used here.
+TOKEN = re.compile(r'[0-9a-z\u00c0-\u024f\u0900-\u0963\u0966-\u097f]+')
+NUKTA = '\u093c'
+
+STOPWORDS = {
+    # English
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have', 'i', 'in', 'is', 'it',
+    'of', 'on', 'or', 'the', 'to', 'with', 'my', 'me', 'we', 'our', 'you', 'your',
+    # Hindi
+    'का', 'की', 'के', 'को', 'में', 'है', 'हैं', 'और', 'से', 'पर', 'यह', 'वह', 'भी', 'था', 'थे', 'एक', 'लिए',
+}
+
+# field -> weight; names and practice areas matter more than long bios
+LAWYER_FIELDS = {'full_name': 3.0, 'specialization': 3.0, 'court': 1.5, 'city': 1.5, 'state': 1.0,
+                 'languages': 1.0, 'education': 1.0, 'bio': 1.0}
+LAWFIRM_FIELDS = {'firm_name': 3.0, 'practice_areas': 3.0, 'city': 1.5, 'state': 1.0, 'description': 1.0,
+                  'achievements': 0.5}
+
+# Small snapshot kept in the index so results need no database round-trip
+SNAPSHOT_FIELDS = ('id', 'full_name', 'firm_name', 'specialization', 'practice_areas', 'city', 'state',
+                   'court', 'rating', 'experience_years', 'fee_range')
+
+
+# Plurals that add -es to the singular; other -es words (cases, licenses) only add -s
+ES_PLURALS = ('sses', 'xes', 'zzes', 'ches', 'shes')
+
+
+def _stem(token: str) -> str:
+    """Very light English stemming so 'lawyers'/'lawyer' and 'disputes'/'dispute' meet"""
+    if not token.isascii() or len(token) <= 3 or not token.endswith('s') or token.endswith(('ss', 'us', 'is')):
+        return token
+    if token.endswith('ies') and len(token) >= 6:
+        return token[:-3] + 'y'
+    if token.endswith(ES_PLURALS) and len(token) >= 5:
+        return token[:-2]
+    return token[:-1]
+
+
+def tokenize(text) -> List[str]:
+    """Lower-case, NFC-normalise, drop nukta and stopwords, stem English plurals"""
+    if text is None:
+        return []
+    if isinstance(text, (list, tuple)):
+        text = ' '.join(str(item) for item in text if item)
+    text = unicodedata.normalize('NFC', str(text).lower()).replace(NUKTA, '')
+    return [_stem(token) for token in TOKEN.findall(text) if token not in STOPWORDS]
+
+
+class InvertedIndex:
+    """In-memory weighted inverted index with BM25 ranking and prefix lookup.
+
+    Postings hold each document's precomputed BM25 term impact, so a query is a
+    sum of idf * impact. Only the MAX_SCORED_POSTINGS highest-impact postings of
+    a term are scored, which bounds query time for very common terms.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, fields: Dict[str, float]):
+        self.fields = fields
+        self.postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.doc_terms: Dict[str, Dict[str, float]] = {}
+        self.doc_lengths: Dict[str, float] = {}
+        self.total_length = 0.0
+        self.snapshots: Dict[str, dict] = {}
+        self.vocabulary: List[str] = []
+        self._ranked: Dict[str, List[tuple]] = {}
+
+    def __len__(self):
+        return len(self.doc_terms)
+
+    def _impact(self, weight: float, length: float) -> float:
+        avg_length = self.total_length / len(self.doc_terms)
+        return weight * (self.K1 + 1) / (weight + self.K1 * (1 - self.B + self.B * length / avg_length))
+
+    def _index(self, doc: dict) -> List[str]:
+        """Add doc to postings; returns terms that are new to the vocabulary"""
+        doc_id = doc['id']
+        self.remove(doc_id)
+
+        weights = defaultdict(float)
+        for field, weight in self.fields.items():
+            for token in tokenize(doc.get(field)):
+                weights[token] += weight
+        if not weights:
+            return []
+
+        length = sum(weights.values())
+        self.doc_terms[doc_id] = dict(weights)
+        self.doc_lengths[doc_id] = length
+        self.total_length += length
+        self.snapshots[doc_id] = {field: doc.get(field) for field in SNAPSHOT_FIELDS if doc.get(field) is not None}
+
+        new_terms = []
+        for term, weight in weights.items():
+            if term not in self.postings:
+                new_terms.append(term)
+            impact = self._impact(weight, length)
+            self.postings[term][doc_id] = impact
+            ranked = self._ranked.get(term)
+            if ranked is not None and (len(ranked) < MAX_SCORED_POSTINGS or impact > ranked[-1][1]):
+                # Keep the cached top postings current instead of re-ranking a common term
+                ranked.insert(bisect.bisect_left([-item[1] for item in ranked], -impact), (doc_id, impact))
+                del ranked[MAX_SCORED_POSTINGS:]
+        return new_terms
+
+    def upsert(self, doc: dict) -> None:
+        for term in self._index(doc):
+            bisect.insort(self.vocabulary, term)
+
+    def bulk_load(self, docs) -> None:
+        """Index many documents, sorting the vocabulary once at the end"""
+        for doc in docs:
+            self._index(doc)
+        self.vocabulary = sorted(self.postings)
+        # Pre-rank common terms so the first queries don't pay for it
+        for term, postings in self.postings.items():
+            if len(postings) > MAX_SCORED_POSTINGS:
+                self._top_postings(term)
+
+    def remove(self, doc_id: str) -> None:
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            ranked = self._ranked.get(term)
+            if ranked is not None:
+                self._ranked[term] = [item for item in ranked if item[0] != doc_id]
+            if not postings:
+                del self.postings[term]
+                self._ranked.pop(term, None)
+                i = bisect.bisect_left(self.vocabulary, term)
+                if i < len(self.vocabulary) and self.vocabulary[i] == term:
+                    del self.vocabulary[i]
+        self.total_length -= self.doc_lengths.pop(doc_id, 0.0)
+        self.snapshots.pop(doc_id, None)
+
+    def _top_postings(self, term: str) -> List[tuple]:
+        ranked = self._ranked.get(term)
+        if ranked is None:
+            ranked = heapq.nlargest(MAX_SCORED_POSTINGS, self.postings[term].items(), key=lambda item: item[1])
+            self._ranked[term] = ranked
+        return ranked
+
+    def prefix_terms(self, prefix: str, limit: int = PREFIX_EXPANSIONS) -> List[str]:
+        """Vocabulary terms starting with prefix, most common first"""
+        i = bisect.bisect_left(self.vocabulary, prefix)
+        matches = []
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(prefix):
+            matches.append(self.vocabulary[i])
+            i += 1
+        return heapq.nlargest(limit, matches, key=lambda term: len(self.postings[term]))
+
+    def search(self, query: str, limit: int = 20) -> List[dict]:
+        """BM25 ranking; the last query word also matches as a prefix (search-as-you-type)"""
+        tokens = tokenize(query)
+        if not tokens or not self.doc_terms:
+            return []
+
+        total_docs = len(self.doc_terms)
+        scores = defaultdict(float)
+
+        for position, token in enumerate(tokens):
+            candidates = [token] if token in self.postings else []
+            if position == len(tokens) - 1:
+                candidates += [term for term in self.prefix_terms(token) if term != token]
+            for term in candidates:
+                df = len(self.postings[term])
+                idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+                # Prefix-only matches count for less than exact ones
+                if term != token:
+                    idf *= 0.5
+                for doc_id, impact in self._top_postings(term):
+                    scores[doc_id] += idf * impact
+
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [{**self.snapshots[doc_id], 'score': round(score, 4)} for doc_id, score in ranked]
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        tokens = tokenize(prefix)
+        return self.prefix_terms(tokens[-1], limit) if tokens else []
+
+
+class TextSearchService:
+    """Lawyer and law firm indexes, built from db.users and kept current by hooks.
+
+    Profile writes in this worker update the index immediately; a background
+    rebuild every `refresh_seconds` picks up writes from other workers. Writes
+    made while a build is reading db.users are replayed onto the new indexes
+    before they replace the current ones, so the swap can't lose them.
+    """
+
+    KINDS = {'lawyer': LAWYER_FIELDS, 'law_firm': LAWFIRM_FIELDS}
+
+    def __init__(self, refresh_seconds: float = TEXT_INDEX_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.indexes = {kind: InvertedIndex(fields) for kind, fields in self.KINDS.items()}
+        self.built_at: Optional[float] = None
+        self._build_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Profile changes seen during a build, as (kind, id, doc or None for a removal)
+        self._pending: Optional[List[tuple]] = None
+        self.latencies = {kind: deque(maxlen=LATENCY_SAMPLES) for kind in self.KINDS}
+
+    async def build(self) -> None:
+        async with self._build_lock:
+            started = time.perf_counter()
+            indexes = {kind: InvertedIndex(fields) for kind, fields in self.KINDS.items()}
+            projection = {'_id': 0, **{field: 1 for field in SNAPSHOT_FIELDS},
+                          **{field: 1 for fields in self.KINDS.values() for field in fields}}
+            docs = {kind: [] for kind in self.KINDS}
+            self._pending = []
+            try:
+                async for doc in db.users.find({'user_type': {'$in': list(self.KINDS)}}, projection | {'user_type': 1}):
+                    if doc.get('id'):
+                        docs[doc['user_type']].append(doc)
+                for kind, index in indexes.items():
+                    index.bulk_load(docs[kind])
+                # The scan may or may not have seen these; replaying them is idempotent
+                for kind, doc_id, doc in self._pending:
+                    if doc is None:
+                        indexes[kind].remove(doc_id)
+                    else:
+                        indexes[kind].upsert(doc)
+                self.indexes = indexes
+                self.built_at = time.monotonic()
+            finally:
+                self._pending = None
+            logger.info(f"Text index built: {', '.join(f'{k}={len(v)}' for k, v in indexes.items())} "
+                        f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    async def _ensure_fresh(self) -> None:
+        if self.built_at is None:
+            await self.build()
+        elif time.monotonic() - self.built_at > self.refresh_seconds and (
+                self._refresh_task is None or self._refresh_task.done()):
+            # Serve the current index while a fresh one is built
+            self._refresh_task = asyncio.create_task(self.build())
+
+    async def search(self, kind: str, query: str, limit: int = 20) -> List[dict]:
+        await self._ensure_fresh()
+        started = time.perf_counter()
+        results = self.indexes[kind].search(query, limit)
+        self.latencies[kind].append((time.perf_counter() - started) * 1000)
+        return results
+
+    async def suggest(self, kind: str, prefix: str, limit: int = 10) -> List[str]:
+        await self._ensure_fresh()
+        return self.indexes[kind].suggest(prefix, limit)
+
+    def index_profile(self, doc: dict) -> None:
+        """Hook for profile creation/updates"""
+        kind = doc.get('user_type')
+        if kind not in self.indexes or not doc.get('id'):
+            return
+        if self._pending is not None:
+            self._pending.append((kind, doc['id'], doc))
+        if self.built_at is not None:
+            self.indexes[kind].upsert(doc)
+
+    def remove_profile(self, kind: str, doc_id: str) -> None:
+        if kind not in self.indexes:
+            return
+        if self._pending is not None:
+            self._pending.append((kind, doc_id, None))
+        self.indexes[kind].remove(doc_id)
+
+    def stats(self) -> dict:
+        stats = {'target_p95_ms': TEXT_SEARCH_P95_TARGET_MS}
+        for kind, index in self.indexes.items():
+            samples = sorted(self.latencies[kind])
+            p95 = samples[int(len(samples) * 0.95) - 1] if samples else 0.0
+            stats[kind] = {
+                'documents': len(index),
+                'terms': len(index.vocabulary),
+                'queries': len(samples),
+                'p50_ms': round(samples[len(samples) // 2], 3) if samples else 0.0,
+                'p95_ms': round(p95, 3),
+                'within_target': p95 <= TEXT_SEARCH_P95_TARGET_MS
+            }
+        return stats
+
+
+text_search = TextSearchService()
@@ -0,0 +1,67 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterator, Optional
+
+
+class TTLCache:
+    """Bounded in-process map whose entries expire `ttl` seconds after they are set.
+
+    `get` moves an entry to the most recently used end; once more than
+    `max_entries` are held the least recently used one is evicted. `on_remove`
+    is called with (key, value) when an entry expires or is evicted, so owners
+    can drop any side index they keep for it.
+    """
+
+    def __init__(self, ttl: float, max_entries: int,
+                 on_remove: Optional[Callable[[Hashable, Any], None]] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.on_remove = on_remove
+        self._entries = OrderedDict()
+        self.evictions = 0
+
+    def _expire(self, key: Hashable) -> None:
+        _, value = self._entries.pop(key)
+        if self.on_remove is not None:
+            self.on_remove(key, value)
+
+    def peek(self, key: Hashable, default=None):
+        """Live value without touching its LRU position"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        if entry[0] < time.monotonic():
+            self._expire(key)
+            return default
+        return entry[1]
+
+    def get(self, key: Hashable, default=None):
+        value = self.peek(key, self)
+        if value is self:
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value) -> None:
+        """Store (or refresh) an entry with a full TTL, evicting the LRU entries over the limit"""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._expire(next(iter(self._entries)))
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default=None):
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def values(self) -> list:
+        return [value for _, value in self._entries.values()]
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
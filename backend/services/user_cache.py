@@ -0,0 +1,64 @@
+import os
+from typing import Optional
+
+from .database import db
+from .ttl_cache import TTLCache
+
+USER_CACHE_TTL_SECONDS = float(os.environ.get('USER_CACHE_TTL_SECONDS', '60'))
+USER_CACHE_MAX_ENTRIES = int(os.environ.get('USER_CACHE_MAX_ENTRIES', '10000'))
+
+
+class UserCache:
+    """In-process TTL + LRU cache of authenticated user documents keyed by user id.
+
+    Invalidation is per-process: other uvicorn workers keep their copy of a
+    changed user until it expires, so USER_CACHE_TTL_SECONDS bounds how stale
+    a worker can be.
+    """
+
+    def __init__(self, ttl: float = USER_CACHE_TTL_SECONDS, max_entries: int = USER_CACHE_MAX_ENTRIES):
+        self._entries = TTLCache(ttl, max_entries)
+        self.hits = 0
+        self.misses = 0
+
+    async def get_user(self, user_id: str) -> Optional[dict]:
+        """Return the user document, loading it from MongoDB on a miss"""
+        user = self._entries.get(user_id)
+        if user is not None:
+            self.hits += 1
+            return dict(user)
+
+        self.misses += 1
+        user = await db.users.find_one({'id': user_id}, {'_id': 0, 'search': 0})
+        if user is None:
+            return None
+
+        self._entries.set(user_id, user)
+        return dict(user)
+
+    async def invalidate(self, user_id: str) -> None:
+        """Drop a user after it has been modified or deleted"""
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self._entries.max_entries,
+            'ttl_seconds': self._entries.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self._entries.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+user_cache = UserCache()
+
+
+async def invalidate_user(user_id: str) -> None:
+    """Invalidation hook for code paths that mutate db.users"""
+    await user_cache.invalidate(user_id)
@@ -60,6 +60,8 @@ import JoinFirmSignup from './pages/JoinFirmSignup';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 export const API = `${BACKEND_URL}/api`;
+// Uploaded media URLs are stored relative to the backend (/uploads/media/...)
+export const mediaUrl = (url) => (url && url.startsWith('/') ? `${BACKEND_URL}${url}` : url);
 
 // Auth Context
 export const AuthContext = React.createContext();
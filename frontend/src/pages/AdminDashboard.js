@@ -10,7 +10,7 @@ import {
 import { Button } from '../components/ui/button';
 import { toast } from 'sonner';
 import axios from 'axios';
-import { API } from '../App';
+import { API, mediaUrl } from '../App';
 
 // Animated Background Component
 const AnimatedBackground = () => (
@@ -133,6 +133,21 @@ export default function AdminDashboard() {
     }
   }, [navigate]);
 
+  // List responses leave out inline photos; fetch the full application when it has one
+  const openApplication = async (app, type) => {
+    setSelectedApp({ ...app, type });
+    if (!app.has_photo || app.photo || (type !== 'lawyer' && type !== 'lawfirm')) return;
+    try {
+      const token = localStorage.getItem('adminToken');
+      const res = await axios.get(`${API}/admin/applications/${type}/${app._id}`, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      setSelectedApp(current => (current && current._id === app._id ? { ...res.data, type } : current));
+    } catch (error) {
+      console.error('Error fetching application:', error);
+    }
+  };
+
   const fetchAllApplications = async () => {
     setLoading(true);
     try {
@@ -331,7 +346,7 @@ export default function AdminDashboard() {
         subtitle: app.specialization,
         detail1: `${app.city}, ${app.state}`,
         detail2: `${app.experience || app.experience_years || 0} yrs exp`,
-        image: app.photo || `https://randomuser.me/api/portraits/men/${parseInt(app._id?.slice(-2) || '10', 16) % 90}.jpg`
+        image: mediaUrl(app.photo) || `https://randomuser.me/api/portraits/men/${parseInt(app._id?.slice(-2) || '10', 16) % 90}.jpg`
       },
       lawfirm: {
         color: 'blue',
@@ -377,7 +392,7 @@ export default function AdminDashboard() {
         animate={{ opacity: 1, y: 0 }}
         whileHover={{ y: -4, scale: 1.01 }}
         className={`bg-slate-900/60 backdrop-blur-sm border border-slate-700/50 rounded-2xl p-5 cursor-pointer ${config.border} transition-all group`}
-        onClick={() => setSelectedApp({ ...app, type })}
+        onClick={() => openApplication(app, type)}
       >
         <div className="flex items-start gap-4">
           {config.image ? (
@@ -464,7 +479,7 @@ export default function AdminDashboard() {
             <div className="flex items-center gap-4">
               {app.type === 'lawyer' ? (
                 <img
-                  src={app.photo || `https://randomuser.me/api/portraits/men/${parseInt(app._id?.slice(-2) || '10', 16) % 90}.jpg`}
+                  src={mediaUrl(app.photo) || `https://randomuser.me/api/portraits/men/${parseInt(app._id?.slice(-2) || '10', 16) % 90}.jpg`}
                   alt={app.name}
                   className={`w-20 h-20 rounded-2xl object-cover border-2 border-${config.color}-500 shadow-lg shadow-${config.color}-500/20`}
                 />
@@ -5,6 +5,7 @@ import { Scale, Search, Filter, Briefcase, MapPin, ArrowRight, X, ChevronDown, C
 import { Button } from '../components/ui/button';
 import { dummyLawyers, specializationsList, statesList } from '../data/lawyersData';
 import axios from 'axios';
+import { mediaUrl } from '../App';
 
 const API = process.env.REACT_APP_API_URL || 'http://localhost:5000/api';
 
@@ -328,7 +329,7 @@ const BrowseLawyers = () => {
                 <div className="flex items-start justify-between mb-4">
                   <div className="relative">
                     <img
-                      src={(lawyer.photo && lawyer.photo.length > 5) ? lawyer.photo : (lawyer.image || `https://ui-avatars.com/api/?name=${encodeURIComponent(lawyer.name)}&background=0D8ABC&color=fff`)}
+                      src={(lawyer.photo && lawyer.photo.length > 5) ? mediaUrl(lawyer.photo) : (lawyer.image || `https://ui-avatars.com/api/?name=${encodeURIComponent(lawyer.name)}&background=0D8ABC&color=fff`)}
                       alt={lawyer.name}
                       className="w-16 h-16 rounded-full object-cover"
                     />
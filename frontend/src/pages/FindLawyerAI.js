@@ -3,6 +3,7 @@ import { useNavigate } from 'react-router-dom';
 import { Scale, Send, Bot, Briefcase, MapPin, ArrowRight, X, AlertCircle, CheckCircle, MessageSquare } from 'lucide-react';
 import { CorporateButton, CorporateBadge } from '../components/CorporateComponents';
 import { dummyLawyers, specializations } from '../data/lawyersData';
+import { mediaUrl } from '../App';
 
 export default function FindLawyerAI() {
   const navigate = useNavigate();
@@ -345,7 +346,7 @@ export default function FindLawyerAI() {
                 >
                   <div className="flex items-center gap-4 mb-4">
                     <img
-                      src={lawyer.photo}
+                      src={mediaUrl(lawyer.photo)}
                       alt={lawyer.name}
                       className="w-16 h-16 rounded-lg object-cover"
                     />
@@ -409,7 +410,7 @@ export default function FindLawyerAI() {
 
               <div className="flex items-start gap-6 mb-6">
                 <img
-                  src={selectedLawyer.photo}
+                  src={mediaUrl(selectedLawyer.photo)}
                   alt={selectedLawyer.name}
                   className="w-24 h-24 rounded-lg object-cover"
                 />
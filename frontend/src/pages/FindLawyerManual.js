@@ -3,6 +3,7 @@ import { useNavigate } from 'react-router-dom';
 import { Scale, Search, Filter, X, Briefcase, MapPin, ArrowRight, ChevronLeft, ChevronRight } from 'lucide-react';
 import { CorporateButton, CorporateInput, CorporateBadge } from '../components/CorporateComponents';
 import { dummyLawyers, states, specializations, searchLawyers } from '../data/lawyersData';
+import { mediaUrl } from '../App';
 
 export default function FindLawyerManual() {
   const navigate = useNavigate();
@@ -229,7 +230,7 @@ export default function FindLawyerManual() {
                 >
                   <div className="flex items-center gap-3 mb-4">
                     <img
-                      src={lawyer.photo}
+                      src={mediaUrl(lawyer.photo)}
                       alt={lawyer.name}
                       className="w-14 h-14 rounded-lg object-cover"
                     />
@@ -354,7 +355,7 @@ export default function FindLawyerManual() {
 
               <div className="flex items-start gap-6 mb-6">
                 <img
-                  src={selectedLawyer.photo}
+                  src={mediaUrl(selectedLawyer.photo)}
                   alt={selectedLawyer.name}
                   className="w-24 h-24 rounded-lg object-cover"
                 />
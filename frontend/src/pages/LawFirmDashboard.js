@@ -6,7 +6,7 @@ import { Input } from '../components/ui/input';
 import { Building2, LogOut, LayoutDashboard, Users, Calendar, FileText, TrendingUp, MessageSquare, Settings, Search, MoreVertical, Clock, CheckCircle, AlertCircle, Phone, Video, Mail, MapPin, Briefcase, Scale, Shield, Plus, Eye, Edit, Trash2 } from 'lucide-react';
 import { toast } from 'sonner';
 import axios from 'axios';
-import { API } from '../App';
+import { API, mediaUrl } from '../App';
 
 export default function LawFirmDashboard() {
   const navigate = useNavigate();
@@ -268,7 +268,7 @@ export default function LawFirmDashboard() {
                 <div className="space-y-3">
                   {firmLawyers.slice(0, 4).map((lawyer, idx) => (
                     <div key={idx} className="flex items-center space-x-3 p-3 rounded-xl hover:bg-gray-50 transition-all">
-                      <img src={lawyer.photo} alt={lawyer.name} className="w-10 h-10 rounded-full object-cover border-2 border-gray-200" />
+                      <img src={mediaUrl(lawyer.photo)} alt={lawyer.name} className="w-10 h-10 rounded-full object-cover border-2 border-gray-200" />
                       <div className="flex-1">
                         <p className="font-semibold text-[#0F2944] text-sm">{lawyer.name}</p>
                         <p className="text-xs text-gray-500">{lawyer.specialization}</p>
@@ -350,7 +350,7 @@ export default function LawFirmDashboard() {
                 >
                   <div className="flex items-start justify-between mb-4">
                     <div className="flex items-center space-x-4">
-                      <img src={lawyer.photo} alt={lawyer.name} className="w-14 h-14 rounded-full object-cover border-2 border-blue-500/30" />
+                      <img src={mediaUrl(lawyer.photo)} alt={lawyer.name} className="w-14 h-14 rounded-full object-cover border-2 border-blue-500/30" />
                       <div>
                         <h3 className="font-semibold text-white">{lawyer.name}</h3>
                         <p className="text-sm text-blue-400">{lawyer.specialization}</p>
@@ -406,7 +406,7 @@ export default function LawFirmDashboard() {
                   <div className="flex items-start justify-between mb-4">
                     <div className="flex items-center space-x-4">
                       <img
-                        src={application.photo}
+                        src={mediaUrl(application.photo)}
                         alt={application.full_name}
                         className="w-16 h-16 rounded-xl object-cover"
                       />
@@ -784,7 +784,7 @@ export default function LawFirmDashboard() {
                     <tr key={idx} className="border-b border-slate-800/30 hover:bg-slate-900/30">
                       <td className="py-4">
                         <div className="flex items-center space-x-3">
-                          <img src={lawyer.photo} alt="" className="w-10 h-10 rounded-full border-2 border-blue-500/30" />
+                          <img src={mediaUrl(lawyer.photo)} alt="" className="w-10 h-10 rounded-full border-2 border-blue-500/30" />
                           <span className="text-white font-medium">{lawyer.name}</span>
                         </div>
                       </td>
@@ -233,6 +233,21 @@ export default function LawyerDashboard() {
     setDocToDelete(doc);
   };
 
+  // Document files need auth, so open them through a short-lived download URL
+  const openDocument = async (doc) => {
+    const viewer = window.open('', '_blank');
+    try {
+      const res = await axios.post(`${API}/documents/${doc.id}/download-url`, {}, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      viewer.location.href = `${API.replace('/api', '')}${res.data.url}`;
+    } catch (error) {
+      viewer.close();
+      console.error('Error opening document:', error);
+      toast.error('Failed to open document');
+    }
+  };
+
   const confirmDeleteDocument = async () => {
     if (!docToDelete) return;
 
@@ -328,6 +343,11 @@ export default function LawyerDashboard() {
         headers: { Authorization: `Bearer ${token}` }
       });
       setChatHistory(res.data);
+      if (chat.unread) {
+        axios.post(`${API}/messages/${chat.other_user_id}/read`, {}, {
+          headers: { Authorization: `Bearer ${token}` }
+        }).catch(() => {});
+      }
     } catch (error) {
       toast.error('Failed to load chat history');
     }
@@ -1476,9 +1496,9 @@ export default function LawyerDashboard() {
                         <tr key={idx} className="border-b border-gray-100 hover:bg-gray-50 transition-all duration-200">
                           <td className="px-6 py-4 flex items-center space-x-2">
                             <FileText className={`w-5 h-5 ${doc.file_type?.includes('pdf') ? 'text-red-500' : 'text-blue-500'}`} />
-                            <a href={`${API.replace('/api', '')}${doc.file_url}`} target="_blank" rel="noopener noreferrer" className="font-medium text-[#0F2944] hover:text-blue-600 transition-colors">
+                            <button type="button" onClick={() => openDocument(doc)} className="font-medium text-[#0F2944] hover:text-blue-600 transition-colors text-left">
                               {doc.title}
-                            </a>
+                            </button>
                           </td>
                           <td className="px-6 py-4 text-sm text-gray-500">{doc.case_id || 'Unassigned'}</td>
                           <td className="px-6 py-4">
@@ -81,8 +81,8 @@ CARD TYPES:
 
       let aiResponse = response.data.response;
       
-      // Parse response into cards
-      const cards = parseResponseToCards(aiResponse);
+      // Cards arrive validated from the server; parse locally only as a fallback
+      const cards = response.data.cards?.length ? response.data.cards : parseResponseToCards(aiResponse);
       setChatMessages(prev => [...prev, { role: 'assistant', content: { cards } }]);
       
     } catch (error) {
@@ -289,6 +289,11 @@ export default function UserDashboard() {
         headers: { Authorization: `Bearer ${token}` }
       });
       setChatHistory(res.data);
+      if (chat.unread) {
+        axios.post(`${API}/messages/${chat.other_user_id}/read`, {}, {
+          headers: { Authorization: `Bearer ${token}` }
+        }).catch(() => {});
+      }
     } catch (error) {
       toast.error('Failed to load chat history');
     }
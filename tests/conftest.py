@@ -0,0 +1,8 @@
+import os
+import sys
+from pathlib import Path
+
+# Unit tests import backend modules directly; the Mongo client connects lazily, so no server is needed
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'lxwyerup_test')
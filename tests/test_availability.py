@@ -0,0 +1,74 @@
+"""
+Availability Index Unit Tests
+Tests for: time zone normalisation, merged busy intervals, overlap checks and free windows
+"""
+from datetime import datetime, timezone
+
+from services.availability import LawyerSchedule, to_naive, event_interval, booking_interval
+
+
+def at(hour, minute=0, day=1):
+    return datetime(2030, 1, day, hour, minute)
+
+
+def schedule_with(*intervals):
+    schedule = LawyerSchedule()
+    for i, (start, end) in enumerate(intervals):
+        schedule.add(f"event:{i}", start, end)
+    return schedule
+
+
+def test_aware_times_become_app_timezone_wall_clock():
+    # Events arrive from toISOString() in UTC; bookings are IST wall-clock strings
+    assert to_naive(datetime(2030, 1, 1, 4, 30, tzinfo=timezone.utc)) == at(10)
+    assert to_naive(at(10)) == at(10)
+
+
+def test_event_and_booking_at_same_local_time_overlap():
+    event = event_interval({'start_time': '2030-01-01T04:30:00.000Z', 'end_time': '2030-01-01T05:30:00.000Z'})
+    booking = booking_interval({'date': '2030-01-01', 'time': '10:30 AM', 'duration_minutes': 30})
+    schedule = LawyerSchedule()
+    schedule.add('event:1', *event)
+    assert not schedule.is_free(*booking)
+
+
+def test_add_merges_overlapping_and_touching_intervals():
+    schedule = schedule_with((at(9), at(10)), (at(11), at(12)), (at(10), at(11)), (at(14), at(15)))
+    assert schedule._starts == [at(9), at(14)]
+    assert schedule._ends == [at(12), at(15)]
+
+
+def test_is_free():
+    schedule = schedule_with((at(9), at(10)), (at(13), at(14)))
+    assert schedule.is_free(at(10), at(13))
+    assert schedule.is_free(at(8), at(9))
+    assert not schedule.is_free(at(9, 30), at(10, 30))
+    assert not schedule.is_free(at(8), at(15))
+
+
+def test_is_free_ignoring_own_booking():
+    schedule = schedule_with((at(9), at(10)))
+    schedule.add('booking:a', at(11), at(12))
+    assert not schedule.is_free(at(11, 30), at(12, 30))
+    assert schedule.is_free(at(11, 30), at(12, 30), ignore='booking:a')
+    assert not schedule.is_free(at(9, 30), at(11), ignore='booking:a')
+
+
+def test_remove_and_replace_rebuild_the_merged_array():
+    schedule = schedule_with((at(9), at(10)), (at(10), at(11)))
+    schedule.remove('event:0')
+    assert (schedule._starts, schedule._ends) == ([at(10)], [at(11)])
+    schedule.add('event:1', at(15), at(16))
+    assert (schedule._starts, schedule._ends) == ([at(15)], [at(16)])
+
+
+def test_free_windows():
+    schedule = schedule_with((at(8), at(9, 30)), (at(10), at(11)), (at(11, 15), at(12)), (at(17), at(19)))
+    windows = schedule.free_windows(at(9), at(18), 30)
+    assert windows == [(at(9, 30), at(10)), (at(12), at(17))]
+    assert schedule.free_windows(at(9), at(18), 20) == [(at(9, 30), at(10)), (at(12), at(17))]
+    assert schedule.free_windows(at(9), at(18), 15) == [(at(9, 30), at(10)), (at(11), at(11, 15)), (at(12), at(17))]
+
+
+def test_free_windows_on_an_empty_day():
+    assert LawyerSchedule().free_windows(at(9), at(17), 60) == [(at(9), at(17))]
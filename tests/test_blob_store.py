@@ -0,0 +1,116 @@
+"""
+Blob Store Unit Tests
+Tests for: content-addressed dedup, reference release, garbage collection after the grace period,
+and a re-upload racing a collection sweep (local filesystem backend, in-memory Mongo)
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+import services.blob_store as blob_store_module
+from services.blob_store import BlobStore, LocalFilesystemBackend, TRASH_SUFFIX
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = AsyncMongoMockClient()['blob_store_test']
+    monkeypatch.setattr(blob_store_module, 'db', db)
+    return db
+
+
+@pytest.fixture
+def store(tmp_path, db):
+    return BlobStore(LocalFilesystemBackend(tmp_path), grace_seconds=60)
+
+
+async def stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def put(store, *chunks, **kwargs):
+    return asyncio.run(store.put_stream(stream(*chunks), 'application/pdf', **kwargs))
+
+
+def age_release(db, key, seconds):
+    """Pretend the blob's last reference was dropped `seconds` ago"""
+    released_at = datetime.now(timezone.utc) - timedelta(seconds=seconds)
+    asyncio.run(db.blobs.update_one({'_id': key}, {'$set': {'released_at': released_at}}))
+
+
+def test_identical_uploads_share_one_blob(store, db):
+    key, size = put(store, b'hello ', b'world')
+    again, _ = put(store, b'hello world')
+    assert again == key and size == 11
+    assert store.local_path(key).read_bytes() == b'hello world'
+    assert asyncio.run(db.blobs.find_one({'_id': key}))['refs'] == 2
+    assert store.deduplicated == 1 and store.bytes_deduplicated == 11
+    # No temp files are left behind by the duplicate
+    assert list((store.backend.root / 'tmp').iterdir()) == []
+
+
+def test_checksum_mismatch_is_discarded(store, db):
+    with pytest.raises(ValueError):
+        put(store, b'hello', expected_sha256='0' * 64)
+    assert asyncio.run(db.blobs.count_documents({})) == 0
+
+
+def test_release_never_drops_below_zero(store, db):
+    key, _ = put(store, b'data')
+    asyncio.run(store.release(key))
+    asyncio.run(store.release(key))
+    assert asyncio.run(db.blobs.find_one({'_id': key}))['refs'] == 0
+
+
+def test_unreferenced_blob_is_collected_only_after_grace(store, db):
+    key, _ = put(store, b'data')
+    collected_keys = []
+
+    async def hook(collected_key):
+        collected_keys.append(collected_key)
+
+    store.collect_hooks.append(hook)
+    asyncio.run(store.release(key))
+    assert asyncio.run(store.collect_garbage()) == 0
+    assert store.local_path(key).exists()
+
+    age_release(db, key, 120)
+    assert asyncio.run(store.collect_garbage()) == 1
+    assert not store.local_path(key).exists()
+    assert asyncio.run(db.blobs.find_one({'_id': key})) is None
+    assert collected_keys == [key]
+
+
+def test_referenced_blob_is_never_collected(store, db):
+    key, _ = put(store, b'data')
+    put(store, b'data')
+    asyncio.run(store.release(key))
+    age_release(db, key, 120)
+    assert asyncio.run(store.collect_garbage()) == 0
+    assert store.local_path(key).exists()
+
+
+def test_reupload_while_gc_holds_its_claim_keeps_the_blob(store, db, monkeypatch):
+    key, _ = put(store, b'data')
+    asyncio.run(store.release(key))
+    age_release(db, key, 120)
+
+    backend_move = store.backend.move
+    reuploaded = []
+
+    async def move_then_reupload(src, dst):
+        moved = await backend_move(src, dst)
+        if dst == key + TRASH_SUFFIX and not reuploaded:
+            # The sweep has claimed the row and moved the file aside; an upload arrives now
+            reuploaded.append(await store.put_stream(stream(b'data')))
+        return moved
+
+    monkeypatch.setattr(store.backend, 'move', move_then_reupload)
+    assert asyncio.run(store.collect_garbage()) == 0
+    assert reuploaded == [(key, 4)]
+    assert store.local_path(key).read_bytes() == b'data'
+    assert not store.backend.local_path(key + TRASH_SUFFIX).exists()
+    blob = asyncio.run(db.blobs.find_one({'_id': key}))
+    assert blob['refs'] == 1 and blob['state'] == 'live'
@@ -0,0 +1,115 @@
+"""
+Booking Concurrency Stress Tests
+Tests for: atomic slot reservation under simultaneous bookings, reschedule, cancel
+"""
+import pytest
+import requests
+import os
+import uuid
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+CONCURRENT_BOOKINGS = 200
+
+# A far-future day so reruns never collide with real bookings
+SLOT_DATE = (date.today() + timedelta(days=random.randint(400, 4000))).isoformat()
+
+
+def register(user_type):
+    """Register a fresh user and return (token, user)"""
+    response = requests.post(f"{BASE_URL}/api/auth/register", json={
+        "email": f"stress_{user_type}_{uuid.uuid4().hex[:8]}@example.com",
+        "password": "password123",
+        "full_name": f"Stress {user_type.title()}",
+        "user_type": user_type
+    })
+    assert response.status_code == 200, response.text
+    data = response.json()
+    return data["token"], data["user"]
+
+
+@pytest.fixture(scope="module")
+def lawyer():
+    return register("lawyer")
+
+
+@pytest.fixture(scope="module")
+def client_tokens():
+    # Several clients so free-trial/pricing paths run concurrently too
+    return [register("client")[0] for _ in range(5)]
+
+
+def book(token, lawyer_id, time_str, duration=30):
+    return requests.post(
+        f"{BASE_URL}/api/bookings",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "lawyer_id": lawyer_id,
+            "date": SLOT_DATE,
+            "time": time_str,
+            "description": "Stress test consultation",
+            "duration_minutes": duration
+        },
+        timeout=60
+    )
+
+
+class TestConcurrentBooking:
+    """Many clients racing for the same lawyer slot"""
+
+    def test_only_one_booking_wins_a_slot(self, lawyer, client_tokens):
+        """Fire CONCURRENT_BOOKINGS simultaneous bookings at one slot; exactly one succeeds"""
+        lawyer_id = lawyer[1]["id"]
+        tokens = [client_tokens[i % len(client_tokens)] for i in range(CONCURRENT_BOOKINGS)]
+
+        with ThreadPoolExecutor(max_workers=50) as pool:
+            responses = list(pool.map(lambda token: book(token, lawyer_id, "10:00"), tokens))
+
+        statuses = [r.status_code for r in responses]
+        assert statuses.count(200) == 1, f"Expected one winner, got {statuses.count(200)}"
+        assert statuses.count(400) == CONCURRENT_BOOKINGS - 1
+        print(f"{CONCURRENT_BOOKINGS} concurrent bookings -> 1 accepted, {statuses.count(400)} rejected")
+
+    def test_overlapping_durations_conflict(self, lawyer, client_tokens):
+        """A 60-minute booking blocks a later booking that starts inside it"""
+        lawyer_id = lawyer[1]["id"]
+        first = book(client_tokens[0], lawyer_id, "14:00", duration=60)
+        assert first.status_code == 200, first.text
+        second = book(client_tokens[1], lawyer_id, "14:30")
+        assert second.status_code == 400
+
+    def test_cancel_frees_slot(self, lawyer, client_tokens):
+        """Cancelling a booking lets another client take the slot"""
+        lawyer_id = lawyer[1]["id"]
+        first = book(client_tokens[0], lawyer_id, "16:00")
+        assert first.status_code == 200, first.text
+
+        cancel = requests.patch(
+            f"{BASE_URL}/api/bookings/{first.json()['id']}/cancel",
+            headers={"Authorization": f"Bearer {client_tokens[0]}"}
+        )
+        assert cancel.status_code == 200
+
+        second = book(client_tokens[1], lawyer_id, "16:00")
+        assert second.status_code == 200, second.text
+
+    def test_reschedule_into_taken_slot_rejected(self, lawyer, client_tokens):
+        """Rescheduling onto another booking's slot fails and keeps the original slot"""
+        lawyer_token, lawyer_user = lawyer
+        taken = book(client_tokens[0], lawyer_user["id"], "11:00")
+        moving = book(client_tokens[1], lawyer_user["id"], "12:00")
+        assert taken.status_code == 200 and moving.status_code == 200
+
+        response = requests.patch(
+            f"{BASE_URL}/api/bookings/{moving.json()['id']}/reschedule",
+            headers={"Authorization": f"Bearer {lawyer_token}"},
+            params={"date": SLOT_DATE, "time": "11:00"}
+        )
+        assert response.status_code == 400
+
+        # The original 12:00 slot is still held by the booking that failed to move
+        retry = book(client_tokens[2], lawyer_user["id"], "12:00")
+        assert retry.status_code == 400
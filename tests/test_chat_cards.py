@@ -0,0 +1,89 @@
+"""
+Chat Card Parsing Unit Tests
+Tests for: strict JSON, repair of fenced/embedded/trailing-comma/smart-quote JSON,
+truncated replies, markdown and plain-text fallbacks, and card normalisation
+"""
+import json
+
+from services.chat_cards import parse_cards, normalize_card, MAX_CARDS, MAX_CONTENT_CHARS
+
+CARDS = [{'type': 'advice', 'title': 'File an FIR', 'content': 'Go to the nearest police station.'},
+         {'type': 'warning', 'title': 'Deadline', 'content': 'Appeal within 30 days.'}]
+
+
+def test_strict_json_is_not_repaired():
+    cards, repaired = parse_cards(json.dumps({'cards': CARDS}))
+    assert cards == CARDS
+    assert repaired is False
+
+
+def test_code_fenced_json():
+    cards, repaired = parse_cards(f"Here you go:\n```json\n{json.dumps({'cards': CARDS})}\n```")
+    assert cards == CARDS
+    assert repaired is True
+
+
+def test_json_embedded_in_prose():
+    cards, repaired = parse_cards(f"Sure! {json.dumps({'cards': CARDS})} Hope this helps.")
+    assert cards == CARDS
+    assert repaired is True
+
+
+def test_trailing_commas_and_smart_quotes():
+    raw = '{“cards”: [{“type”: “info”, “title”: “Bail”, “content”: “Apply under Section 437.”},],}'
+    cards, repaired = parse_cards(raw)
+    assert cards == [{'type': 'info', 'title': 'Bail', 'content': 'Apply under Section 437.'}]
+    assert repaired is True
+
+
+def test_truncated_json_keeps_complete_cards():
+    raw = json.dumps({'cards': CARDS})[:-2] + ', {"type": "info", "title": "Cut o'
+    cards, repaired = parse_cards(raw)
+    assert cards == CARDS
+    assert repaired is True
+
+
+def test_markdown_sections_become_info_cards():
+    raw = "## Your rights\nYou can ask for bail.\n\n**Next step**: Talk to a lawyer."
+    cards, repaired = parse_cards(raw)
+    assert cards == [{'type': 'info', 'title': 'Your rights', 'content': 'You can ask for bail.'},
+                     {'type': 'info', 'title': 'Next step', 'content': 'Talk to a lawyer.'}]
+    assert repaired is True
+
+
+def test_plain_text_becomes_one_card():
+    assert parse_cards("Please consult a lawyer.") == (
+        [{'type': 'info', 'title': '', 'content': 'Please consult a lawyer.'}], True)
+
+
+def test_empty_reply():
+    assert parse_cards('') == ([], True)
+    assert parse_cards(None) == ([], True)
+
+
+def test_single_card_object_and_bare_list():
+    card = {'type': 'info', 'title': 'Bail', 'content': 'x'}
+    assert parse_cards(json.dumps(card))[0] == [card]
+    assert parse_cards(json.dumps([card]))[0] == [card]
+
+
+def test_invalid_cards_are_dropped_and_reported():
+    raw = json.dumps({'cards': [CARDS[0], {'type': 'info'}, 'text', CARDS[1]]})
+    cards, repaired = parse_cards(raw)
+    assert cards == CARDS
+    assert repaired is True
+
+
+def test_cards_are_capped():
+    cards, repaired = parse_cards(json.dumps({'cards': [CARDS[0]] * (MAX_CARDS + 2)}))
+    assert len(cards) == MAX_CARDS
+    assert repaired is True
+
+
+def test_normalize_card_aliases_types_and_lists():
+    assert normalize_card({'type': 'ADVICE', 'heading': ' Steps ', 'text': ['one', 'two']}) == {
+        'type': 'advice', 'title': 'Steps', 'content': '• one\n• two'}
+    assert normalize_card({'type': 'unknown', 'body': 'x'})['type'] == 'info'
+    assert len(normalize_card({'content': 'x' * (MAX_CONTENT_CHARS + 10)})['content']) == MAX_CONTENT_CHARS
+    assert normalize_card({'title': '  ', 'content': ''}) is None
+    assert normalize_card('text') is None
@@ -0,0 +1,170 @@
+"""
+Chunked Upload Unit Tests
+Tests for: chunk offset and size validation, per-user quotas, completion with checksum verification,
+and cleanup of expired sessions including stored ones whose document was never recorded
+"""
+import asyncio
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from mongomock.collection import Collection
+from mongomock_motor import AsyncMongoMockClient
+
+import services.blob_store as blob_store_module
+import services.chunked_uploads as chunked_uploads_module
+from services.blob_store import BlobStore, LocalFilesystemBackend
+from services.chunked_uploads import ChunkedUploads
+
+DATA = b'0123456789abcdefghij'  # 20 bytes: chunks of 8, 8 and 4
+
+
+@pytest.fixture
+def db(monkeypatch, tmp_path):
+    # mongomock re-runs the caller's filter to fetch a ReturnDocument.AFTER result unless _id is
+    # projected, so claiming a session by status ({'status': 'open'} -> 'completing') would return None
+    find_and_modify = Collection._find_and_modify
+
+    def by_id(self, query, projection=None, *args, **kwargs):
+        doc = self.find_one(query, {'_id': 1}, sort=kwargs.get('sort'))
+        return find_and_modify(self, {'_id': doc['_id']} if doc else query, projection, *args, **kwargs)
+
+    monkeypatch.setattr(Collection, '_find_and_modify', by_id)
+    db = AsyncMongoMockClient()['chunked_uploads_test']
+    store = BlobStore(LocalFilesystemBackend(tmp_path / 'blobs'))
+    monkeypatch.setattr(blob_store_module, 'db', db)
+    monkeypatch.setattr(chunked_uploads_module, 'db', db)
+    monkeypatch.setattr(chunked_uploads_module, 'blob_store', store)
+    monkeypatch.setattr(chunked_uploads_module, 'SESSION_DIR', tmp_path / 'sessions')
+    return db
+
+
+@pytest.fixture
+def uploads(db):
+    return ChunkedUploads(chunk_size=8)
+
+
+async def body(*pieces):
+    for piece in pieces:
+        yield piece
+
+
+def create(uploads, user_id='u1', size=len(DATA)):
+    return asyncio.run(uploads.create(user_id, 'brief.pdf', size, 'application/pdf'))
+
+
+def write(uploads, session, offset, data=None):
+    data = DATA[offset:offset + 8] if data is None else data
+    return asyncio.run(uploads.write_chunk(session['id'], session['user_id'], offset, body(data)))
+
+
+def status_of(call):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(call)
+    return error.value.status_code
+
+
+def expire(db, upload_id):
+    past = datetime.now(timezone.utc) - timedelta(seconds=1)
+    asyncio.run(db.upload_sessions.update_one({'id': upload_id}, {'$set': {'expires_at': past}}))
+
+
+def test_chunks_in_any_order_complete_into_one_blob(uploads, db):
+    session = create(uploads)
+    for offset in (16, 0, 8):
+        progress = write(uploads, session, offset)
+    assert progress['received'] == [2, 0, 1]
+
+    _, content_hash, size = asyncio.run(uploads.complete(session['id'], 'u1', hashlib.sha256(DATA).hexdigest()))
+    assert size == len(DATA)
+    assert chunked_uploads_module.blob_store.local_path(content_hash).read_bytes() == DATA
+    stored = asyncio.run(db.upload_sessions.find_one({'id': session['id']}))
+    assert stored['status'] == 'stored' and stored['content_hash'] == content_hash
+    assert not (chunked_uploads_module.SESSION_DIR / session['id']).exists()
+
+    asyncio.run(uploads.finish(session['id']))
+    assert asyncio.run(db.upload_sessions.count_documents({})) == 0
+
+
+@pytest.mark.parametrize("offset", [3, 20, 64])
+def test_offset_must_be_a_chunk_boundary_inside_the_file(uploads, offset):
+    session = create(uploads)
+    assert status_of(uploads.write_chunk(session['id'], 'u1', offset, body(b'x'))) == 400
+
+
+def test_chunk_size_must_match_the_slot(uploads):
+    session = create(uploads)
+    assert status_of(uploads.write_chunk(session['id'], 'u1', 16, body(b'abc'))) == 400
+    assert status_of(uploads.write_chunk(session['id'], 'u1', 16, body(b'abc', b'de'))) == 413
+
+
+def test_chunks_are_private_to_their_owner(uploads):
+    session = create(uploads)
+    assert status_of(uploads.write_chunk(session['id'], 'someone-else', 0, body(DATA[:8]))) == 404
+
+
+def test_incomplete_or_mismatched_upload_stays_open(uploads, db):
+    session = create(uploads)
+    write(uploads, session, 0)
+    assert status_of(uploads.complete(session['id'], 'u1', hashlib.sha256(DATA).hexdigest())) == 400
+
+    write(uploads, session, 8)
+    write(uploads, session, 16)
+    assert status_of(uploads.complete(session['id'], 'u1', '0' * 64)) == 400
+    assert uploads.checksum_failures == 1
+    assert asyncio.run(db.upload_sessions.find_one({'id': session['id']}))['status'] == 'open'
+    assert asyncio.run(db.blobs.count_documents({})) == 0
+
+
+def test_session_quota_rejects_and_forgets_the_extra_session(uploads, db, monkeypatch):
+    monkeypatch.setattr(chunked_uploads_module, 'UPLOAD_MAX_SESSIONS_PER_USER', 2)
+    create(uploads)
+    create(uploads)
+    assert status_of(uploads.create('u1', 'third.pdf', 10)) == 429
+    assert asyncio.run(db.upload_sessions.count_documents({'user_id': 'u1'})) == 2
+    assert uploads.rejected == 1
+    # Other users have their own allowance
+    create(uploads, user_id='u2')
+
+
+def test_pending_bytes_quota(uploads, monkeypatch):
+    monkeypatch.setattr(chunked_uploads_module, 'UPLOAD_MAX_PENDING_BYTES_PER_USER', 30)
+    create(uploads)
+    assert status_of(uploads.create('u1', 'big.pdf', 11)) == 429
+    create(uploads, size=10)
+
+
+def test_cleanup_removes_expired_open_sessions(uploads, db):
+    session = create(uploads)
+    write(uploads, session, 0)
+    expire(db, session['id'])
+    assert asyncio.run(uploads.cleanup()) == 1
+    assert not (chunked_uploads_module.SESSION_DIR / session['id']).exists()
+    assert asyncio.run(db.upload_sessions.count_documents({})) == 0
+
+
+def complete_without_finish(uploads, db):
+    session = create(uploads)
+    for offset in (0, 8, 16):
+        write(uploads, session, offset)
+    _, content_hash, _ = asyncio.run(uploads.complete(session['id'], 'u1', hashlib.sha256(DATA).hexdigest()))
+    expire(db, session['id'])
+    return session, content_hash
+
+
+def test_cleanup_releases_a_stored_session_without_a_document(uploads, db):
+    _, content_hash = complete_without_finish(uploads, db)
+    asyncio.run(uploads.cleanup())
+    assert asyncio.run(db.blobs.find_one({'_id': content_hash}))['refs'] == 0
+    assert asyncio.run(db.upload_sessions.count_documents({})) == 0
+    assert uploads.released == 1
+
+
+def test_cleanup_keeps_the_reference_of_a_recorded_document(uploads, db):
+    session, content_hash = complete_without_finish(uploads, db)
+    asyncio.run(db.documents.insert_one({'id': session['id'], 'content_hash': content_hash}))
+    asyncio.run(uploads.cleanup())
+    assert asyncio.run(db.blobs.find_one({'_id': content_hash}))['refs'] == 1
+    assert asyncio.run(db.upload_sessions.count_documents({})) == 0
+    assert uploads.released == 0
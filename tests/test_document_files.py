@@ -0,0 +1,104 @@
+"""
+Document File Serving Unit Tests
+Tests for: Range parsing, If-None-Match comparison and If-Range handling
+"""
+import pytest
+
+from services.document_files import parse_range, etag_matches, serve_file, RangeNotSatisfiable
+
+ETAG = '"0123abcd"'
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=900-5000", (900, 999)),
+    (" bytes = 5 - 10 ", (5, 10)),
+    ("bytes=999-999", (999, 999)),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", [None, "", "bytes=-", "bytes=0-1,5-6", "items=0-5", "bytes=50-10", "bytes=a-b"])
+def test_parse_range_ignores_missing_malformed_and_multi_range(header):
+    assert parse_range(header, 1000) is None
+
+
+@pytest.mark.parametrize("header, size", [("bytes=1000-", 1000), ("bytes=-0", 1000), ("bytes=-100", 0), ("bytes=0-", 0)])
+def test_parse_range_not_satisfiable(header, size):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, size)
+
+
+@pytest.mark.parametrize("header, etag, expected", [
+    (ETAG, ETAG, True),
+    ('W/"0123abcd"', ETAG, True),
+    (ETAG, 'W/"0123abcd"', True),
+    ('"other", "0123abcd"', ETAG, True),
+    ("*", ETAG, True),
+    ('"other"', ETAG, False),
+    (None, ETAG, False),
+    ("", ETAG, False),
+])
+def test_etag_matches(header, etag, expected):
+    assert etag_matches(header, etag) is expected
+
+
+@pytest.fixture
+def stored_file(tmp_path):
+    path = tmp_path / "document.pdf"
+    path.write_bytes(b"x" * 1000)
+    return path
+
+
+def serve(path, etag=ETAG, **kwargs):
+    return serve_file(path, etag, 'application/pdf', 'document.pdf', **kwargs)
+
+
+def test_serve_whole_file(stored_file):
+    response = serve(stored_file)
+    assert response.status_code == 200
+    assert response.headers['content-length'] == '1000'
+    assert response.headers['etag'] == ETAG
+
+
+def test_serve_range(stored_file):
+    response = serve(stored_file, range_header="bytes=10-19")
+    assert response.status_code == 206
+    assert response.headers['content-range'] == 'bytes 10-19/1000'
+    assert response.headers['content-length'] == '10'
+
+
+def test_serve_unsatisfiable_range(stored_file):
+    response = serve(stored_file, range_header="bytes=5000-")
+    assert response.status_code == 416
+    assert response.headers['content-range'] == 'bytes */1000'
+
+
+def test_serve_range_of_empty_file(tmp_path):
+    path = tmp_path / "empty.pdf"
+    path.write_bytes(b"")
+    assert serve(path, range_header="bytes=-100").status_code == 416
+    assert serve(path).status_code == 200
+
+
+def test_if_none_match_returns_304(stored_file):
+    assert serve(stored_file, if_none_match=ETAG).status_code == 304
+
+
+def test_if_range_with_current_etag_keeps_the_range(stored_file):
+    assert serve(stored_file, range_header="bytes=0-9", if_range=ETAG).status_code == 206
+
+
+def test_if_range_with_stale_etag_sends_the_whole_file(stored_file):
+    response = serve(stored_file, range_header="bytes=0-9", if_range='"stale"')
+    assert response.status_code == 200
+    assert response.headers['content-length'] == '1000'
+
+
+def test_if_range_never_matches_a_weak_etag(stored_file):
+    weak = 'W/"3e8-5f5e100"'
+    assert serve(stored_file, etag=weak, range_header="bytes=0-9", if_range=weak).status_code == 200
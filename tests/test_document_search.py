@@ -0,0 +1,97 @@
+"""
+Document Search Unit Tests
+Tests for: field weighting, snippet highlight offsets, BM25 ranking and (score, id) cursor paging
+"""
+import pytest
+from fastapi import HTTPException
+
+from services.document_search import term_weights, highlight, rank, page_after, SNIPPET_CHARS
+from services.pagination import encode_cursor
+from services.text_search import tokenize
+
+
+def marked(result):
+    return [result['snippet'][start:end] for start, end in result['highlights']]
+
+
+def test_term_weights_favour_title_and_case_id():
+    weights = term_weights({'title': 'FIR copy', 'case_id': 'case-12'}, 'FIR lodged at the station')
+    assert weights['fir'] == 4.0
+    assert weights['case'] == 2.0
+    assert weights['lodged'] == 1.0
+    assert 'the' not in weights
+
+
+def test_highlight_marks_every_form_of_a_stem():
+    text = "The lawyer argued that both lawyers' cases and the case diary were incomplete."
+    result = highlight(text, tokenize("lawyers case"))
+    assert result['snippet'] == text
+    assert marked(result) == ['lawyer', 'lawyers', 'cases', 'case']
+
+
+def test_highlight_matches_y_stems_in_ies_plurals():
+    result = highlight("Both properties were disputed; the property is in Delhi.", tokenize("property"))
+    assert marked(result) == ['properties', 'property']
+
+
+def test_highlight_only_matches_at_word_starts():
+    assert highlight("a showcase of evidence", tokenize("case"))['highlights'] == []
+
+
+def test_highlight_windows_long_text_around_the_first_match():
+    text = "Filler words here. " * 40 + "Section 420 applies to the accused. " + "More filler. " * 40
+    result = highlight(text, tokenize("section 420"))
+    assert result['snippet'].startswith('…') and result['snippet'].endswith('…')
+    assert len(result['snippet']) <= SNIPPET_CHARS + 2
+    assert marked(result) == ['Section', '420']
+
+
+def test_highlight_offsets_hold_for_hindi_and_without_matches():
+    result = highlight("धारा 420 के तहत मामला दर्ज", tokenize("धारा"))
+    assert marked(result) == ['धारा']
+    assert highlight("no match here", ["bail"]) == {'snippet': "no match here", 'highlights': []}
+    assert highlight("", ["bail"]) == {'snippet': "", 'highlights': []}
+
+
+def row(doc_id, length, **tf):
+    return {'document_id': doc_id, 'length': length, 'tf': tf}
+
+
+def test_rank_prefers_higher_term_weight_and_shorter_documents():
+    ranked = rank([row('long', 100, bail=3.0), row('title', 10, bail=4.0), row('short', 10, bail=3.0)],
+                  ['bail'], total_docs=10, df={'bail': 3})
+    assert [r['document_id'] for r in ranked] == ['title', 'short', 'long']
+    assert ranked[0]['score'] > ranked[1]['score'] > ranked[2]['score']
+
+
+def test_rank_rare_terms_count_more():
+    ranked = rank([row('a', 10, bail=1.0, fir=0.0), row('b', 10, bail=0.0, fir=1.0)],
+                  ['bail', 'fir'], total_docs=100, df={'bail': 80, 'fir': 2})
+    assert [r['document_id'] for r in ranked] == ['b', 'a']
+
+
+def test_rank_breaks_ties_by_document_id():
+    ranked = rank([row('b', 10, bail=1.0), row('a', 10, bail=1.0)], ['bail'], total_docs=2, df={'bail': 2})
+    assert [r['document_id'] for r in ranked] == ['a', 'b']
+
+
+def test_page_after_walks_every_row_once():
+    ranked = [{'document_id': doc_id, 'score': score}
+              for doc_id, score in [('a', 3.0), ('b', 2.0), ('c', 2.0), ('d', 2.0), ('e', 1.0)]]
+    seen, cursor = [], None
+    while True:
+        page, has_more = page_after(ranked, cursor, 2)
+        seen += [r['document_id'] for r in page]
+        if not has_more:
+            break
+        cursor = encode_cursor(page[-1]['score'], page[-1]['document_id'])
+    assert seen == ['a', 'b', 'c', 'd', 'e']
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor("high", "a"), encode_cursor(1.0, 5),
+                                    encode_cursor(True, "a"), encode_cursor(1.0), encode_cursor({"$gt": 0}, "a"),
+                                    encode_cursor(1.0, ["a"]), encode_cursor(None, "a")])
+def test_page_after_rejects_malformed_cursors(cursor):
+    with pytest.raises(HTTPException) as error:
+        page_after([{'document_id': 'a', 'score': 1.0}], cursor, 10)
+    assert error.value.status_code == 400
@@ -0,0 +1,127 @@
+"""
+Realtime Hub Unit Tests
+Tests for: subscribe/publish/unsubscribe, per-user channel isolation, state channels,
+slow-subscriber dropping and broker swapping, using the in-memory broker
+"""
+import asyncio
+from datetime import datetime
+
+from services.realtime import RealtimeHub, InMemoryBroker, Subscription, user_channel, state_channel
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def drain(subscription):
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    return events
+
+
+def test_publish_reaches_subscribers_of_the_channel():
+    async def scenario():
+        hub = RealtimeHub()
+        subscription = hub.subscribe([user_channel('alice')])
+        await hub.publish(user_channel('alice'), 'message', {'content': 'hi'})
+        return hub, drain(subscription)
+
+    hub, events = run(scenario())
+    assert events == [{'type': 'message', 'data': {'content': 'hi'}}]
+    assert hub.stats()['published'] == 1
+    assert hub.stats()['delivered'] == 1
+
+
+def test_user_channels_are_isolated():
+    async def scenario():
+        hub = RealtimeHub()
+        alice = hub.subscribe([user_channel('alice')])
+        bob = hub.subscribe([user_channel('bob')])
+        await hub.publish(user_channel('alice'), 'notification', {'id': 1})
+        return drain(alice), drain(bob)
+
+    alice, bob = run(scenario())
+    assert [event['data'] for event in alice] == [{'id': 1}]
+    assert bob == []
+
+
+def test_state_channel_fans_out_to_every_subscriber():
+    async def scenario():
+        hub = RealtimeHub()
+        delhi = [hub.subscribe([user_channel(name), state_channel('Delhi')]) for name in ('a', 'b')]
+        mumbai = hub.subscribe([user_channel('c'), state_channel('Mumbai')])
+        await hub.publish(state_channel('Delhi'), 'network_post', {'id': 'p1'})
+        return [drain(sub) for sub in delhi], drain(mumbai)
+
+    delhi, mumbai = run(scenario())
+    assert all(len(events) == 1 for events in delhi)
+    assert mumbai == []
+
+
+def test_unsubscribe_stops_delivery_and_forgets_empty_channels():
+    async def scenario():
+        hub = RealtimeHub()
+        first = hub.subscribe([user_channel('alice')])
+        second = hub.subscribe([user_channel('alice')])
+        hub.unsubscribe(first)
+        await hub.publish(user_channel('alice'), 'message', {})
+        events = drain(first), drain(second)
+        hub.unsubscribe(second)
+        return hub, events
+
+    hub, (first, second) = run(scenario())
+    assert first == []
+    assert len(second) == 1
+    assert hub.stats()['channels'] == 0
+    assert hub.stats()['connections'] == 0
+
+
+def test_publish_without_subscribers_and_json_encoding():
+    async def scenario():
+        hub = RealtimeHub()
+        await hub.publish(user_channel('nobody'), 'message', {})
+        subscription = hub.subscribe([user_channel('alice')])
+        await hub.publish(user_channel('alice'), 'message', {'at': datetime(2030, 1, 1, 10, 0)})
+        return hub, drain(subscription)
+
+    hub, events = run(scenario())
+    assert events[0]['data'] == {'at': '2030-01-01T10:00:00'}
+    assert hub.stats()['published'] == 2
+
+
+def test_slow_subscriber_drops_oldest_events():
+    async def scenario():
+        subscription = Subscription([user_channel('alice')], maxsize=2)
+        for i in range(3):
+            subscription.push({'n': i})
+        return subscription, drain(subscription)
+
+    subscription, events = run(scenario())
+    assert events == [{'n': 1}, {'n': 2}]
+    assert subscription.dropped == 1
+
+
+def test_set_broker_routes_publishes_through_the_new_broker():
+    class RecordingBroker(InMemoryBroker):
+        def __init__(self):
+            super().__init__()
+            self.sent = []
+
+        async def publish(self, channel, event):
+            self.sent.append(channel)
+            await super().publish(channel, event)
+
+    async def scenario():
+        hub = RealtimeHub()
+        broker = RecordingBroker()
+        await hub.set_broker(broker)
+        subscription = hub.subscribe([user_channel('alice')])
+        await hub.publish(user_channel('alice'), 'message', {})
+        await hub.stop()
+        return broker, drain(subscription)
+
+    broker, events = run(scenario())
+    assert broker.sent == [user_channel('alice')]
+    assert len(events) == 1
+    assert broker.handler is None
@@ -0,0 +1,103 @@
+"""
+Text Search Unit Tests
+Tests for: tokenizer normalisation and stemming, BM25 ranking and prefix matching of the in-memory index,
+profile updates made while the index is being rebuilt
+"""
+import asyncio
+import types
+
+import pytest
+
+import services.text_search as text_search_module
+from services.text_search import tokenize, _stem, InvertedIndex, TextSearchService, LAWYER_FIELDS
+
+
+@pytest.mark.parametrize("singular, plural", [
+    ("case", "cases"),
+    ("license", "licenses"),
+    ("lease", "leases"),
+    ("house", "houses"),
+    ("lawyer", "lawyers"),
+    ("dispute", "disputes"),
+    ("class", "classes"),
+    ("tax", "taxes"),
+    ("branch", "branches"),
+    ("wish", "wishes"),
+    ("size", "sizes"),
+    ("property", "properties"),
+])
+def test_singular_and_plural_share_a_stem(singular, plural):
+    assert _stem(singular) == _stem(plural)
+
+
+@pytest.mark.parametrize("token", ["class", "process", "status", "basis", "law", "tax", "धाराएं"])
+def test_words_that_are_not_plurals_are_kept(token):
+    assert _stem(token) == token
+
+
+def test_tokenize_lowercases_and_drops_stopwords():
+    assert tokenize("The Lawyers of Delhi High Court") == ["lawyer", "delhi", "high", "court"]
+
+
+def test_tokenize_splits_apostrophes_and_punctuation():
+    assert tokenize("client's FIR, Section-420") == ["client", "s", "fir", "section", "420"]
+
+
+def test_tokenize_hindi_keeps_vowel_signs_and_drops_nukta():
+    assert tokenize("ज़मीन का विवाद") == ["जमीन", "विवाद"]
+    assert tokenize("धारा।") == ["धारा"]
+
+
+def test_tokenize_accepts_lists_and_none():
+    assert tokenize(["Criminal Law", None, "Divorce"]) == ["criminal", "law", "divorce"]
+    assert tokenize(None) == []
+
+
+def lawyer(doc_id, **fields):
+    return {'id': doc_id, 'full_name': f'Lawyer {doc_id}', **fields}
+
+
+@pytest.fixture
+def index():
+    index = InvertedIndex(LAWYER_FIELDS)
+    index.bulk_load([
+        lawyer('a', specialization='Property Law', city='Delhi'),
+        lawyer('b', specialization='Criminal Law', city='Mumbai', bio='Property disputes too'),
+        lawyer('c', specialization='Family Law', city='Delhi'),
+    ])
+    return index
+
+
+def test_search_ranks_weighted_fields_first(index):
+    results = index.search("property")
+    assert [result['id'] for result in results] == ['a', 'b']
+    assert results[0]['score'] > results[1]['score']
+
+
+def test_search_matches_plurals_and_last_word_prefix(index):
+    assert [result['id'] for result in index.search("properties")] == ['a', 'b']
+    assert [result['id'] for result in index.search("famil")] == ['c']
+
+
+def test_upsert_and_remove_update_the_index(index):
+    index.upsert(lawyer('c', specialization='Property Law'))
+    assert 'c' in [result['id'] for result in index.search("property")]
+    index.remove('a')
+    assert 'a' not in [result['id'] for result in index.search("property")]
+
+
+def test_build_keeps_profile_changes_made_during_the_scan(monkeypatch):
+    service = TextSearchService()
+
+    async def users(query, projection):
+        yield {**lawyer('a', specialization='Family Law'), 'user_type': 'lawyer'}
+        # Updates that land after the scan read these profiles
+        service.index_profile({**lawyer('a', specialization='Property Law'), 'user_type': 'lawyer'})
+        service.index_profile({**lawyer('b', specialization='Property Law'), 'user_type': 'lawyer'})
+        yield {**lawyer('c', specialization='Property Law'), 'user_type': 'lawyer'}
+        service.remove_profile('lawyer', 'c')
+
+    monkeypatch.setattr(text_search_module, 'db', types.SimpleNamespace(users=types.SimpleNamespace(find=users)))
+    asyncio.run(service.build())
+    assert sorted(result['id'] for result in service.indexes['lawyer'].search("property")) == ['a', 'b']
+    assert service.indexes['lawyer'].search("family") == []
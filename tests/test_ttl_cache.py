@@ -0,0 +1,51 @@
+"""
+TTL Cache Unit Tests
+Tests for: expiry, LRU eviction order and the removal callback of the shared in-process cache
+"""
+import time
+
+from services.ttl_cache import TTLCache
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    cache = TTLCache(ttl=10, max_entries=10)
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    now[0] += 11
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert list(cache) == ['a', 'c']
+    assert cache.evictions == 1
+
+
+def test_peek_does_not_refresh_lru_position():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.peek('a') == 1
+    cache.set('c', 3)
+    assert cache.peek('a') is None
+
+
+def test_on_remove_sees_expired_and_evicted_entries_but_not_pops(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    removed = []
+    cache = TTLCache(ttl=10, max_entries=1, on_remove=lambda key, value: removed.append(key))
+    cache.set('a', 1)
+    cache.set('b', 2)
+    now[0] += 11
+    cache.peek('b')
+    cache.set('c', 3)
+    cache.pop('c')
+    assert removed == ['a', 'b']